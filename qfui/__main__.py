@@ -1,26 +1,51 @@
-import logging
+import argparse
 import sys
 
-from PySide6.QtGui import QImage
-from PySide6.QtWidgets import QApplication
+from qfui import profiling
+from qfui.cli import check, gui, render
 
-import qfui.resources
-from qfui import sprites
-from qfui.utils import configure_logging
-from qfui.models.project import Project
-from qfui.qfparser.importers import CSVImporter
-from qfui.widgets.main import MainWindow
+__COMMANDS__ = ("gui", "render", "check")
+
+
+def _common_arguments() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "--profile", action="append", default=[], choices=("cprofile", "tracemalloc", "all"),
+        help="Profile the import, parsing, serialization and painting hot paths, may be repeated",
+    )
+    parser.add_argument("--profile-dir", default=None, help="Directory the profiles are written to")
+    return parser
+
+
+def main(argv=None) -> int:
+    global __COMMANDS__
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # The window is the default command, e.g. "python -m qfui blueprint.csv"
+    if not argv or argv[0] not in __COMMANDS__ + ("-h", "--help"):
+        argv = ["gui"] + argv
+    common = _common_arguments()
+    parser = argparse.ArgumentParser(prog="qfui")
+    commands = parser.add_subparsers(title="commands")
+    gui_parser = commands.add_parser("gui", parents=[common], help="Open the designer window, the default command")
+    gui.add_arguments(gui_parser)
+    gui_parser.set_defaults(handler=gui.run)
+    render_parser = commands.add_parser(
+        "render", parents=[common], help="Render blueprint layers to PNG images without a window"
+    )
+    render.add_arguments(render_parser)
+    render_parser.set_defaults(handler=render.run)
+    check_parser = commands.add_parser(
+        "check", parents=[common],
+        help="Validate blueprint files and optionally convert them, without Qt, writing a JSON report",
+    )
+    check.add_arguments(check_parser)
+    check_parser.set_defaults(handler=check.run)
+    args = parser.parse_args(argv)
+    # Has to happen before the profiled modules are imported, the commands import them lazily
+    if args.profile:
+        profiling.configure(args.profile, args.profile_dir)
+    return args.handler(args)
 
 
 if __name__ == "__main__":
-    configure_logging()
-    qfui.resources.initialize()
-    sprites.initialize(QImage("sprites:defaults.png"))
-    app = QApplication(sys.argv)
-    importer = CSVImporter()
-    project = Project(importer.load("../tests/data/dreamfort.csv"))
-    main_win = MainWindow(project)
-    geo = main_win.screen().availableGeometry()
-    main_win.resize(geo.width(), geo.height())
-    main_win.show()
-    sys.exit(app.exec())
+    sys.exit(main())
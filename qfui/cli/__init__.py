@@ -0,0 +1,16 @@
+import re
+from pathlib import Path
+from typing import List, Sequence
+
+
+def file_stem(text: str) -> str:
+    """Text made safe to be used in a file name"""
+    return re.sub(r"[^\w.-]+", "_", text).strip("_") or "_"
+
+
+def blueprint_files(paths: Sequence[str]) -> List[Path]:
+    """The given files, and the CSV files found in the given directories and their subdirectories"""
+    files = []
+    for path in map(Path, paths):
+        files += sorted(path.rglob("*.csv")) if path.is_dir() else [path]
+    return files
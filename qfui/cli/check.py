@@ -0,0 +1,151 @@
+"""
+Headless validation and conversion of blueprint files, e.g.
+
+    python -m qfui check --convert json -o converted library/
+
+Files are imported in worker processes and a JSON report with the sections per mode, the parse diagnostics, the lint
+issues per rule and the timings of every file is written. Nothing here imports Qt, so it runs on machines without a
+display or PySide6.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from qfui.cli import blueprint_files, file_stem
+
+# Diagnostics kept per file, any further ones are only counted
+__MAX_DIAGNOSTICS__ = 100
+__CONVERSIONS__ = {"json": ".json", "pickle": ".pickle"}
+
+
+@dataclass
+class CheckJob:
+
+    path: Path
+    output: Optional[Path] = None
+    convert: Optional[str] = None
+
+
+@dataclass
+class CheckResult:
+
+    path: str
+    sections: Dict[str, int] = field(default_factory=dict)
+    diagnostics: List[str] = field(default_factory=list)
+    diagnostic_count: int = 0
+    lint: Dict[str, int] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    converted: Optional[str] = None
+    error: Optional[str] = None
+
+
+class _DiagnosticsHandler(logging.Handler):
+    """Collects the problems the parser logs while a file is imported"""
+
+    def __init__(self, result: CheckResult):
+        super().__init__(logging.INFO)
+        self._result = result
+
+    def emit(self, record: logging.LogRecord):
+        global __MAX_DIAGNOSTICS__
+        self._result.diagnostic_count += 1
+        if len(self._result.diagnostics) < __MAX_DIAGNOSTICS__:
+            self._result.diagnostics.append(record.getMessage())
+
+
+def _convert(sections: list, path: Path, fmt: str):
+    if fmt == "json":
+        from qfui.models import serialize
+
+        with open(path, "w") as fh:
+            serialize.dump(sections, fh, indent=2)
+    else:
+        import pickle
+
+        with open(path, "wb") as fh:
+            pickle.dump(sections, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def check_file(job: CheckJob) -> CheckResult:
+    """
+    Imports a blueprint file collecting the parser's diagnostics, and converts it when asked to.
+    """
+    from qfui.models.lint import lint_sections
+    from qfui.qfparser.importers import CSVImporter
+
+    result = CheckResult(str(job.path))
+    handler = _DiagnosticsHandler(result)
+    logger = logging.getLogger("qfui.qfparser")
+    level = logger.level
+    # The parser logs the cells it could not parse as information, too noisy to show outside of checks
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    started = time.perf_counter()
+    try:
+        sections = CSVImporter().load(job.path)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+        result.timings["import"] = time.perf_counter() - started
+    for section in sections:
+        mode = section.mode.value if section.mode else "unknown"
+        result.sections[mode] = result.sections.get(mode, 0) + 1
+    started = time.perf_counter()
+    for issue in lint_sections(sections):
+        result.lint[issue.rule] = result.lint.get(issue.rule, 0) + 1
+    result.timings["lint"] = time.perf_counter() - started
+    if job.convert:
+        converted = job.output / f"{file_stem(job.path.stem)}{__CONVERSIONS__[job.convert]}"
+        started = time.perf_counter()
+        try:
+            _convert(sections, converted, job.convert)
+        except Exception as e:
+            result.error = f"Could not convert to {converted}: {type(e).__name__}: {e}"
+            return result
+        finally:
+            result.timings["convert"] = time.perf_counter() - started
+        result.converted = str(converted)
+    return result
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("paths", nargs="+", help="Blueprint CSV files, or directories searched for them")
+    parser.add_argument("--convert", choices=sorted(__CONVERSIONS__), help="Also convert every file to this format")
+    parser.add_argument("-o", "--output", default=".", help="Directory converted files are written to")
+    parser.add_argument("-r", "--report", default=None, help="File the JSON report is written to instead of stdout")
+    parser.add_argument("--strict", action="store_true", help="Fail on parse diagnostics, not only on errors")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes")
+
+
+def run(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    output = Path(args.output)
+    if args.convert:
+        output.mkdir(parents=True, exist_ok=True)
+    jobs = [CheckJob(path, output, args.convert) for path in blueprint_files(args.paths)]
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        results = list(executor.map(check_file, jobs))
+    failed = [r for r in results if r.error or (args.strict and r.diagnostic_count)]
+    report = {
+        "files": [asdict(result) for result in results],
+        "failed": len(failed),
+        "seconds": time.perf_counter() - started,
+    }
+    if args.report:
+        with open(args.report, "w") as fh:
+            json.dump(report, fh, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    for result in failed:
+        print(f"{result.path}: {result.error or f'{result.diagnostic_count} diagnostic(s)'}", file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,91 @@
+"""
+The designer window, e.g.
+
+    python -m qfui --timings library/dreamfort.csv
+
+Qt, numpy and the parser are only imported once the arguments are parsed. The window is shown first, a blueprint
+given on the command line is then imported in the background while the window is already up.
+"""
+import argparse
+import sys
+import time
+from typing import List, Tuple
+
+
+class StartupTimings:
+    """
+    Wall clock durations of the startup phases, each measured from the end of the previous one.
+    """
+
+    def __init__(self):
+        self._started = self._last = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = []
+
+    @property
+    def phases(self) -> List[Tuple[str, float]]:
+        return list(self._phases)
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self._phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self, file=None):
+        file = file or sys.stderr
+        for phase, seconds in self._phases:
+            print(f"{phase:<16} {seconds * 1000:8.1f} ms", file=file)
+        print(f"{'total':<16} {(self._last - self._started) * 1000:8.1f} ms", file=file)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("file", nargs="?", default=None, help="Blueprint CSV file to open")
+    parser.add_argument("--timings", action="store_true", help="Print how long each startup phase took")
+
+
+def run(args: argparse.Namespace) -> int:
+    timings = StartupTimings()
+    from PySide6.QtCore import QTimer
+    from PySide6.QtGui import QImage
+    from PySide6.QtWidgets import QApplication
+
+    import qfui.resources
+    from qfui import sprites
+    from qfui.utils import configure_logging
+    from qfui.widgets.main import MainWindow
+    timings.mark("imports")
+
+    configure_logging()
+    app = QApplication(sys.argv[:1])
+    qfui.resources.initialize()
+    timings.mark("application")
+    main_win = MainWindow()
+    geo = main_win.screen().availableGeometry()
+    main_win.resize(geo.width(), geo.height())
+    timings.mark("window")
+    main_win.show()
+
+    def report():
+        if args.timings:
+            timings.report()
+
+    def imported(*_):
+        # Only the import of the file given on the command line is part of the startup
+        main_win.controller.import_finished.disconnect(imported)
+        main_win.controller.import_failed.disconnect(imported)
+        timings.mark("import")
+        report()
+
+    def shown():
+        # Runs on the first event loop turn, once the window was shown
+        timings.mark("shown")
+        sprites.initialize(QImage("sprites:defaults.png"))
+        timings.mark("sprites")
+        if not args.file:
+            report()
+            return
+        main_win.controller.import_finished.connect(imported)
+        main_win.controller.import_failed.connect(imported)
+        main_win.controller.import_file(args.file)
+
+    QTimer.singleShot(0, shown)
+    return app.exec()
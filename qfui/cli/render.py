@@ -0,0 +1,153 @@
+"""
+Headless rendering of blueprint layers to PNG images, e.g.
+
+    python -m qfui render -o previews library/*.csv
+
+Files are imported and rendered in worker processes using Qt's offscreen platform. Qt is only imported inside the
+workers, so this module is cheap to import for argument parsing.
+"""
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from qfui.cli import blueprint_files, file_stem
+
+__LOGGER__ = logging.getLogger(__name__)
+# Each worker process keeps its own offscreen application alive
+__APP__ = None
+__CELL_PX_SIZES__ = (1, 2, 4, 8, 16)
+__SHEET_GAP_PX__ = 4
+
+
+@dataclass
+class RenderJob:
+
+    path: Path
+    output: Path
+    sections: Sequence[str] = ()
+    z_levels: Sequence[int] = ()
+    cell_px: int = 16
+    sheet: bool = False
+
+
+@dataclass
+class RenderResult:
+
+    path: Path
+    written: List[Path] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _init_worker():
+    # Has to be set before the first Qt import of the process
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from PySide6.QtGui import QGuiApplication, QImage
+
+    import qfui.resources
+    from qfui import sprites
+
+    global __APP__
+    __APP__ = QGuiApplication.instance() or QGuiApplication([])
+    qfui.resources.initialize()
+    sprites.initialize(QImage("sprites:defaults.png"))
+
+
+def _selected(job: RenderJob, section_idx: int, label: str) -> bool:
+    return not job.sections or str(section_idx) in job.sections or label in job.sections
+
+
+def _sheet(images):
+    from PySide6.QtCore import QPoint, Qt
+    from PySide6.QtGui import QImage, QPainter
+
+    width = sum(image.width() for image in images) + __SHEET_GAP_PX__ * (len(images) - 1)
+    height = max(image.height() for image in images)
+    sheet = QImage(width, height, QImage.Format_RGBA8888_Premultiplied)
+    sheet.fill(Qt.transparent)
+    painter = QPainter(sheet)
+    x = 0
+    for image in images:
+        painter.drawImage(QPoint(x, 0), image)
+        x += image.width() + __SHEET_GAP_PX__
+    painter.end()
+    return sheet
+
+
+def render_file(job: RenderJob) -> RenderResult:
+    """
+    Renders the selected DIG sections of a blueprint file, one image per layer or one sheet per section with its
+    layers side by side.
+    """
+    from qfui import rendering
+    from qfui.models.enums import SectionModes
+    from qfui.qfparser.importers import CSVImporter
+
+    result = RenderResult(job.path)
+    try:
+        sections = CSVImporter().load(job.path)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    for sidx, section in enumerate(sections):
+        if section.mode != SectionModes.DIG or not _selected(job, sidx, section.label):
+            continue
+        layers = [layer for layer in section.layers if not job.z_levels or layer.relative_z in job.z_levels]
+        images = [rendering.layer_image(layer, job.cell_px) for layer in layers]
+        stem = f"{file_stem(job.path.stem)}-{sidx:03d}-{file_stem(section.label)}"
+        if job.sheet and images:
+            outputs = [(job.output / f"{stem}.png", _sheet(images))]
+        else:
+            outputs = [
+                (job.output / f"{stem}-z{layer.relative_z}-{lidx:03d}.png", image)
+                for lidx, (layer, image) in enumerate(zip(layers, images))
+            ]
+        for path, image in outputs:
+            if not image.save(str(path), "PNG"):
+                result.error = f"Could not write {path}"
+                return result
+            result.written.append(path)
+    return result
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("paths", nargs="+", help="Blueprint CSV files, or directories searched for them")
+    parser.add_argument("-o", "--output", default=".", help="Directory the PNG images are written to")
+    parser.add_argument(
+        "-s", "--section", action="append", default=[], dest="sections",
+        help="Only render sections with this label or index, may be repeated"
+    )
+    parser.add_argument(
+        "-z", action="append", type=int, default=[], dest="z_levels",
+        help="Only render layers at this relative z level, may be repeated"
+    )
+    parser.add_argument(
+        "--cell-px", type=int, default=16, choices=__CELL_PX_SIZES__, help="Pixels per cell of the rendered images"
+    )
+    parser.add_argument("--sheet", action="store_true", help="Write one image per section with its layers side by side")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes")
+
+
+def run(args: argparse.Namespace) -> int:
+    global __LOGGER__
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    jobs = [
+        RenderJob(path, output, args.sections, args.z_levels, args.cell_px, args.sheet)
+        for path in blueprint_files(args.paths)
+    ]
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker) as executor:
+        futures = [executor.submit(render_file, job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            if result.error:
+                failed += 1
+                __LOGGER__.error(f"{result.path}: {result.error}")
+            else:
+                print(f"{result.path}: {len(result.written)} image(s)")
+    print(f"Rendered {len(jobs) - failed} of {len(jobs)} file(s) to {output}")
+    return 1 if failed else 0
@@ -0,0 +1,63 @@
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from qfui.models.project import Project
+from qfui.qfparser.importers import CSVImporter, ImportCancelled
+
+
+class ImportSignals(QObject):
+
+    progress = Signal(object, int, int, int)
+    finished = Signal(object)
+
+
+class ImportTask(QRunnable):
+    """
+    Imports a CSV file into a new project off the GUI thread. Like the raster tasks it always reports back through the
+    finished signal, with the project, or an error when the import failed or was cancelled.
+    """
+
+    def __init__(self, filepath: Union[str, Path], signals: ImportSignals):
+        super().__init__()
+        self.setAutoDelete(False)
+        self._filepath = filepath
+        self._signals = signals
+        self._cancelled = threading.Event()
+        self._project: Optional[Project] = None
+        self._error: Optional[str] = None
+
+    @property
+    def filepath(self) -> str:
+        return str(self._filepath)
+
+    @property
+    def project(self) -> Optional[Project]:
+        return self._project
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _progress(self, bytes_read: int, total_bytes: int, sections: int):
+        self._signals.progress.emit(self, bytes_read, total_bytes, sections)
+
+    def run(self):
+        try:
+            sections = CSVImporter().load(self._filepath, self._progress, self._cancelled.is_set)
+            self._project = Project(sections)
+        except ImportCancelled:
+            self._error = None
+        except Exception as e:
+            self._error = f"{type(e).__name__}: {e}"
+        finally:
+            self._signals.finished.emit(self)
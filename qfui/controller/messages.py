@@ -1,5 +1,7 @@
+import uuid
 from abc import ABC, abstractmethod, ABCMeta
-from typing import List, Optional, Dict
+from pathlib import Path
+from typing import List, Optional, Dict, Tuple, Union
 
 from PySide6.QtCore import QObject
 
@@ -21,6 +23,19 @@ class ControllerInterface(ABC, QObject, metaclass=QABCMeta):
     def project(self, project: Project):
         pass
 
+    @property
+    @abstractmethod
+    def importing(self) -> bool:
+        pass
+
+    @abstractmethod
+    def import_file(self, filepath: Union[str, Path]):
+        pass
+
+    @abstractmethod
+    def cancel_import(self):
+        pass
+
     @property
     @abstractmethod
     def sections(self) -> List[Section]:
@@ -31,6 +46,14 @@ class ControllerInterface(ABC, QObject, metaclass=QABCMeta):
     def visible_layers(self) -> Dict[SectionLayerIndex, GridLayer]:
         pass
 
+    @abstractmethod
+    def batch(self):
+        pass
+
+    @abstractmethod
+    def flush_notifications(self):
+        pass
+
     @abstractmethod
     def clear_all_visible_layers(self):
         pass
@@ -50,3 +73,34 @@ class ControllerInterface(ABC, QObject, metaclass=QABCMeta):
     @abstractmethod
     def layer_start_position(self, idx: SectionLayerIndex) -> Optional[SectionStart]:
         pass
+
+    @property
+    @abstractmethod
+    def current_z(self) -> int:
+        pass
+
+    @property
+    @abstractmethod
+    def z_sections(self) -> List[uuid.UUID]:
+        pass
+
+    @abstractmethod
+    def add_z_sections(self, suuids: List[uuid.UUID]):
+        pass
+
+    @abstractmethod
+    def remove_z_sections(self, suuids: List[uuid.UUID]):
+        pass
+
+    @abstractmethod
+    def set_current_z(self, z: int):
+        pass
+
+    @abstractmethod
+    def step_z(self, delta: int):
+        pass
+
+    @abstractmethod
+    def layers_at_z(self, z: int) -> List[Tuple[SectionLayerIndex, int]]:
+        """The layers z navigation shows at z, with the z they are shown at"""
+        pass
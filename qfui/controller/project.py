@@ -1,21 +1,53 @@
-from typing import Optional, List, Tuple, Dict
+import logging
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, List, Tuple, Dict, Union
 
-from PySide6.QtCore import Signal
+from PySide6.QtCore import Signal, Slot, QThreadPool, QTimer
 
+from qfui.controller.imports import ImportSignals, ImportTask
 from qfui.controller.messages import ControllerInterface
+from qfui.models.enums import SectionModes
 from qfui.models.layers import GridLayer
+from qfui.models.meta import MetaCycleError
 from qfui.models.project import Project, SectionLayerIndex
 from qfui.models.sections import Section, GridSection, SectionStart
 
+__LOGGER__ = logging.getLogger(__name__)
+
 
 class ProjectController(ControllerInterface):
 
     project_changed = Signal(ControllerInterface)
     layer_visibility_changed = Signal(ControllerInterface, list, list)
+    z_level_changed = Signal(ControllerInterface, int)
+    import_started = Signal(ControllerInterface, str)
+    # Bytes read, file size in bytes and sections parsed so far
+    import_progress = Signal(ControllerInterface, int, int, int)
+    import_finished = Signal(ControllerInterface, str)
+    # File path and the reason, an empty reason means the import was cancelled
+    import_failed = Signal(ControllerInterface, str, str)
 
     def __init__(self, project: Optional[Project] = None):
         super().__init__()
         self._project = project or Project()
+        self._import_pool = QThreadPool(self)
+        self._import_pool.setMaxThreadCount(1)
+        self._import_task: Optional[ImportTask] = None
+        # Cancelled imports that are still running have to report back before they can be let go of
+        self._retired_imports = set()
+        self._import_signals = ImportSignals(self)
+        self._import_signals.progress.connect(self._import_progress)
+        self._import_signals.finished.connect(self._import_finished)
+        self._batch_depth = 0
+        self._notify_scheduled = False
+        # Changes waiting to be notified, insertion ordered
+        self._pending_removed: Dict[SectionLayerIndex, None] = {}
+        self._pending_added: Dict[SectionLayerIndex, None] = {}
+        self._pending_z: Optional[int] = None
+        self._current_z = 0
+        self._z_sections: List[uuid.UUID] = []
 
     @property
     def project(self) -> Project:
@@ -23,9 +55,55 @@ class ProjectController(ControllerInterface):
 
     @project.setter
     def project(self, project: Project):
+        self._pending_removed.clear()
+        self._pending_added.clear()
+        self._pending_z = None
         self._project = project
+        self._current_z = 0
+        self._z_sections = []
         self.project_changed.emit(self)
 
+    @property
+    def importing(self) -> bool:
+        return self._import_task is not None
+
+    def import_file(self, filepath: Union[str, Path]):
+        """
+        Imports the file in the background, the current project stays in place until the new one replaces it at once.
+        An import that is still running is cancelled.
+        """
+        self.cancel_import()
+        self._import_task = ImportTask(filepath, self._import_signals)
+        self._import_pool.start(self._import_task)
+        self.import_started.emit(self, str(filepath))
+
+    def cancel_import(self):
+        if not (task := self._import_task):
+            return
+        self._import_task = None
+        task.cancel()
+        if not self._import_pool.tryTake(task):
+            self._retired_imports.add(task)
+        self.import_failed.emit(self, task.filepath, "")
+
+    @Slot(object, int, int, int)
+    def _import_progress(self, task: ImportTask, bytes_read: int, total_bytes: int, sections: int):
+        if task is self._import_task:
+            self.import_progress.emit(self, bytes_read, total_bytes, sections)
+
+    @Slot(object)
+    def _import_finished(self, task: ImportTask):
+        # Cancelled imports were already reported
+        self._retired_imports.discard(task)
+        if task is not self._import_task:
+            return
+        self._import_task = None
+        if task.project is None:
+            self.import_failed.emit(self, task.filepath, task.error or "")
+            return
+        self.project = task.project
+        self.import_finished.emit(self, task.filepath)
+
     @property
     def sections(self) -> List[Section]:
         return self._project.sections
@@ -45,20 +123,66 @@ class ProjectController(ControllerInterface):
             layer.visible = False if remove else True
         return modified
 
-    def clear_all_visible_layers(self):
-        if not self.project.visible_layers:
+    @contextmanager
+    def batch(self):
+        """
+        Holds back change notifications until the outermost batch ends, they are then emitted merged into one.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush_notifications()
+
+    def _schedule_notifications(self):
+        # Outside of a batch, changes made within the same event loop turn are notified together once control returns
+        # to the event loop
+        if self._batch_depth or self._notify_scheduled:
             return
-        removed = [i for i in self.project.visible_layers]
-        self.project.visible_layers.clear()
-        self.layer_visibility_changed.emit(self, removed, [])
+        self._notify_scheduled = True
+        QTimer.singleShot(0, self.flush_notifications)
+
+    def _queue_visibility_change(self, removed: List[SectionLayerIndex], added: List[SectionLayerIndex]):
+        # A layer that is shown again before its removal was notified (or the other way around) did not change at all
+        for idx in removed:
+            if idx in self._pending_added:
+                del self._pending_added[idx]
+            else:
+                self._pending_removed[idx] = None
+        for idx in added:
+            if idx in self._pending_removed:
+                del self._pending_removed[idx]
+            else:
+                self._pending_added[idx] = None
+        if removed or added:
+            self._schedule_notifications()
+
+    def _queue_z_change(self, z: int):
+        self._pending_z = z
+        self._schedule_notifications()
+
+    def flush_notifications(self):
+        """Emits the changes waiting to be notified right away"""
+        self._notify_scheduled = False
+        removed, added = list(self._pending_removed), list(self._pending_added)
+        z, self._pending_z = self._pending_z, None
+        self._pending_removed.clear()
+        self._pending_added.clear()
+        if removed or added:
+            self.layer_visibility_changed.emit(self, removed, added)
+        if z is not None:
+            self.z_level_changed.emit(self, z)
+
+    def clear_all_visible_layers(self):
+        self._queue_visibility_change(self._update_visible_layers(list(self.visible_layers), True), [])
 
     def set_layers_as_visible(self, visible: List[SectionLayerIndex]):
-        if added := self._update_visible_layers(visible):
-            self.layer_visibility_changed.emit(self, [], added)
+        self._queue_visibility_change([], self._update_visible_layers(visible))
 
     def remove_layers_as_visible(self, remove: List[SectionLayerIndex]):
-        if removed := self._update_visible_layers(remove, True):
-            self.layer_visibility_changed.emit(self, removed, [])
+        self._queue_visibility_change(self._update_visible_layers(remove, True), [])
 
     def grid_layer(self, idx: SectionLayerIndex) -> Optional[GridLayer]:
         return self._project.get_grid_layer(idx)
@@ -67,3 +191,71 @@ class ProjectController(ControllerInterface):
         if not (section := self._project.get_section(idx.suuid)):
             return None
         return section.start
+
+    @property
+    def current_z(self) -> int:
+        return self._current_z
+
+    @property
+    def z_sections(self) -> List[uuid.UUID]:
+        return list(self._z_sections)
+
+    def _z_section_layers(self, suuids: List[uuid.UUID]) -> List[Tuple[SectionLayerIndex, int]]:
+        """The layers of the given sections with their relative z, meta sections apply the layers they reference"""
+        ret = []
+        for suuid in suuids:
+            if isinstance(section := self._project.get_section(suuid), GridSection):
+                ret += [(SectionLayerIndex(suuid, layer.luuid), layer.relative_z) for layer in section.layers]
+            elif section is not None and section.mode == SectionModes.META:
+                try:
+                    composed = self._project.resolve_meta(section.label)
+                except MetaCycleError as e:
+                    __LOGGER__.warning(f"Could not resolve {section.label}: {e}")
+                    continue
+                ret += [(SectionLayerIndex(layer.suuid, layer.luuid), layer.relative_z) for layer in composed.layers]
+        return ret
+
+    def _show_z(self, suuids: List[uuid.UUID], z: int):
+        """Makes the layers of the given sections at z visible and hides every other of their layers"""
+        layers = self._z_section_layers(suuids)
+        # Meta sections can apply the same layer on several levels
+        shown = {i: None for i, relative_z in layers if relative_z == z}
+        removed = self._update_visible_layers([i for i, _ in layers if i not in shown], True)
+        added = self._update_visible_layers(list(shown))
+        self._queue_visibility_change(removed, added)
+
+    def add_z_sections(self, suuids: List[uuid.UUID]):
+        added = [s for s in suuids if s not in self._z_sections and self._project.get_section(s)]
+        if not added:
+            return
+        self._z_sections += added
+        self._show_z(added, self._current_z)
+        self._queue_z_change(self._current_z)
+
+    def remove_z_sections(self, suuids: List[uuid.UUID]):
+        if not (removed := [s for s in self._z_sections if s in suuids]):
+            return
+        self._z_sections = [s for s in self._z_sections if s not in suuids]
+        # Layers the remaining sections show as well stay visible
+        remaining = {i for i, _ in self._z_section_layers(self._z_sections)}
+        hidden = [i for i, _ in self._z_section_layers(removed) if i not in remaining]
+        self._queue_visibility_change(self._update_visible_layers(hidden, True), [])
+        # The current z has to stay within the levels of the remaining sections
+        self.set_current_z(self._current_z)
+
+    def set_current_z(self, z: int):
+        if levels := [relative_z for _, relative_z in self._z_section_layers(self._z_sections)]:
+            z = min(max(z, min(levels)), max(levels))
+        if z == self._current_z:
+            return
+        self._current_z = z
+        self._show_z(self._z_sections, z)
+        self._queue_z_change(z)
+
+    def step_z(self, delta: int):
+        self.set_current_z(self._current_z + delta)
+
+    def layers_at_z(self, z: int) -> List[Tuple[SectionLayerIndex, int]]:
+        # Meta sections can apply the same layer on several levels, it is shown at z once
+        shown = {i: None for i, relative_z in self._z_section_layers(self._z_sections) if relative_z == z}
+        return [(i, z) for i in shown]
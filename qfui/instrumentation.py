@@ -0,0 +1,116 @@
+"""
+Cheap timing and counting hooks for the performance HUD. While instrumentation is disabled the hooks are swapped for
+functions that do nothing, so call sites always go through the module attribute, e.g.
+
+    started = instrumentation.start()
+    ...
+    instrumentation.add_frame_time("layer_paint", started)
+
+Frame values are accumulated between begin_frame and end_frame and kept as the last frame once it ends, times are in
+nanoseconds from the monotonic performance counter. Counters can be bumped from worker threads, frame values and
+timings only from the GUI thread.
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Dict
+
+__ENABLED__ = False
+__FRAME__ = defaultdict(int)
+__LAST_FRAME__: Dict[str, int] = {}
+__TIMINGS__: Dict[str, int] = {}
+__COUNTERS__ = defaultdict(int)
+__COUNTERS_LOCK__ = threading.Lock()
+
+
+def _noop(*_) -> int:
+    return 0
+
+
+def _start() -> int:
+    return time.perf_counter_ns()
+
+
+def _add_frame_time(name: str, started: int):
+    global __FRAME__
+    if started:
+        __FRAME__[name] += time.perf_counter_ns() - started
+        __FRAME__[f"{name}.count"] += 1
+
+
+def _add_frame_count(name: str, count: int = 1):
+    global __FRAME__
+    __FRAME__[name] += count
+
+
+def _record_time(name: str, started: int):
+    global __TIMINGS__
+    if started:
+        __TIMINGS__[name] = time.perf_counter_ns() - started
+
+
+def _count(name: str, count: int = 1):
+    global __COUNTERS__, __COUNTERS_LOCK__
+    with __COUNTERS_LOCK__:
+        __COUNTERS__[name] += count
+
+
+def _begin_frame() -> int:
+    global __FRAME__
+    __FRAME__.clear()
+    return time.perf_counter_ns()
+
+
+def _end_frame(started: int):
+    global __FRAME__, __LAST_FRAME__
+    if started:
+        __FRAME__["frame"] = time.perf_counter_ns() - started
+        __LAST_FRAME__ = dict(__FRAME__)
+
+
+start = _noop
+add_frame_time = _noop
+add_frame_count = _noop
+record_time = _noop
+count = _noop
+begin_frame = _noop
+end_frame = _noop
+
+
+def enabled() -> bool:
+    return __ENABLED__
+
+
+def set_enabled(enable: bool):
+    global __ENABLED__, start, add_frame_time, add_frame_count, record_time, count, begin_frame, end_frame
+    __ENABLED__ = enable
+    start = _start if enable else _noop
+    add_frame_time = _add_frame_time if enable else _noop
+    add_frame_count = _add_frame_count if enable else _noop
+    record_time = _record_time if enable else _noop
+    count = _count if enable else _noop
+    begin_frame = _begin_frame if enable else _noop
+    end_frame = _end_frame if enable else _noop
+
+
+def reset():
+    global __FRAME__, __LAST_FRAME__, __TIMINGS__, __COUNTERS__, __COUNTERS_LOCK__
+    __FRAME__.clear()
+    __LAST_FRAME__ = {}
+    __TIMINGS__.clear()
+    with __COUNTERS_LOCK__:
+        __COUNTERS__.clear()
+
+
+def last_frame() -> Dict[str, int]:
+    return __LAST_FRAME__
+
+
+def timings() -> Dict[str, int]:
+    return __TIMINGS__
+
+
+def counters() -> Dict[str, int]:
+    global __COUNTERS__, __COUNTERS_LOCK__
+    with __COUNTERS_LOCK__:
+        return dict(__COUNTERS__)
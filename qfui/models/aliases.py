@@ -0,0 +1,146 @@
+"""
+Expansion of the aliases defined in #aliases sections. Every row of such a section defines one alias as
+"name: text", the text can reference other aliases as "{name}" or "{name N}" to repeat one N times. A cell of a query
+or place layer references aliases the same way, or consists of the name of an alias alone, e.g.
+
+    table = project_aliases(project.sections)
+    texts = table.expand_layer(layer)
+
+The definitions are compiled once into their full expansions, nested aliases included, so expanding a cell is a
+single scan of its text with dictionary lookups. Tables are shared by every project with the same definitions and
+remember the cell texts they recently expanded, query layers repeat the same few texts over and over.
+"""
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy
+
+from qfui.models.enums import SectionModes
+from qfui.models.layers import GridLayer
+from qfui.models.sections import RawSection, Section
+
+__LOGGER__ = logging.getLogger(__name__)
+__DEFINITION_REGEX__ = re.compile(r"^\s*(?P<name>[\w-]{2,})\s*:\s*(?P<text>.*?)\s*$")
+__REFERENCE_REGEX__ = re.compile(r"\{(?P<name>[^{}\s]+)(?:\s+(?P<repeat>\d+))?\}")
+# Compiled tables by their definitions, least recently used first
+__TABLES__: "OrderedDict[FrozenSet[Tuple[str, str]], AliasTable]" = OrderedDict()
+__MAX_TABLES__ = 16
+# Expanded cell texts remembered per table
+__MAX_EXPANDED_TEXTS__ = 4096
+
+
+def parse_aliases(section: RawSection) -> Dict[str, str]:
+    global __DEFINITION_REGEX__, __LOGGER__
+    definitions = {}
+    for raw_line in section.layer.raw_lines if section.layer else []:
+        line = raw_line[0].strip() if raw_line else ""
+        if not line or line.startswith("#"):
+            continue
+        if not (matches := __DEFINITION_REGEX__.match(line)):
+            __LOGGER__.info(f"Aliases {section.label}: could not parse '{line}'")
+            continue
+        definitions[matches.group("name")] = matches.group("text")
+    return definitions
+
+
+class AliasTable:
+    """
+    The full expansions of a set of alias definitions. References to names that are not aliases (e.g. key codes like
+    {Right}) are kept as they are, as are the aliases that reference themselves, directly or through other ones.
+    """
+
+    def __init__(self, definitions: Dict[str, str]):
+        self._definitions = dict(definitions)
+        self._expansions: Dict[str, str] = {}
+        # Aliases that reference themselves are never expanded
+        self._cyclic: Set[str] = set()
+        for name in self._definitions:
+            self._compile(name, [])
+        # Expanded cell texts by their text, least recently used first
+        self._expanded: "OrderedDict[str, str]" = OrderedDict()
+        self._scans = 0
+
+    @property
+    def expansions(self) -> Dict[str, str]:
+        return dict(self._expansions)
+
+    @property
+    def scans(self) -> int:
+        """Cell texts expanded so far that were not remembered from an earlier expansion"""
+        return self._scans
+
+    def _compile(self, name: str, compiling: List[str]) -> Optional[str]:
+        global __REFERENCE_REGEX__, __LOGGER__
+        if name in self._expansions or name in self._cyclic:
+            return self._expansions.get(name)
+        if name in compiling:
+            cycle = compiling[compiling.index(name):]
+            self._cyclic.update(cycle)
+            __LOGGER__.info(f"Aliases reference each other: {' -> '.join(cycle + [name])}")
+            return None
+        compiling.append(name)
+
+        def substitute(matches: re.Match) -> str:
+            referenced = matches.group("name")
+            if referenced not in self._definitions or (expansion := self._compile(referenced, compiling)) is None:
+                return matches.group(0)
+            return expansion * int(matches.group("repeat") or 1)
+
+        expansion = __REFERENCE_REGEX__.sub(substitute, self._definitions[name])
+        compiling.pop()
+        if name in self._cyclic:
+            return None
+        self._expansions[name] = expansion
+        return expansion
+
+    def _substitute(self, matches: re.Match) -> str:
+        if (expansion := self._expansions.get(matches.group("name"))) is None:
+            return matches.group(0)
+        return expansion * int(matches.group("repeat") or 1)
+
+    def expand(self, text: str) -> str:
+        global __REFERENCE_REGEX__, __MAX_EXPANDED_TEXTS__
+        if (expanded := self._expanded.get(text)) is not None:
+            self._expanded.move_to_end(text)
+            return expanded
+        self._scans += 1
+        if (expanded := self._expansions.get(text.strip())) is None:
+            expanded = __REFERENCE_REGEX__.sub(self._substitute, text) if "{" in text else text
+        self._expanded[text] = expanded
+        while len(self._expanded) > __MAX_EXPANDED_TEXTS__:
+            self._expanded.popitem(last=False)
+        return expanded
+
+    def expand_layer(self, layer: GridLayer) -> numpy.ndarray:
+        """
+        The expanded texts of a layer's cells, None for empty cells and cells without text such as designations.
+        """
+        expanded = numpy.full(layer.cells.shape, None, dtype=object)
+        for (x, y), cell in numpy.ndenumerate(layer.cells):
+            if (text := getattr(cell, "code_text", None)) is not None:
+                expanded[x, y] = self.expand(text)
+        return expanded
+
+
+def compile_aliases(definitions: Dict[str, str]) -> AliasTable:
+    """The table of the definitions, compiled once for every set of definitions"""
+    global __TABLES__, __MAX_TABLES__
+    key = frozenset(definitions.items())
+    if (table := __TABLES__.get(key)) is not None:
+        __TABLES__.move_to_end(key)
+        return table
+    table = __TABLES__[key] = AliasTable(definitions)
+    while len(__TABLES__) > __MAX_TABLES__:
+        __TABLES__.popitem(last=False)
+    return table
+
+
+def project_aliases(sections: Iterable[Section]) -> AliasTable:
+    """The aliases of all #aliases sections, later definitions of a name replace earlier ones"""
+    definitions = {}
+    for section in sections:
+        if section.mode == SectionModes.ALIASES and isinstance(section, RawSection):
+            definitions.update(parse_aliases(section))
+    return compile_aliases(definitions)
@@ -1,13 +1,37 @@
 from __future__ import annotations
 
+import hashlib
 import uuid
 from abc import ABC
 from dataclasses import dataclass, field
-from typing import List, Generator, Tuple
+from typing import List, Generator, Optional, Tuple
 
 import numpy
 
 from qfui.models.cells import Cell
+from qfui.models.enums import Designations
+
+
+# Compact per cell encoding of a grid layer: 0 is an empty cell, 1..N are the designations in definition order and
+# N + 1 is any other cell (e.g. the unprocessed cells of build / query layers).
+EMPTY_CELL_CODE = 0
+OTHER_CELL_CODE = len(Designations) + 1
+__DESIGNATION_CODES__ = {d: c for c, d in enumerate(Designations, start=1)}
+__CODE_DESIGNATIONS__ = (None, *Designations, None)
+
+
+def cell_code(cell: Optional[Cell]) -> int:
+    if cell is None:
+        return EMPTY_CELL_CODE
+    return designation_code(getattr(cell, "designation", None))
+
+
+def designation_code(designation: Optional[Designations]) -> int:
+    return __DESIGNATION_CODES__.get(designation, OTHER_CELL_CODE)
+
+
+def code_designation(code: int) -> Optional[Designations]:
+    return __CODE_DESIGNATIONS__[code]
 
 
 @dataclass
@@ -44,6 +68,27 @@ class GridLayer(Layer):
         super().__post_init__()
         self.width = self.cells.shape[0]
         self.height = self.cells.shape[1]
+        self._designation_codes = None
+        self._content_hash = None
+
+    @property
+    def designation_codes(self) -> numpy.ndarray:
+        if self._designation_codes is None:
+            encode = numpy.frompyfunc(cell_code, 1, 1)
+            self._designation_codes = encode(self.cells).astype(numpy.uint8)
+        return self._designation_codes
+
+    @property
+    def content_hash(self) -> str:
+        """
+        Digest of the layer's designation codes, layers that draw the same share it regardless of their uuid.
+        """
+        if self._content_hash is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(numpy.array(self.designation_codes.shape, dtype=numpy.int64).tobytes())
+            digest.update(numpy.ascontiguousarray(self.designation_codes).tobytes())
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
 
     def walk(self, filter_check: callable) -> Generator[Tuple[int, int, Cell], None, None]:
         for (x, y), cell in numpy.ndenumerate(self.cells):
@@ -0,0 +1,153 @@
+"""
+Checks of dig sections for common blueprint mistakes. The layers of a section are stacked into a single array of
+designation codes by relative z, every rule is then a boolean mask over the whole stack, e.g.
+
+    issues = lint_sections(project.sections)
+
+Layers further down have a higher relative z ("#>" moves down a level).
+"""
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy
+
+from qfui.models.enums import Designations, SectionModes
+from qfui.models.layers import EMPTY_CELL_CODE, OTHER_CELL_CODE, designation_code
+from qfui.models.sections import GridSection, Section
+
+
+@dataclass(frozen=True)
+class LintIssue:
+
+    rule: str
+    suuid: uuid.UUID
+    luuid: uuid.UUID
+    relative_z: int
+    x: int
+    y: int
+    message: str
+
+
+def _code_table(*designations: Designations) -> numpy.ndarray:
+    """Lookup table from designation code to whether it is one of the designations"""
+    table = numpy.zeros(OTHER_CELL_CODE + 1, dtype=bool)
+    table[[designation_code(d) for d in designations]] = True
+    return table
+
+
+__DUG__ = _code_table(
+    Designations.MINE, Designations.CHANNEL, Designations.UP_STAIR, Designations.DOWN_STAIR,
+    Designations.UP_DOWN_STAIR, Designations.RAMP,
+)
+__CHANNEL__ = _code_table(Designations.CHANNEL)
+__STAIRS_DOWN__ = _code_table(Designations.DOWN_STAIR, Designations.UP_DOWN_STAIR)
+__STAIRS_UP__ = _code_table(Designations.UP_STAIR, Designations.UP_DOWN_STAIR)
+
+
+class LayerStack:
+    """
+    The designation codes of a section's layers as one (levels, width, height) array from its topmost to its
+    bottommost relative z. Layers are padded with empty cells to the largest layer, levels without a layer are empty
+    and marked as absent.
+
+    Every layer is placed by the section's start, the footprint is the width and height of the topmost layer the
+    start refers to.
+    """
+
+    def __init__(self, section: GridSection):
+        self.section = section
+        top = min(section.layers, key=lambda layer: layer.relative_z)
+        self.top_z = top.relative_z
+        self.footprint = top.width, top.height
+        levels = max(layer.relative_z for layer in section.layers) - self.top_z + 1
+        width = max(layer.width for layer in section.layers)
+        height = max(layer.height for layer in section.layers)
+        self.codes = numpy.full((levels, width, height), EMPTY_CELL_CODE, dtype=numpy.uint8)
+        self.present = numpy.zeros(levels, dtype=bool)
+        self.luuids: List[Optional[uuid.UUID]] = [None] * levels
+        for layer in section.layers:
+            level = layer.relative_z - self.top_z
+            self.codes[level, :layer.width, :layer.height] = layer.designation_codes
+            self.present[level] = True
+            self.luuids[level] = layer.luuid
+
+    @property
+    def below_present(self) -> numpy.ndarray:
+        """Whether the level below each level (all but the bottom one) has a layer, broadcastable over the cells"""
+        return self.present[1:, None, None]
+
+    @property
+    def above_present(self) -> numpy.ndarray:
+        """Whether the level above each level (all but the top one) has a layer, broadcastable over the cells"""
+        return self.present[:-1, None, None]
+
+
+# A rule returns masks over the stack levels they apply to, with the offset of their first level
+Rule = Callable[[LayerStack], Iterable[Tuple[int, numpy.ndarray]]]
+
+
+def _channel_over_undug(stack: LayerStack):
+    global __CHANNEL__, __DUG__
+    yield 0, __CHANNEL__[stack.codes[:-1]] & ~__DUG__[stack.codes[1:]] & stack.below_present
+
+
+def _stairs_down_unconnected(stack: LayerStack):
+    global __STAIRS_DOWN__, __STAIRS_UP__
+    yield 0, __STAIRS_DOWN__[stack.codes[:-1]] & ~__STAIRS_UP__[stack.codes[1:]] & stack.below_present
+
+
+def _stairs_up_unconnected(stack: LayerStack):
+    global __STAIRS_DOWN__, __STAIRS_UP__
+    yield 1, __STAIRS_UP__[stack.codes[1:]] & ~__STAIRS_DOWN__[stack.codes[:-1]] & stack.above_present
+
+
+def _cells_outside_footprint(stack: LayerStack):
+    width, height = stack.footprint
+    mask = stack.codes != EMPTY_CELL_CODE
+    mask[:, :width, :height] = False
+    yield 0, mask
+
+
+def _start_outside_footprint(stack: LayerStack):
+    start = stack.section.start
+    width, height = stack.footprint
+    if 0 <= start.x < width and 0 <= start.y < height:
+        return
+    # Reported on the first layer at the nearest cell of the footprint
+    mask = numpy.zeros((1,) + stack.codes.shape[1:], dtype=bool)
+    mask[0, min(max(start.x, 0), width - 1), min(max(start.y, 0), height - 1)] = True
+    yield int(numpy.argmax(stack.present)), mask
+
+
+RULES: Dict[str, Tuple[Rule, str]] = {
+    "channel-over-undug": (_channel_over_undug, "Channel with nothing dug on the level below"),
+    "stairs-down-unconnected": (_stairs_down_unconnected, "Down stair without an up stair on the level below"),
+    "stairs-up-unconnected": (_stairs_up_unconnected, "Up stair without a down stair on the level above"),
+    "cell-outside-footprint": (_cells_outside_footprint, "Designation outside of the footprint of the first layer"),
+    "start-outside-footprint": (_start_outside_footprint, "Start position lies outside of the first layer"),
+}
+
+
+def lint_section(section: Section, rules: Optional[Iterable[str]] = None) -> List[LintIssue]:
+    """
+    Issues of a dig section for the given rules, all rules by default. Other sections have no issues.
+    """
+    global RULES
+    if section.mode != SectionModes.DIG or not isinstance(section, GridSection) or not section.layers:
+        return []
+    stack = LayerStack(section)
+    issues = []
+    for name in (RULES if rules is None else rules):
+        rule, message = RULES[name]
+        for offset, mask in rule(stack):
+            for level, x, y in numpy.argwhere(mask):
+                level = int(level) + offset
+                issues.append(LintIssue(
+                    name, section.suuid, stack.luuids[level], stack.top_z + level, int(x), int(y), message
+                ))
+    return issues
+
+
+def lint_sections(sections: Iterable[Section], rules: Optional[Iterable[str]] = None) -> List[LintIssue]:
+    return [issue for section in sections for issue in lint_section(section, rules)]
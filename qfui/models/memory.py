@@ -0,0 +1,98 @@
+"""
+Estimates of the memory retained by the model. Sizes are the sum of sys.getsizeof over everything reachable from a
+section that is not shared with other sections (enum members, classes, ...), the cells of a layer's object array
+included. Objects reachable from several sections count for the first one only.
+"""
+import enum
+import sys
+import types
+import uuid
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Set
+
+import numpy
+
+from qfui.models.sections import GridSection, Section
+
+# Shared by everything using them rather than owned by a section
+__SHARED_TYPES__ = (enum.Enum, type, types.ModuleType, types.FunctionType, types.MethodType, bool, type(None))
+
+
+def deep_sizeof(obj, seen: Optional[Set[int]] = None) -> int:
+    global __SHARED_TYPES__
+    seen = set() if seen is None else seen
+    size = 0
+    pending = [obj]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, __SHARED_TYPES__):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, numpy.ndarray):
+            if obj.dtype == object:
+                pending.extend(obj.ravel())
+            if obj.base is not None:
+                pending.append(obj.base)
+        elif isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            pending.append(obj.__dict__)
+    return size
+
+
+@dataclass
+class SectionMemory:
+
+    suuid: uuid.UUID
+    label: str
+    mode: str
+    bytes: int
+    layers: int = 0
+    cells: int = 0
+
+
+@dataclass
+class MemoryReport:
+
+    sections: List[SectionMemory] = field(default_factory=list)
+
+    @property
+    def bytes(self) -> int:
+        return sum(section.bytes for section in self.sections)
+
+    @property
+    def layers(self) -> int:
+        return sum(section.layers for section in self.sections)
+
+    @property
+    def cells(self) -> int:
+        return sum(section.cells for section in self.sections)
+
+    def per_section(self) -> float:
+        return self.bytes / len(self.sections) if self.sections else 0.0
+
+    def per_layer(self) -> float:
+        """Bytes of the grid sections per layer they hold"""
+        grid_bytes = sum(section.bytes for section in self.sections if section.layers)
+        return grid_bytes / self.layers if self.layers else 0.0
+
+    def per_cell(self) -> float:
+        """Bytes of the grid sections per occupied cell they hold"""
+        grid_bytes = sum(section.bytes for section in self.sections if section.layers)
+        return grid_bytes / self.cells if self.cells else 0.0
+
+
+def memory_report(sections: Iterable[Section]) -> MemoryReport:
+    report = MemoryReport()
+    seen = set()
+    for section in sections:
+        layers = section.layers if isinstance(section, GridSection) else []
+        report.sections.append(SectionMemory(
+            section.suuid, section.label, section.mode.value if section.mode else "", deep_sizeof(section, seen),
+            len(layers), sum(int(numpy.count_nonzero(layer.cells)) for layer in layers),
+        ))
+    return report
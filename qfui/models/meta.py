@@ -0,0 +1,159 @@
+"""
+Resolution of #meta sections into the layers they apply. Every row of a meta section references another section by
+label ("/label", or "sheet/label" as in blueprints converted from spreadsheets), "#>" and "#<" rows move the following
+references a level down or up like in grid sections. Referenced meta sections are resolved in turn, e.g.
+
+    composed = MetaResolver(project.sections).resolve("dig_all_underground")
+    top_level = composed.at_z(composed.levels[0])
+
+The references form a graph over the section labels, which has to be acyclic. Compositions are memoized, replacing a
+section only drops the compositions depending on it, so resolving a meta section again reuses everything it shares
+with previously resolved ones.
+"""
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from qfui.models.enums import SectionModes
+from qfui.models.layers import GridLayer
+from qfui.models.sections import GridSection, RawSection, Section
+
+
+class MetaCycleError(Exception):
+
+    def __init__(self, cycle: List[str]):
+        super().__init__(f"Meta sections reference each other: {' -> '.join(cycle)}")
+        self.cycle = cycle
+
+
+@dataclass(frozen=True)
+class MetaReference:
+
+    label: str
+    relative_z: int
+
+
+@dataclass(frozen=True)
+class ComposedLayer:
+
+    suuid: uuid.UUID
+    layer: GridLayer
+    relative_z: int
+
+    @property
+    def luuid(self) -> uuid.UUID:
+        return self.layer.luuid
+
+
+@dataclass(frozen=True)
+class ComposedBlueprint:
+
+    label: str
+    layers: Tuple[ComposedLayer, ...] = ()
+    # Labels referenced along the way without a section
+    missing: Tuple[str, ...] = ()
+
+    @property
+    def levels(self) -> List[int]:
+        return sorted({layer.relative_z for layer in self.layers})
+
+    def at_z(self, z: int) -> List[ComposedLayer]:
+        return [layer for layer in self.layers if layer.relative_z == z]
+
+
+def parse_references(section: RawSection) -> List[MetaReference]:
+    references = []
+    relative_z = 0
+    for raw_line in section.layer.raw_lines if section.layer else []:
+        cell = raw_line[0].strip() if raw_line else ""
+        if cell in ("#>", "#<"):
+            relative_z += 1 if cell == "#>" else -1
+        elif cell and not cell.startswith("#"):
+            # Only the label of a blueprint id is kept, any options following it are not
+            references.append(MetaReference(cell.split()[0].rsplit("/", 1)[-1], relative_z))
+    return references
+
+
+class MetaResolver:
+    """
+    Memoized compositions of the sections by label. Grid sections compose to their own layers, other sections that
+    are not meta sections to nothing.
+    """
+
+    def __init__(self, sections: Iterable[Section] = ()):
+        self._sections: Dict[str, Section] = {}
+        for section in sections:
+            # Quickfort uses the first of several sections with the same label
+            self._sections.setdefault(section.label, section)
+        self._references: Dict[str, Tuple[MetaReference, ...]] = {}
+        self._resolved: Dict[str, ComposedBlueprint] = {}
+        # Labels of the meta sections directly referencing a label, edges of resolved meta sections only
+        self._dependents: Dict[str, Set[str]] = {}
+
+    def section(self, label: str) -> Optional[Section]:
+        return self._sections.get(label)
+
+    def references(self, label: str) -> Tuple[MetaReference, ...]:
+        if (references := self._references.get(label)) is not None:
+            return references
+        section = self._sections.get(label)
+        if section is None or section.mode != SectionModes.META or not isinstance(section, RawSection):
+            references = ()
+        else:
+            references = tuple(parse_references(section))
+        self._references[label] = references
+        return references
+
+    def resolve(self, label: str) -> ComposedBlueprint:
+        return self._resolve(label, [])
+
+    def _resolve(self, label: str, resolving: List[str]) -> ComposedBlueprint:
+        if (composed := self._resolved.get(label)) is not None:
+            return composed
+        if label in resolving:
+            raise MetaCycleError(resolving[resolving.index(label):] + [label])
+        section = self._sections.get(label)
+        if isinstance(section, GridSection):
+            composed = ComposedBlueprint(label, tuple(
+                ComposedLayer(section.suuid, layer, layer.relative_z) for layer in section.layers
+            ))
+        elif section is None:
+            composed = ComposedBlueprint(label, missing=(label,))
+        else:
+            resolving.append(label)
+            layers, missing = [], []
+            for reference in self.references(label):
+                self._dependents.setdefault(reference.label, set()).add(label)
+                referenced = self._resolve(reference.label, resolving)
+                layers += [
+                    ComposedLayer(layer.suuid, layer.layer, layer.relative_z + reference.relative_z)
+                    for layer in referenced.layers
+                ]
+                missing += [m for m in referenced.missing if m not in missing]
+            resolving.pop()
+            composed = ComposedBlueprint(label, tuple(layers), tuple(missing))
+        self._resolved[label] = composed
+        return composed
+
+    def is_resolved(self, label: str) -> bool:
+        return label in self._resolved
+
+    def update_section(self, section: Section):
+        """Replaces the section with the same label, or adds it"""
+        self._sections[section.label] = section
+        self.invalidate(section.label)
+
+    def remove_section(self, label: str):
+        self._sections.pop(label, None)
+        self.invalidate(label)
+
+    def invalidate(self, label: str):
+        """Drops the composition of the label and of every meta section depending on it"""
+        # The references of a replaced meta section are parsed again, it no longer depends on the previous ones
+        for reference in self._references.pop(label, ()):
+            self._dependents.get(reference.label, set()).discard(label)
+        pending = [label]
+        while pending:
+            label = pending.pop()
+            self._resolved.pop(label, None)
+            pending += self._dependents.pop(label, ())
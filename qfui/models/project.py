@@ -2,7 +2,11 @@ import uuid
 from dataclasses import dataclass, field
 from typing import List, Optional, Callable, Generator
 
+from qfui.models import memory
+from qfui.models.aliases import AliasTable, project_aliases
+from qfui.models.enums import SectionModes
 from qfui.models.layers import GridLayer, Layer
+from qfui.models.meta import ComposedBlueprint, MetaResolver
 from qfui.models.sections import Section, GridSection
 
 
@@ -26,13 +30,57 @@ class Project:
         self._section_lookup = {}
         self._section_layer_lookup = {}
         for s in self.sections:
-            self._section_lookup[s.suuid] = s
-            if not isinstance(s, GridSection):
-                continue
-            self._section_layer_lookup.update({
-                SectionLayerIndex(s.suuid, layer.luuid): layer
-                for layer in s.layers
-            })
+            self._index_section(s)
+        self._meta_resolver = MetaResolver(self.sections)
+        self._aliases: Optional[AliasTable] = None
+
+    def _index_section(self, section: Section):
+        self._section_lookup[section.suuid] = section
+        if not isinstance(section, GridSection):
+            return
+        self._section_layer_lookup.update({
+            SectionLayerIndex(section.suuid, layer.luuid): layer
+            for layer in section.layers
+        })
+
+    def _forget_section(self, section: Section):
+        self._section_lookup.pop(section.suuid, None)
+        for layer in section.layers if isinstance(section, GridSection) else []:
+            self._section_layer_lookup.pop(SectionLayerIndex(section.suuid, layer.luuid), None)
+
+    def _update_meta(self, label: str):
+        # Quickfort uses the first of several sections with the same label
+        if (first := next((s for s in self.sections if s.label == label), None)) is None:
+            self._meta_resolver.remove_section(label)
+        else:
+            self._meta_resolver.update_section(first)
+
+    def replace_section(self, section: Section):
+        """
+        Replaces the section with the same suuid, or adds it. Only the meta compositions depending on its label, or on
+        the label of the section it replaces, are resolved again, the aliases only when an #aliases section changed.
+        """
+        row = next((row for row, s in enumerate(self.sections) if s.suuid == section.suuid), None)
+        previous = self.sections[row] if row is not None else None
+        if previous is not None:
+            self._forget_section(previous)
+            self.sections[row] = section
+        else:
+            self.sections.append(section)
+        self._index_section(section)
+        for label in {section.label} | ({previous.label} if previous is not None else set()):
+            self._update_meta(label)
+        if SectionModes.ALIASES in (section.mode, previous.mode if previous is not None else None):
+            self._aliases = None
+
+    def remove_section(self, suuid: uuid.UUID):
+        if (section := self._section_lookup.get(suuid)) is None:
+            return
+        del self.sections[next(row for row, s in enumerate(self.sections) if s.suuid == suuid)]
+        self._forget_section(section)
+        self._update_meta(section.label)
+        if section.mode == SectionModes.ALIASES:
+            self._aliases = None
 
     def get_grid_layer(self, section_layer_id: SectionLayerIndex) -> Optional[GridLayer]:
         return self._section_layer_lookup.get(section_layer_id, None)
@@ -45,3 +93,22 @@ class Project:
             if not filter_fn(layer_idx, layer):
                 continue
             yield layer_idx, layer
+
+    def resolve_meta(self, label: str) -> ComposedBlueprint:
+        """The layers the section applies, those of the sections it references for meta sections"""
+        return self._meta_resolver.resolve(label)
+
+    def is_meta_resolved(self, label: str) -> bool:
+        """Whether the composition of the section is at hand, resolving it again then costs nothing"""
+        return self._meta_resolver.is_resolved(label)
+
+    @property
+    def aliases(self) -> AliasTable:
+        """The aliases defined by the project's #aliases sections, compiled on first use"""
+        if self._aliases is None:
+            self._aliases = project_aliases(self.sections)
+        return self._aliases
+
+    def memory_report(self) -> memory.MemoryReport:
+        """Estimate of the memory retained by each section of the project"""
+        return memory.memory_report(self.sections)
@@ -0,0 +1,91 @@
+import re
+import uuid
+from typing import Dict, Iterable, List, Optional, Set
+
+from qfui.models.sections import Section
+
+
+__TOKEN_PATTERN__ = re.compile(r"\w+")
+# Tokens are indexed by all their n-grams up to this length, longer search terms are looked up by their n-grams of
+# this length and the candidates are checked against the section text
+__MAX_NGRAM__ = 3
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    global __TOKEN_PATTERN__
+    return __TOKEN_PATTERN__.findall(text.lower()) if text else []
+
+
+def _ngrams(token: str, length: int) -> Set[str]:
+    return {token[i:i + length] for i in range(len(token) - length + 1)}
+
+
+def section_texts(section_idx: int, section: Section) -> List[str]:
+    """
+    The texts of a section that can be searched: its position in the project as shown in the navigation tree, its
+    label, comment, message and start comment.
+    """
+    start_comment = section.start.comment if section.start else None
+    return [f"{section_idx:03d}", section.label, section.comment, section.message, start_comment]
+
+
+class SectionSearchIndex:
+    """
+    Inverted index from n-grams of the tokens of the section texts to the sections containing them. A search matches
+    the sections that contain every term of the query as part of a token, ignoring case.
+    """
+
+    def __init__(self, sections: Iterable[Section] = ()):
+        self._ngrams: Dict[str, Set[uuid.UUID]] = {}
+        self._tokens: Dict[uuid.UUID, List[str]] = {}
+        for section_idx, section in enumerate(sections):
+            self.add(section_idx, section)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def add(self, section_idx: int, section: Section):
+        global __MAX_NGRAM__
+        self.remove(section.suuid)
+        tokens = sorted({token for text in section_texts(section_idx, section) for token in tokenize(text)})
+        self._tokens[section.suuid] = tokens
+        for token in tokens:
+            for length in range(1, __MAX_NGRAM__ + 1):
+                for ngram in _ngrams(token, length):
+                    self._ngrams.setdefault(ngram, set()).add(section.suuid)
+
+    def remove(self, suuid: uuid.UUID):
+        if (tokens := self._tokens.pop(suuid, None)) is None:
+            return
+        for token in tokens:
+            for length in range(1, __MAX_NGRAM__ + 1):
+                for ngram in _ngrams(token, length):
+                    if (suuids := self._ngrams.get(ngram)) is not None:
+                        suuids.discard(suuid)
+
+    def _term_matches(self, term: str) -> Set[uuid.UUID]:
+        global __MAX_NGRAM__
+        if len(term) <= __MAX_NGRAM__:
+            return self._ngrams.get(term, set())
+        candidates = None
+        for ngram in _ngrams(term, __MAX_NGRAM__):
+            matches = self._ngrams.get(ngram, set())
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return set()
+        return {suuid for suuid in candidates if any(term in token for token in self._tokens[suuid])}
+
+    def search(self, query: str) -> Optional[Set[uuid.UUID]]:
+        """
+        Ids of the sections matching all terms of the query, or None for a query without any terms.
+        """
+        if not (terms := tokenize(query)):
+            return None
+        matches = None
+        # Rarer (longer) terms first keeps the intersections small
+        for term in sorted(set(terms), key=len, reverse=True):
+            term_matches = self._term_matches(term)
+            matches = set(term_matches) if matches is None else matches & term_matches
+            if not matches:
+                break
+        return matches
@@ -5,6 +5,7 @@ import uuid
 from dataclasses import asdict, is_dataclass
 from typing import Union
 
+from qfui import profiling
 from qfui.models.layers import GridLayer
 from qfui.models.sections import GridSection
 
@@ -79,6 +80,7 @@ class DataClassSerializer:
 
 
 class SerializingJSONEncoder(json.JSONEncoder):
+
     def default(self, o):
         if isinstance(o, uuid.UUID):
             return str(o)
@@ -87,3 +89,13 @@ class SerializingJSONEncoder(json.JSONEncoder):
         if is_dataclass(o):
             return DataClassSerializer.serialize_value(o)
         return super().default(o)
+
+    @profiling.profiled("serialize")
+    def encode(self, o):
+        return super().encode(o)
+
+
+@profiling.profiled("serialize")
+def dump(value, fh, **kwargs):
+    """json.dump with the SerializingJSONEncoder, which writes as it encodes rather than going through encode"""
+    json.dump(value, fh, cls=SerializingJSONEncoder, **kwargs)
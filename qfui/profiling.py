@@ -0,0 +1,135 @@
+"""
+Opt-in profiling of the hot paths, for traces of real blueprints from the field. Enabled with an environment variable
+(or the --profile option of python -m qfui, which sets it for worker processes as well), e.g.
+
+    QFUI_PROFILE=cprofile,tracemalloc QFUI_PROFILE_DIR=traces python -m qfui blueprint.csv
+
+Functions are wrapped when they are defined, so while profiling is disabled the decorator hands back the function
+itself and costs nothing:
+
+    @profiling.profiled("import")
+    def load(...):
+
+Every scope accumulates a cProfile profile over all its calls, written as <scope>-<run>-<pid>.prof when the process
+exits. With tracemalloc the largest growth of the traced memory over a call of each scope is written as JSON to
+tracemalloc-<run>-<pid>.json, next to a single snapshot of the memory still traced by then in
+tracemalloc-<run>-<pid>.tracemalloc. Only one scope is profiled at a time, calls nested in a profiled scope (or running
+on another thread meanwhile) are part of that scope's profile rather than their own.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+__ENV_MODES__ = "QFUI_PROFILE"
+__ENV_DIRECTORY__ = "QFUI_PROFILE_DIR"
+__ENV_RUN__ = "QFUI_PROFILE_RUN"
+__MODES__ = ("cprofile", "tracemalloc")
+__DEFAULT_DIRECTORY__ = "qfui-profiles"
+__LOCK__ = threading.Lock()
+# The profiling modules are only imported once profiling is enabled
+__PROFILES__: Dict[str, "cProfile.Profile"] = {}
+# Largest growth of the traced memory over a call of each scope, snapshots are only taken once profiling ends
+__GROWTH__: Dict[str, int] = {}
+__FINALIZER__ = None
+
+
+def modes() -> Set[str]:
+    global __ENV_MODES__, __MODES__
+    requested = {mode.strip().lower() for mode in os.environ.get(__ENV_MODES__, "").split(",") if mode.strip()}
+    return set(__MODES__) if "all" in requested else requested & set(__MODES__)
+
+
+def enabled() -> bool:
+    return bool(modes())
+
+
+def configure(requested: Iterable[str], directory: Optional[str] = None):
+    """
+    Enables profiling for functions defined from now on, in this process and processes started by it.
+    """
+    global __ENV_MODES__, __ENV_DIRECTORY__
+    os.environ[__ENV_MODES__] = ",".join(requested)
+    if directory:
+        os.environ[__ENV_DIRECTORY__] = directory
+
+
+def _output(scope: str, suffix: str) -> Path:
+    global __ENV_DIRECTORY__, __ENV_RUN__, __DEFAULT_DIRECTORY__
+    directory = Path(os.environ.get(__ENV_DIRECTORY__, __DEFAULT_DIRECTORY__))
+    directory.mkdir(parents=True, exist_ok=True)
+    # Worker processes share the run of the process that started them
+    run = os.environ.setdefault(__ENV_RUN__, time.strftime("%Y%m%d-%H%M%S"))
+    return directory / f"{scope}-{run}-{os.getpid()}{suffix}"
+
+
+def write():
+    """Writes the profiles collected so far, and the memory growth with a snapshot of the memory traced by now"""
+    global __PROFILES__, __GROWTH__
+    with __LOCK__:
+        for scope, profile in __PROFILES__.items():
+            profile.dump_stats(str(_output(scope, ".prof")))
+        if not __GROWTH__:
+            return
+        import tracemalloc
+
+        with open(_output("tracemalloc", ".json"), "w") as fh:
+            json.dump(__GROWTH__, fh, indent=2)
+        if tracemalloc.is_tracing():
+            tracemalloc.take_snapshot().dump(str(_output("tracemalloc", ".tracemalloc")))
+
+
+def _register_write():
+    global __FINALIZER__
+    if __FINALIZER__ is None:
+        from multiprocessing import util
+
+        # Finalizers also run when worker processes exit, unlike atexit handlers
+        __FINALIZER__ = util.Finalize(None, write, exitpriority=10)
+
+
+def profiled(scope: str):
+    """
+    Decorator profiling every call of the function as part of the scope, or leaving it as it is while disabled.
+    """
+    active = modes()
+
+    def decorator(func):
+        global __LOCK__, __PROFILES__, __GROWTH__
+        if not active:
+            return func
+        import cProfile
+        import tracemalloc
+
+        if "tracemalloc" in active and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not __LOCK__.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                _register_write()
+                profile = None
+                if "cprofile" in active:
+                    profile = __PROFILES__.get(scope) or __PROFILES__.setdefault(scope, cProfile.Profile())
+                before = tracemalloc.get_traced_memory()[0] if "tracemalloc" in active else 0
+                if profile is not None:
+                    profile.enable()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    if profile is not None:
+                        profile.disable()
+                    if "tracemalloc" in active:
+                        growth = tracemalloc.get_traced_memory()[0] - before
+                        __GROWTH__[scope] = max(growth, __GROWTH__.get(scope, growth))
+            finally:
+                __LOCK__.release()
+
+        return wrapper
+
+    return decorator
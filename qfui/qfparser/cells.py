@@ -1,22 +1,23 @@
+import logging
 import re
 from abc import ABC, abstractmethod
 from typing import List, Optional, Generator, Tuple
 
 import numpy
-from pyparsing import (
-    printables, nums,
-    Literal, Optional as ParserOptional, ParseException, Suppress, White, Word, ZeroOrMore
-)
+from pyparsing import ParseException
 
 from qfui.models.cells import Cell, DesignationCell, UnprocessedCell
 from qfui.models.enums import Designations
 from qfui.qfparser import actions
 
 
+__LOGGER__ = logging.getLogger(__name__)
 __EMPTY_CELL_REGEX__ = re.compile(r"^[~`\s]*$")
+__CELL_PARSER__ = None
 
 
-class ExpandingCellParser:
+def _build_cell_parser():
+    from pyparsing import printables, nums, Literal, Optional as ParserOptional, Suppress, White, Word, ZeroOrMore
 
     EXPAND_OPEN   = Suppress("(")
     EXPAND_CLOSE  = Suppress(")")
@@ -26,11 +27,22 @@ class ExpandingCellParser:
     DIMENSIONS    = NULL_SPACE + DIMENSION + Suppress(Literal('x')) + NULL_SPACE + DIMENSION + NULL_SPACE
     DIMENSIONS    = EXPAND_OPEN + DIMENSIONS + EXPAND_CLOSE
     CELL_PARSER   = NULL_SPACE + CODE_TEXT_EXP + NULL_SPACE + ParserOptional(DIMENSIONS) + NULL_SPACE
-    CELL_PARSER   = CELL_PARSER.setParseAction(actions.raw_cell)
+    return CELL_PARSER.setParseAction(actions.raw_cell)
+
+
+def cell_parser():
+    """The grammar of a cell with an optional expansion, built on first use"""
+    global __CELL_PARSER__
+    if __CELL_PARSER__ is None:
+        __CELL_PARSER__ = _build_cell_parser()
+    return __CELL_PARSER__
+
+
+class ExpandingCellParser:
 
     def _try_parse_expand_raw(self, raw_cell_text: str) -> Optional[dict]:
         try:
-            return self.CELL_PARSER.parseString(raw_cell_text, parseAll=True)[0]
+            return cell_parser().parseString(raw_cell_text, parseAll=True)[0]
         except ParseException:
             return None
 
@@ -67,16 +79,16 @@ class DesignationCellParser(CellParser, ExpandingCellParser):
             return cells
 
         if not (parsed := self._try_parse_expand_raw(raw_cell)):
-            # TODO: Log parsing error
+            __LOGGER__.info(f"Cell ({layer_x}, {layer_y}): could not parse '{raw_cell}'")
             return cells
         code_text = parsed["code_text"]
         if not (matches := self.__CODE_TEXT_REGEX__.match(code_text)):
-            # TODO: Log parsing error
+            __LOGGER__.info(f"Cell ({layer_x}, {layer_y}): invalid designation '{code_text}'")
             return cells
 
         designation = matches.group("designation")
         if designation and designation not in Designations.values():
-            # TODO: Log parsing error
+            __LOGGER__.info(f"Cell ({layer_x}, {layer_y}): unknown designation '{designation}'")
             return cells
 
         width = parsed.get("width", 1)
@@ -102,7 +114,7 @@ class UnprocessedCellParser(CellParser, ExpandingCellParser):
             return cells
 
         if not (parsed := self._try_parse_expand_raw(raw_cell)):
-            # TODO: Log parsing error
+            __LOGGER__.info(f"Cell ({layer_x}, {layer_y}): could not parse '{raw_cell}'")
             return cells
 
         width = parsed.get("width", 1)
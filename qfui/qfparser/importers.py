@@ -1,34 +1,77 @@
 import csv
+import os
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Union
+from typing import Callable, List, Optional, Union
 
+from qfui import profiling
 from qfui.models.enums import SectionModes
 from qfui.models.sections import GridSection, Section
 from qfui.qfparser.sections import SectionParser
 
 
+# Called with the bytes read so far, the file size in bytes and the number of sections parsed so far
+ProgressCallback = Callable[[int, int, int], None]
+
+
+class ImportCancelled(Exception):
+    pass
+
+
 class Importer(ABC):
 
     @abstractmethod
-    def load(self, filepath: Union[str, Path]) -> List[Section]:
+    def load(
+        self, filepath: Union[str, Path],
+        progress: Optional[ProgressCallback] = None, cancelled: Optional[Callable[[], bool]] = None,
+    ) -> List[Section]:
+        """
+        Loads the sections of a file, reporting progress to the optional progress callback. The import is given up with
+        ImportCancelled as soon as the optional cancelled callback returns True.
+        """
         pass
 
 
 class CSVImporter(Importer):
 
-    def load(self,  filepath: Union[str, Path]):
+    # Progress is reported after every section and after this many rows in between, cancellation is also checked
+    # before every row of a section's layers is parsed
+    PROGRESS_ROWS = 256
+
+    @profiling.profiled("import")
+    def load(
+        self, filepath: Union[str, Path],
+        progress: Optional[ProgressCallback] = None, cancelled: Optional[Callable[[], bool]] = None,
+    ):
         with open(filepath, "r") as fh:
             reader = csv.reader(fh, dialect="excel")
-            return self._load(reader)
+            if progress is None and cancelled is None:
+                return self._load(reader)
+            size = os.fstat(fh.fileno()).st_size
+
+            def check_cancelled():
+                if cancelled and cancelled():
+                    raise ImportCancelled(str(filepath))
+
+            def report(sections: int):
+                check_cancelled()
+                if progress:
+                    # The buffer position runs ahead of the parsed rows by at most its read ahead
+                    progress(min(fh.buffer.tell(), size), size, sections)
+
+            return self._load(reader, report, check_cancelled)
 
     @staticmethod
-    def _load(reader) -> List[Section]:
+    def _load(
+        reader, report: Optional[Callable[[int], None]] = None, checkpoint: Optional[Callable[[], None]] = None
+    ) -> List[Section]:
         section_line_no = None
         current_parser = None
         raw_section_data = []
         parsed_sections = []
         for line_no, row in enumerate(reader):
+            if report and line_no % CSVImporter.PROGRESS_ROWS == 0:
+                report(len(parsed_sections))
             new_parser = SectionParser.try_get_parser(row[0], f"{len(parsed_sections) + 1}") if row else None
             section_line_no = line_no if new_parser else section_line_no
             if new_parser is None:
@@ -40,10 +83,14 @@ class CSVImporter(Importer):
             if current_parser is None:
                 current_parser = new_parser
             if new_parser and new_parser != current_parser:
-                section = current_parser.parse(raw_section_data)
+                section = current_parser.parse(raw_section_data, checkpoint)
                 parsed_sections.append(section)
                 raw_section_data = []
                 current_parser = new_parser
+                if report:
+                    report(len(parsed_sections))
         if raw_section_data and current_parser:
-            parsed_sections.append(current_parser.parse(raw_section_data))
+            parsed_sections.append(current_parser.parse(raw_section_data, checkpoint))
+        if report:
+            report(len(parsed_sections))
         return parsed_sections
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Callable, List, Optional
 
 import numpy
 
@@ -11,10 +11,16 @@ class GridLayerParser:
     def __init__(self, cell_parser: CellParser = None):
         self._cell_parser = cell_parser or UnprocessedCellParser()
 
-    def parse(self, relative_z: int, raw_lines: List[List[str]]):
+    def parse(self, relative_z: int, raw_lines: List[List[str]], checkpoint: Optional[Callable[[], None]] = None):
+        """
+        Parses the cells of a layer, calling the optional checkpoint before every row. The checkpoint gives up the
+        parse by raising.
+        """
         shape = [1, 1]
         buffer = []
         for layer_y, raw_line in enumerate(raw_lines):
+            if checkpoint:
+                checkpoint()
             for layer_x, raw_cell in enumerate(raw_line):
                 parsed = self._cell_parser.parse(layer_x, layer_y, raw_cell)
                 for x, y, cell in parsed:
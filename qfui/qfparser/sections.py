@@ -2,14 +2,11 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from functools import reduce
-from typing import List, Optional, Union
+from typing import Callable, List, Optional, Union
 
-from pyparsing import (
-    alphas, printables, nums,
-    Combine, Forward, Group, Literal, OneOrMore, Optional as ParserOptional, ParseException, Suppress, White, Word,
-    ZeroOrMore
-)
+from pyparsing import ParseException
 
+from qfui import profiling
 from qfui.models.enums import Markers, SectionModes
 from qfui.models.layers import RawLayer
 from qfui.models.sections import RawSection, GridSection, SectionStart
@@ -18,7 +15,14 @@ from qfui.qfparser.cells import DesignationCellParser, CellParser, UnprocessedCe
 from qfui.qfparser.layers import GridLayerParser
 
 
-class SectionParser(ABC):
+__MODE_PARSER__ = None
+
+
+def _build_mode_parser():
+    from pyparsing import (
+        alphas, printables, nums,
+        Combine, Forward, Group, Literal, OneOrMore, Optional as ParserOptional, Suppress, White, Word, ZeroOrMore
+    )
 
     # Text Handling Helpers
     NULL_SPACE    = ZeroOrMore(White())
@@ -30,7 +34,6 @@ class SectionParser(ABC):
     # Marker Primitives
     MARK_OPEN     = Suppress("(")
     MARK_CLOSE    = Suppress(")")
-    LABEL_TEXT    = Combine(Word(alphas) + Word(printables))
     XY_COORD      = Word(nums).setParseAction(actions.as_int)
     XY_SEP        = (Suppress(",") | Suppress(";") | Suppress(OneOrMore(White())))
     XY_CORDS      = XY_COORD + XY_SEP + XY_COORD + ParserOptional(XY_SEP)
@@ -64,7 +67,18 @@ class SectionParser(ABC):
     MODE_NAME     = Suppress("#") + (reduce(lambda a, b: a | b, map(lambda m: Literal(str(m)), SectionModes)))
     MODE_NAME     = MODE_NAME.setParseAction(actions.as_mode)
     COMMENT       = Group(ParserOptional(COM_BLOCK))
-    MODE_PARSER   = MODE_NAME + SKIP_WHITE + MARKERS + COMMENT
+    return MODE_NAME + SKIP_WHITE + MARKERS + COMMENT
+
+
+def mode_parser():
+    """The grammar of a section's mode line, built on first use"""
+    global __MODE_PARSER__
+    if __MODE_PARSER__ is None:
+        __MODE_PARSER__ = _build_mode_parser()
+    return __MODE_PARSER__
+
+
+class SectionParser(ABC):
 
     __MODE_TO_SECTION__ = {
         SectionModes.DIG: GridSection,
@@ -78,7 +92,13 @@ class SectionParser(ABC):
         self._section = section
 
     @abstractmethod
-    def parse(self, raw: List[List[str]]) -> Union[RawSection, GridSection]:
+    def parse(
+        self, raw: List[List[str]], checkpoint: Optional[Callable[[], None]] = None
+    ) -> Union[RawSection, GridSection]:
+        """
+        Parses the section's rows. Parsers of large sections call the optional checkpoint as they go, it gives up the
+        parse by raising.
+        """
         pass
 
     @staticmethod
@@ -88,7 +108,7 @@ class SectionParser(ABC):
     @classmethod
     def try_get_parser(cls, raw_mode_line: str, label_default: str) -> Optional[SectionParser]:
         try:
-            nodes = cls.MODE_PARSER.parseString(raw_mode_line, parseAll=True)
+            nodes = mode_parser().parseString(raw_mode_line, parseAll=True)
         except ParseException:
             return None
         kwargs = {"label": label_default, "mode": nodes.pop(0)}
@@ -110,7 +130,7 @@ class SectionParser(ABC):
 
 class RawSectionParser(SectionParser):
 
-    def parse(self, raw: List[List[str]]) -> RawSection:
+    def parse(self, raw: List[List[str]], checkpoint: Optional[Callable[[], None]] = None) -> RawSection:
         section: RawSection = self._section
         section.layer = RawLayer(raw_lines=raw)
         return section
@@ -131,17 +151,19 @@ class GridSectionParser(SectionParser):
         cell_parser = self.__MODE_TO_CELL_PARSER__.get(section.mode, CellParser)
         self._layer_parser = GridLayerParser(cell_parser=cell_parser())
 
-    def parse(self, raw: List[List[str]]):
+    @profiling.profiled("parse_section")
+    def parse(self, raw: List[List[str]], checkpoint: Optional[Callable[[], None]] = None):
         section: GridSection = self._section
         layer_z = 0
         layer_raw_lines = []
         for raw_line in raw:
             if raw_line and raw_line[0] in ["#>", "#<"]:
-                section.layers += [self._layer_parser.parse(layer_z, layer_raw_lines)] if layer_raw_lines else []
+                if layer_raw_lines:
+                    section.layers += [self._layer_parser.parse(layer_z, layer_raw_lines, checkpoint)]
                 layer_z += 1 if raw_line[0] == "#>" else -1
                 layer_raw_lines = []
             elif not raw_line or not raw_line[0].startswith("#"):
                 layer_raw_lines.append(raw_line)
         if layer_raw_lines:
-            section.layers += [self._layer_parser.parse(layer_z, layer_raw_lines)]
+            section.layers += [self._layer_parser.parse(layer_z, layer_raw_lines, checkpoint)]
         return section
@@ -0,0 +1,104 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, Optional
+
+import numpy
+from PySide6.QtCore import QObject, QRunnable, Signal
+from PySide6.QtGui import QImage
+
+from qfui import sprites
+from qfui.models.layers import GridLayer
+
+
+def layer_pixels(codes: numpy.ndarray, cell_px: int) -> numpy.ndarray:
+    """
+    Rasterizes a layer's designation codes (indexed x, y) into a premultiplied RGBA pixel array (indexed row, column)
+    with cell_px x cell_px pixels per cell.
+    """
+    width, height = codes.shape
+    tiles = sprites.designation_tiles(cell_px)[codes]
+    return tiles.transpose(1, 2, 0, 3, 4).reshape(height * cell_px, width * cell_px, 4)
+
+
+def pixels_to_image(pixels: numpy.ndarray) -> QImage:
+    pixels = numpy.ascontiguousarray(pixels, dtype=numpy.uint8)
+    height, width = pixels.shape[:2]
+    image = QImage(pixels.data, width, height, width * 4, QImage.Format_RGBA8888_Premultiplied)
+    # QImage does not own the numpy buffer, so hand back a deep copy
+    return image.copy()
+
+
+def composite_over(target: numpy.ndarray, pixels: numpy.ndarray, opacity: float = 1.0):
+    """
+    Porter-Duff source over of premultiplied uint8 pixels, faded by opacity, onto a premultiplied float32 target of
+    the same shape. The target is updated in place.
+    """
+    source = pixels.astype(numpy.float32)
+    source *= opacity
+    target *= 1.0 - source[..., 3:4] / 255.0
+    target += source
+
+
+def layer_image(layer: GridLayer, cell_px: int) -> QImage:
+    return pixels_to_image(layer_pixels(layer.designation_codes, cell_px))
+
+
+@dataclass
+class LayerRaster:
+
+    codes: numpy.ndarray
+    images: Dict[int, QImage] = field(default_factory=dict)
+
+
+class RasterSignals(QObject):
+
+    finished = Signal(object)
+
+
+class LayerRasterTask(QRunnable):
+    """
+    Builds a layer's designation codes and its downsampled images off the GUI thread, sprites.initialize must have run
+    before any task is started. The task always reports back through the finished signal once run, cancelled or not,
+    so the owner knows when it may drop its reference.
+    """
+
+    def __init__(self, key: Hashable, layer: GridLayer, cell_px_sizes: Iterable[int], signals: RasterSignals):
+        super().__init__()
+        self.setAutoDelete(False)
+        self._key = key
+        self._layer = layer
+        self._cell_px_sizes = tuple(cell_px_sizes)
+        self._signals = signals
+        self._cancelled = threading.Event()
+        self._raster: Optional[LayerRaster] = None
+
+    @property
+    def key(self) -> Hashable:
+        return self._key
+
+    @property
+    def raster(self) -> Optional[LayerRaster]:
+        return self._raster
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _rasterize(self) -> Optional[LayerRaster]:
+        if self.cancelled:
+            return None
+        raster = LayerRaster(self._layer.designation_codes)
+        for cell_px in self._cell_px_sizes:
+            if self.cancelled:
+                return None
+            raster.images[cell_px] = pixels_to_image(layer_pixels(raster.codes, cell_px))
+        return raster
+
+    def run(self):
+        try:
+            self._raster = self._rasterize()
+        finally:
+            self._signals.finished.emit(self)
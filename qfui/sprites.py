@@ -1,15 +1,24 @@
+import hashlib
 import logging
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
-from PySide6.QtCore import QPoint
+import numpy
+from PySide6.QtCore import QPoint, Qt
 from PySide6.QtGui import QImage, QColor, QPainter, QBitmap, QPixmap, QIcon
 
+from qfui import instrumentation
 from qfui.models.enums import Designations
+from qfui.models.layers import EMPTY_CELL_CODE, OTHER_CELL_CODE, code_designation
 
 
 __LOGGER__ = logging.getLogger(__name__)
+__SHEET__: Optional[QImage] = None
 __MASK_LOOKUP__ = {}
 __SPRITE_LOOKUP__ = {}
+__TILE_LOOKUP__ = {}
+__ATLAS__: Optional[numpy.ndarray] = None
+__ATLAS_HASH__: Optional[str] = None
 __SPRITE_SIZE__ = 16
 __SHEET_WIDTH__ = 256
 __SHEET_HEIGHT__ = 256
@@ -35,61 +44,144 @@ __FALLBACK_SPRITE__ = (0, 0)
 __FALLBACK_COLOR__ = QColor(223, 0, 254)
 
 
+def _tint(mask: QImage, color: QColor) -> QImage:
+    painter = QPainter()
+    image = QImage(mask.size(), mask.format())
+    image.fill(color)
+    painter.begin(image)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Overlay)
+    painter.drawImage(QPoint(0, 0), mask)
+    painter.end()
+    return image
+
+
 class CellSprite:
+    """
+    A tinted sprite, its image, pixmap and icon forms are only created when first asked for.
+    """
 
     def __init__(self, mask: QImage, color: QColor):
         self._mask = mask
         self._color = color
-        painter = QPainter()
-        self._image = QImage(self._mask.size(), self._mask.format())
-        self._image.fill(self._color)
-        painter.begin(self._image)
-        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Overlay)
-        painter.drawImage(QPoint(0, 0), self._mask)
-        painter.end()
-        self._pixmap = QPixmap(self._image)
-        self._icon = QIcon(self._pixmap)
+        self._image: Optional[QImage] = None
+        self._pixmap: Optional[QPixmap] = None
+        self._icon: Optional[QIcon] = None
 
     @property
     def image(self) -> QImage:
+        if self._image is None:
+            self._image = _tint(self._mask, self._color)
         return self._image
 
     @property
     def pixmap(self) -> QPixmap:
+        if self._pixmap is None:
+            self._pixmap = QPixmap(self.image)
         return self._pixmap
 
     @property
     def icon(self) -> QIcon:
+        if self._icon is None:
+            self._icon = QIcon(self.pixmap)
         return self._icon
 
 
 def initialize(sheet: QImage):
-    global __MASK_LOOKUP__, __SPRITE_SIZE__, __SHEET_HEIGHT__, __SHEET_WIDTH__
+    global __SHEET__, __SPRITE_SIZE__, __SHEET_HEIGHT__, __SHEET_WIDTH__
 
-    if __MASK_LOOKUP__:
+    if __SHEET__ is not None:
         return
 
     if sheet.width() != __SHEET_WIDTH__ or sheet.height() != __SHEET_HEIGHT__:
         raise RuntimeError("Invalid sheet dimensions")  # TODO: Better exception
 
-    for y in range(0, __SHEET_WIDTH__, __SPRITE_SIZE__):
-        for x in range(0, __SHEET_HEIGHT__, __SPRITE_SIZE__):
-            loc = int(x / __SPRITE_SIZE__), int(y / __SPRITE_SIZE__)
-            __MASK_LOOKUP__[loc] = sheet.copy(x, y, __SPRITE_SIZE__, __SPRITE_SIZE__)
+    __SHEET__ = sheet
+    _build_atlas()
 
 
-def lookup_designation(designation: Designations) -> CellSprite:
-    global __LOGGER__, __MASK_LOOKUP__, __FALLBACK_SPRITE__, __FALLBACK_COLOR__, \
-           __DESIGNATION_SPRITES__, __DESIGNATION_COLORS__, __SPRITE_LOOKUP__
+def _mask(loc: Tuple[int, int]) -> QImage:
+    """The sprite at the given column and row of the sheet, cut out of the sheet the first time it is used"""
+    global __SHEET__, __MASK_LOOKUP__, __SPRITE_SIZE__
+    if (mask := __MASK_LOOKUP__.get(loc)) is None:
+        x, y = loc
+        mask = __SHEET__.copy(x * __SPRITE_SIZE__, y * __SPRITE_SIZE__, __SPRITE_SIZE__, __SPRITE_SIZE__)
+        __MASK_LOOKUP__[loc] = mask
+    return mask
+
+
+def _designation_sprite(designation: Designations) -> Tuple[Tuple[int, int], QColor]:
+    global __LOGGER__, __FALLBACK_SPRITE__, __FALLBACK_COLOR__, __DESIGNATION_SPRITES__, __DESIGNATION_COLORS__
     color = __DESIGNATION_COLORS__.get(designation, __FALLBACK_COLOR__)
-    cache_idx = designation, color.red(), color.blue(), color.green()
-    if sprite := __SPRITE_LOOKUP__.get(cache_idx):
-        return sprite
     mask = __DESIGNATION_SPRITES__.get(designation, __FALLBACK_SPRITE__)
     if designation and (color == __FALLBACK_COLOR__ or mask == __FALLBACK_SPRITE__):
         __LOGGER__.debug(f'Designation {designation.name} ({designation}) used a fallback color or sprite')
     elif designation is None:
         __LOGGER__.debug(f'Got empty designation')
-    sprite = CellSprite(mask=__MASK_LOOKUP__[mask], color=color)
+    return mask, color
+
+
+def _build_atlas():
+    """
+    Tints the sprite of every cell code once into a single strip, tile N holding the sprite for code N (the empty code
+    is left transparent). Layer painting works off this atlas rather than individual sprites.
+    """
+    global __ATLAS__, __ATLAS_HASH__, __SPRITE_SIZE__
+    image = QImage((OTHER_CELL_CODE + 1) * __SPRITE_SIZE__, __SPRITE_SIZE__, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    for code in range(EMPTY_CELL_CODE + 1, OTHER_CELL_CODE + 1):
+        painter.drawImage(QPoint(code * __SPRITE_SIZE__, 0), lookup_designation(code_designation(code)).image)
+    painter.end()
+    pixels = image_to_array(image).reshape(__SPRITE_SIZE__, OTHER_CELL_CODE + 1, __SPRITE_SIZE__, 4)
+    __ATLAS__ = numpy.ascontiguousarray(pixels.transpose(1, 0, 2, 3))
+    __ATLAS_HASH__ = hashlib.blake2b(__ATLAS__.tobytes(), digest_size=8).hexdigest()
+
+
+def atlas_hash() -> str:
+    """Digest of the atlas, it changes with the sprite sheet and the designation colors"""
+    global __ATLAS_HASH__
+    return __ATLAS_HASH__
+
+
+def lookup_designation(designation: Designations) -> CellSprite:
+    global __DESIGNATION_COLORS__, __FALLBACK_COLOR__, __SPRITE_LOOKUP__
+    color = __DESIGNATION_COLORS__.get(designation, __FALLBACK_COLOR__)
+    cache_idx = designation, color.red(), color.blue(), color.green()
+    if sprite := __SPRITE_LOOKUP__.get(cache_idx):
+        instrumentation.count("sprites.hit")
+        return sprite
+    instrumentation.count("sprites.miss")
+    mask, color = _designation_sprite(designation)
+    sprite = CellSprite(mask=_mask(mask), color=color)
     __SPRITE_LOOKUP__[cache_idx] = sprite
     return sprite
+
+
+def image_to_array(image: QImage) -> numpy.ndarray:
+    image = image.convertToFormat(QImage.Format_RGBA8888_Premultiplied)
+    pixels = numpy.frombuffer(image.constBits(), dtype=numpy.uint8, count=image.sizeInBytes())
+    pixels = pixels.reshape(image.height(), image.bytesPerLine() // 4, 4)
+    return pixels[:, :image.width()].copy()
+
+
+def designation_tiles(cell_px: int) -> numpy.ndarray:
+    """
+    Premultiplied RGBA tiles of cell_px x cell_px for every cell code, indexable by a layer's designation codes. At the
+    sprite size this is the atlas itself, smaller tiles average the atlas sprites down. Only numpy is involved so this
+    is safe to call from worker threads once initialize has run.
+
+    These are the per zoom variants of the sprites, kept for every zoom level's cell size. Only sizes dividing the
+    sprite size are accepted, so the lookup holds at most one strip per divisor and needs no eviction.
+    """
+    global __ATLAS__, __TILE_LOOKUP__, __SPRITE_SIZE__
+    if (tiles := __TILE_LOOKUP__.get(cell_px)) is not None:
+        instrumentation.count("sprites.hit")
+        return tiles
+    instrumentation.count("sprites.miss")
+    if cell_px < 1 or __SPRITE_SIZE__ % cell_px:
+        raise ValueError(f"Tile size {cell_px} does not evenly divide the sprite size {__SPRITE_SIZE__}")
+    block = __SPRITE_SIZE__ // cell_px
+    tiles = __ATLAS__.astype(numpy.float32).reshape(-1, cell_px, block, cell_px, block, 4).mean(axis=(2, 4))
+    tiles = numpy.rint(tiles).astype(numpy.uint8)
+    __TILE_LOOKUP__[cell_px] = tiles
+    return tiles
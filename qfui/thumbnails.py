@@ -0,0 +1,217 @@
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QStandardPaths, QThreadPool, Qt, Signal, Slot
+from PySide6.QtGui import QImage, QPixmap
+
+from qfui import rendering, sprites
+from qfui.models.layers import GridLayer
+
+
+__LOGGER__ = logging.getLogger(__name__)
+# Part of the cache keys, has to change whenever thumbnails are drawn differently
+__THUMBNAIL_VERSION__ = 1
+
+
+def default_cache_dir() -> Optional[Path]:
+    if not (location := QStandardPaths.writableLocation(QStandardPaths.CacheLocation)):
+        return None
+    return Path(location) / "thumbnails"
+
+
+def prune_cache_dir(cache_dir: Path, max_bytes: int):
+    """
+    Deletes the least recently used thumbnails of the disk cache, by modification time, until the rest fit in max_bytes.
+    """
+    global __LOGGER__
+    files = []
+    for path in cache_dir.glob("*.png"):
+        try:
+            files.append((path.stat(), path))
+        except OSError:
+            continue
+    total = sum(stat.st_size for stat, _ in files)
+    for stat, path in sorted(files, key=lambda file: file[0].st_mtime):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError as e:
+            __LOGGER__.warning(f"Could not delete cached thumbnail {path}: {e}")
+            continue
+        total -= stat.st_size
+
+
+def thumbnail_image(layer: GridLayer, size: int) -> QImage:
+    """
+    The layer drawn at one pixel per cell, smoothly scaled to fit a size x size box.
+    """
+    image = rendering.layer_image(layer, 1)
+    return image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+class PruneTask(QRunnable):
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        super().__init__()
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+
+    def run(self):
+        prune_cache_dir(self._cache_dir, self._max_bytes)
+
+
+class ThumbnailSignals(QObject):
+
+    finished = Signal(object)
+
+
+class ThumbnailTask(QRunnable):
+    """
+    Loads a layer's thumbnail from the disk cache, or renders it and stores it there. Loading a cached thumbnail
+    touches its file, the disk cache is pruned by modification time.
+    """
+
+    def __init__(self, key: str, layer: GridLayer, size: int, cache_file: Optional[Path], signals: ThumbnailSignals):
+        super().__init__()
+        self.setAutoDelete(False)
+        self._key = key
+        self._layer = layer
+        self._size = size
+        self._cache_file = cache_file
+        self._signals = signals
+        self._cancelled = threading.Event()
+        self._image: Optional[QImage] = None
+        self._written = 0
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    @property
+    def image(self) -> Optional[QImage]:
+        return self._image
+
+    @property
+    def written(self) -> int:
+        """Bytes added to the disk cache"""
+        return self._written
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _load(self) -> Optional[QImage]:
+        global __LOGGER__
+        if self._cancelled.is_set():
+            return None
+        if self._cache_file and self._cache_file.exists():
+            image = QImage(str(self._cache_file))
+            if not image.isNull():
+                try:
+                    self._cache_file.touch()
+                except OSError:
+                    pass
+                return image
+        image = thumbnail_image(self._layer, self._size)
+        if self._cache_file:
+            try:
+                self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+                if image.save(str(self._cache_file), "PNG"):
+                    self._written = self._cache_file.stat().st_size
+            except OSError as e:
+                __LOGGER__.warning(f"Could not cache thumbnail {self._cache_file}: {e}")
+        return image
+
+    def run(self):
+        try:
+            self._image = self._load()
+        finally:
+            self._signals.finished.emit(self)
+
+
+class ThumbnailCache(QObject):
+    """
+    Layer thumbnails keyed by the layer's content hash and the sprite atlas they are drawn with. Recently used
+    thumbnails are kept in memory, the rest are loaded from the disk cache or rendered in a background pool on
+    request. thumbnail_ready is emitted with the key once a requested thumbnail is available. There are no thumbnails
+    until sprites.initialize has built the atlas, views ask again as they repaint.
+    """
+
+    MAX_CACHED_THUMBNAILS = 512
+    MAX_DISK_CACHE_BYTES = 32 * 1024 * 1024
+
+    thumbnail_ready = Signal(str)
+
+    def __init__(self, size: int = 48, cache_dir: Optional[Path] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._size = size
+        self._cache_dir = cache_dir
+        self._pixmaps: OrderedDict[str, QPixmap] = OrderedDict()
+        self._pool = QThreadPool(self)
+        self._tasks: Dict[str, ThumbnailTask] = {}
+        self._retired_tasks = set()
+        self._signals = ThumbnailSignals(self)
+        self._signals.finished.connect(self._task_finished)
+        # Bytes written to the disk cache since it was last pruned
+        self._written = 0
+        self._prune_disk_cache()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def key(self, layer: GridLayer) -> Optional[str]:
+        """The layer's cache key, None while there is no sprite atlas to draw it with"""
+        global __THUMBNAIL_VERSION__
+        if (atlas_hash := sprites.atlas_hash()) is None:
+            return None
+        return f"{layer.content_hash}-{self._size}-{__THUMBNAIL_VERSION__}-{atlas_hash}"
+
+    def _prune_disk_cache(self):
+        self._written = 0
+        if self._cache_dir and self._cache_dir.is_dir():
+            self._pool.start(PruneTask(self._cache_dir, self.MAX_DISK_CACHE_BYTES))
+
+    def thumbnail(self, layer: GridLayer) -> Optional[QPixmap]:
+        """
+        The layer's thumbnail if it is at hand, otherwise None and it is loaded in the background.
+        """
+        if (key := self.key(layer)) is None:
+            return None
+        if (pixmap := self._pixmaps.get(key)) is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        if key not in self._tasks:
+            cache_file = self._cache_dir / f"{key}.png" if self._cache_dir else None
+            task = ThumbnailTask(key, layer, self._size, cache_file, self._signals)
+            self._tasks[key] = task
+            self._pool.start(task)
+        return None
+
+    def retain(self, keys):
+        """
+        Drops pending requests for any thumbnail not in keys, e.g. for rows that were scrolled out of view.
+        """
+        for key in [key for key in self._tasks if key not in keys]:
+            task = self._tasks.pop(key)
+            task.cancel()
+            if not self._pool.tryTake(task):
+                self._retired_tasks.add(task)
+
+    @Slot(object)
+    def _task_finished(self, task: ThumbnailTask):
+        self._retired_tasks.discard(task)
+        self._written += task.written
+        # Pruning lists the whole directory, it runs once an eighth of the limit was written
+        if self._written > self.MAX_DISK_CACHE_BYTES // 8:
+            self._prune_disk_cache()
+        if self._tasks.get(task.key) is not task or task.image is None:
+            return
+        self._tasks.pop(task.key)
+        self._pixmaps[task.key] = QPixmap.fromImage(task.image)
+        while len(self._pixmaps) > self.MAX_CACHED_THUMBNAILS:
+            self._pixmaps.popitem(last=False)
+        self.thumbnail_ready.emit(task.key)
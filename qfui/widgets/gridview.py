@@ -1,45 +1,47 @@
 # WIP
 import math
 
-from typing import Optional, Generator, Tuple, List
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple, Dict, List, Set
 
-from PySide6.QtCore import QRectF, Slot, QRect, QLineF, QPoint
-from PySide6.QtGui import QPainter, QMouseEvent, QPen, Qt, QBrush
+import numpy
+from PySide6.QtCore import QCoreApplication, QPointF, QRectF, Signal, Slot, QRect, QPoint, QThreadPool
+from PySide6.QtGui import QPainter, QMouseEvent, QPen, Qt, QBrush, QImage, QTransform, QKeyEvent, QPaintEvent
 from PySide6.QtWidgets import (
     QGraphicsItem, QGraphicsView, QGraphicsScene, QStyleOptionGraphicsItem, QWidget, QGraphicsSceneMouseEvent,
 )
 
 from qfui.controller.messages import ControllerInterface
 from qfui.models.enums import Designations
-from qfui import sprites
+from qfui.models.layers import EMPTY_CELL_CODE, GridLayer, designation_code
+from qfui.models.project import SectionLayerIndex
+from qfui import instrumentation, profiling, rendering
+from qfui.rendering import LayerRaster, LayerRasterTask, RasterSignals
+from qfui.widgets.hud import PerformanceHud
 
 CELL_PX_SIZE = 16
 CELL_BORDER_PX_SIZE = 1
+# Below this many device pixels per cell layers are drawn from downsampled images and the cell grid is skipped
+LOD_CELL_PX_THRESHOLD = 8
+# Downsampled image sizes (pixels per cell) rasterized in the background for every layer
+LOD_CELL_PX_SIZES = (1, 2, 4, 8)
 
 
-class DesignationCell(QGraphicsItem):
-    QT_TYPE = QGraphicsItem.UserType + 1
-
-    def __init__(self, cell_x: int, cell_y: int, designation: Designations):
-        super().__init__()
-        self._designation = designation
-        self._cell_x = cell_x
-        self._cell_y = cell_y
-        self._cell_sprite = sprites.lookup_designation(designation)
-
-    def type(self) -> int:
-        return DesignationCell.QT_TYPE
+def device_cell_px(transform: QTransform) -> float:
+    return CELL_PX_SIZE * QStyleOptionGraphicsItem.levelOfDetailFromTransform(transform)
 
-    def boundingRect(self) -> QRectF:
-        view_x = self._cell_x * CELL_PX_SIZE
-        view_y = self._cell_y * CELL_PX_SIZE
-        view_width = CELL_PX_SIZE
-        view_height = CELL_PX_SIZE
-        return QRectF(view_x, view_y, view_width, view_height)
 
-    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = ...):
-        rect = self.boundingRect()
-        painter.drawImage(QPoint(rect.x(), rect.y()), self._cell_sprite.image)
+def lod_cell_px(device_px: float) -> Optional[int]:
+    """
+    Pixels per cell of the downsampled layer image to draw for the given on screen cell size, or None when cells are
+    large enough to be drawn at full detail.
+    """
+    if device_px > LOD_CELL_PX_THRESHOLD:
+        return None
+    cell_px = 1
+    while cell_px < device_px:
+        cell_px *= 2
+    return cell_px
 
 
 class GridLayerItem(QGraphicsItem):
@@ -58,6 +60,11 @@ class GridLayerItem(QGraphicsItem):
     def cell_width(self) -> int:
         return self._cell_width
 
+    def set_cell_size(self, cell_width: int, cell_height: int):
+        self.prepareGeometryChange()
+        self._cell_width = cell_width
+        self._cell_height = cell_height
+
     @property
     def cell_height(self) -> int:
         return self._cell_height
@@ -84,50 +91,248 @@ class GridLayerItem(QGraphicsItem):
 
 class LayerItem(GridLayerItem):
     QT_TYPE = QGraphicsItem.UserType + 1
+    # Cells at full detail are composed from the sprite atlas per tile of TILE_CELLS x TILE_CELLS cells
+    TILE_CELLS = 16
+    MAX_CACHED_TILES = 64
 
-    def __init__(self,  cell_width: int, cell_height: int, is_active: bool = False):
+    def __init__(self,  cell_width: int, cell_height: int, is_active: bool = False, relative_z: int = 0):
         super().__init__(cell_width, cell_height)
         self._is_active = is_active
+        self._relative_z = relative_z
         self._grid_pen.setStyle(Qt.SolidLine)
-        self._cells: List[List[Optional[DesignationCell]]] = [
-            [None for _ in range(0, cell_height)]
-            for _ in range(0, cell_width)
-        ]
+        self._placeholder_pen = QPen(QBrush(Qt.darkGray), CELL_BORDER_PX_SIZE)
+        self._placeholder_pen.setStyle(Qt.DashLine)
+        self._placeholder_pen.setCosmetic(True)
+        self._placeholder_brush = QBrush(Qt.lightGray, Qt.BDiagPattern)
+        self._codes: Optional[numpy.ndarray] = None
+        self._lod_images: Dict[int, QImage] = {}
+        self._tiles: OrderedDict[Tuple[int, int], QImage] = OrderedDict()
+        # Called with the item after its cells were edited
+        self._changed: Optional[Callable[["LayerItem"], None]] = None
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
 
     def type(self) -> int:
         return LayerItem.QT_TYPE
 
-    def _walk_cells(self, skip_empty: bool = True) -> Generator[Tuple[int, int, DesignationCell], None, None]:
-        for x in range(0, self._cell_width):
-            for y in range(0, self._cell_height):
-                cell: Optional[DesignationCell] = self._cells[x][y]
-                if skip_empty and cell is None:
-                    continue
-                yield x, y, cell
+    @property
+    def relative_z(self) -> int:
+        return self._relative_z
+
+    def set_relative_z(self, relative_z: int):
+        self._relative_z = relative_z
+
+    @property
+    def codes(self) -> Optional[numpy.ndarray]:
+        return self._codes
+
+    @property
+    def is_rasterized(self) -> bool:
+        return self._codes is not None
+
+    def set_changed_callback(self, callback: Optional[Callable[["LayerItem"], None]]):
+        self._changed = callback
+
+    def set_raster(self, raster: LayerRaster):
+        self._codes = raster.codes
+        self._lod_images = dict(raster.images)
+        self._tiles.clear()
+        self.update()
 
+    def _lod_image(self, cell_px: int) -> QImage:
+        if (image := self._lod_images.get(cell_px)) is None:
+            image = rendering.pixels_to_image(rendering.layer_pixels(self._codes, cell_px))
+            self._lod_images[cell_px] = image
+        return image
+
+    def _exposed_cells(self, option: QStyleOptionGraphicsItem) -> Tuple[int, int, int, int]:
+        exposed = option.exposedRect
+        left = max(int(exposed.left() // CELL_PX_SIZE), 0)
+        top = max(int(exposed.top() // CELL_PX_SIZE), 0)
+        right = min(int(math.ceil(exposed.right() / CELL_PX_SIZE)), self._cell_width)
+        bottom = min(int(math.ceil(exposed.bottom() / CELL_PX_SIZE)), self._cell_height)
+        return left, top, right, bottom
+
+    def _tile(self, tile_x: int, tile_y: int) -> QImage:
+        key = tile_x, tile_y
+        if (image := self._tiles.get(key)) is not None:
+            self._tiles.move_to_end(key)
+            return image
+        left, top = tile_x * self.TILE_CELLS, tile_y * self.TILE_CELLS
+        codes = self._codes[left:left + self.TILE_CELLS, top:top + self.TILE_CELLS]
+        image = self._tiles[key] = rendering.pixels_to_image(rendering.layer_pixels(codes, CELL_PX_SIZE))
+        while len(self._tiles) > self.MAX_CACHED_TILES:
+            self._tiles.popitem(last=False)
+        return image
+
+    def _paint_cells(self, painter: QPainter, option: QStyleOptionGraphicsItem):
+        # Tiles are in item coordinates, panning and zooming at full detail reuses the ones composed before
+        left, top, right, bottom = self._exposed_cells(option)
+        if right <= left or bottom <= top:
+            return
+        instrumentation.add_frame_count("cells", (right - left) * (bottom - top))
+        first_x, first_y = left // self.TILE_CELLS, top // self.TILE_CELLS
+        last_x, last_y = (right - 1) // self.TILE_CELLS, (bottom - 1) // self.TILE_CELLS
+        tile_px = self.TILE_CELLS * CELL_PX_SIZE
+        for tile_y in range(first_y, last_y + 1):
+            for tile_x in range(first_x, last_x + 1):
+                painter.drawImage(QPoint(tile_x * tile_px, tile_y * tile_px), self._tile(tile_x, tile_y))
+
+    def _paint_placeholder(self, painter: QPainter):
+        painter.setPen(self._placeholder_pen)
+        painter.setBrush(self._placeholder_brush)
+        painter.drawRect(self.boundingRect())
+
+    @profiling.profiled("layer_paint")
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = ...):
+        started = instrumentation.start()
         painter.save()
-        for x, y, cell in self._walk_cells(skip_empty=True):
-            cell.paint(painter, option, widget)
+        if not self.is_rasterized:
+            self._paint_placeholder(painter)
+        elif (cell_px := lod_cell_px(device_cell_px(painter.worldTransform()))) is not None:
+            painter.drawImage(self.boundingRect(), self._lod_image(cell_px))
+            if instrumentation.enabled():
+                left, top, right, bottom = self._exposed_cells(option)
+                instrumentation.add_frame_count("cells", max(right - left, 0) * max(bottom - top, 0))
+        else:
+            self._paint_cells(painter, option)
         # Only the active layer has it's grid painted
         if self._is_active:
             self._paint_grid(painter)
         painter.restore()
+        instrumentation.add_frame_time("layer_paint", started)
 
     def mousePressEvent(self, event: QMouseEvent):
+        if not self.is_rasterized:
+            return
         scene_pos = self.mapToScene(event.pos())
         x = int(math.floor((scene_pos.x() - self.x()) / CELL_PX_SIZE))
         y = int(math.floor((scene_pos.y() - self.y()) / CELL_PX_SIZE))
         print(f'Clicked cell {(x, y)}')
-        cell: Optional[DesignationCell] = self._cells[x][y]
-        if cell is None:
+        # The codes may be shared with the layer model, never edit them in place
+        self._codes = self._codes.copy()
+        if self._codes[x, y] == EMPTY_CELL_CODE:
             print(f'Setting cell {(x,y)}')
-            self._cells[x][y] = DesignationCell(x, y, Designations.MINE)
+            self._codes[x, y] = designation_code(Designations.MINE)
         else:
             print(f'(Unsetting cell {(x,y)}')
-            self._cells[x][y] = None
+            self._codes[x, y] = EMPTY_CELL_CODE
+        self._lod_images.clear()
+        self._tiles.clear()
+        self.update()
+        if self._changed:
+            self._changed(self)
+
+
+class OnionSkinItem(QGraphicsItem):
+    """
+    Draws the visible layers as onion skin: layers at the current z level at full opacity and up to depth levels above
+    and below fading out with their distance. All layers are composited with numpy into a single image per tile of
+    TILE_CELLS x TILE_CELLS cells, tiles are built on demand and cached until the layers or the z level change.
+    """
+    QT_TYPE = QGraphicsItem.UserType + 2
+    TILE_CELLS = 32
+    MAX_CACHED_TILES = 64
+
+    def __init__(self):
+        super().__init__()
+        self._cell_width = 0
+        self._cell_height = 0
+        self._layers: List[Tuple[int, int, int, numpy.ndarray]] = []
+        self._current_z = 0
+        self._depth = 2
+        self._tiles: OrderedDict[Tuple[int, int, int], QImage] = OrderedDict()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+    def type(self) -> int:
+        return OnionSkinItem.QT_TYPE
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(0, 0, self._cell_width * CELL_PX_SIZE, self._cell_height * CELL_PX_SIZE)
+
+    def set_layers(self, bounds: QRectF, layers: List[Tuple[QPointF, int, numpy.ndarray]]):
+        """Takes the scene position, relative z and designation codes of every layer to draw"""
+        self.prepareGeometryChange()
+        self.setPos(bounds.topLeft())
+        self._cell_width = int(bounds.width()) // CELL_PX_SIZE
+        self._cell_height = int(bounds.height()) // CELL_PX_SIZE
+        self._layers = [
+            (
+                int(pos.x() - bounds.left()) // CELL_PX_SIZE,
+                int(pos.y() - bounds.top()) // CELL_PX_SIZE,
+                relative_z,
+                codes,
+            )
+            for pos, relative_z, codes in layers
+        ]
+        self.invalidate()
+
+    @property
+    def levels(self) -> List[int]:
+        """The relative z of every layer drawn"""
+        return sorted(relative_z for _, _, relative_z, _ in self._layers)
+
+    def set_z(self, current_z: int, depth: int):
+        if (current_z, depth) == (self._current_z, self._depth):
+            return
+        self._current_z = current_z
+        self._depth = depth
+        self.invalidate()
+
+    def invalidate(self):
+        self._tiles.clear()
         self.update()
 
+    def _opacity(self, relative_z: int) -> float:
+        distance = abs(relative_z - self._current_z)
+        return 1.0 - distance / (self._depth + 1) if distance <= self._depth else 0.0
+
+    def _compose_tile(self, tile_x: int, tile_y: int, cell_px: int) -> QImage:
+        left, top = tile_x * self.TILE_CELLS, tile_y * self.TILE_CELLS
+        right = min(left + self.TILE_CELLS, self._cell_width)
+        bottom = min(top + self.TILE_CELLS, self._cell_height)
+        target = numpy.zeros(((bottom - top) * cell_px, (right - left) * cell_px, 4), dtype=numpy.float32)
+        # Farthest levels first so the current level ends up on top
+        layers = sorted(self._layers, key=lambda layer: -abs(layer[2] - self._current_z))
+        for layer_x, layer_y, relative_z, codes in layers:
+            if (opacity := self._opacity(relative_z)) <= 0.0:
+                continue
+            # Overlap of the layer and the tile in item cell coordinates
+            x0, y0 = max(left, layer_x), max(top, layer_y)
+            x1, y1 = min(right, layer_x + codes.shape[0]), min(bottom, layer_y + codes.shape[1])
+            if x1 <= x0 or y1 <= y0:
+                continue
+            pixels = rendering.layer_pixels(codes[x0 - layer_x:x1 - layer_x, y0 - layer_y:y1 - layer_y], cell_px)
+            region = target[(y0 - top) * cell_px:(y1 - top) * cell_px, (x0 - left) * cell_px:(x1 - left) * cell_px]
+            rendering.composite_over(region, pixels, opacity)
+        return rendering.pixels_to_image(numpy.rint(target).astype(numpy.uint8))
+
+    def _tile(self, tile_x: int, tile_y: int, cell_px: int) -> QImage:
+        key = tile_x, tile_y, cell_px
+        if (image := self._tiles.get(key)) is not None:
+            self._tiles.move_to_end(key)
+            return image
+        image = self._tiles[key] = self._compose_tile(tile_x, tile_y, cell_px)
+        while len(self._tiles) > self.MAX_CACHED_TILES:
+            self._tiles.popitem(last=False)
+        return image
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = ...):
+        if not self._layers:
+            return
+        cell_px = lod_cell_px(device_cell_px(painter.worldTransform())) or CELL_PX_SIZE
+        tile_px = self.TILE_CELLS * CELL_PX_SIZE
+        exposed = option.exposedRect.intersected(self.boundingRect())
+        first_x, first_y = int(exposed.left() // tile_px), int(exposed.top() // tile_px)
+        last_x, last_y = int(math.ceil(exposed.right() / tile_px)), int(math.ceil(exposed.bottom() / tile_px))
+        for tile_y in range(first_y, last_y):
+            for tile_x in range(first_x, last_x):
+                image = self._tile(tile_x, tile_y, cell_px)
+                target = QRectF(
+                    tile_x * tile_px, tile_y * tile_px,
+                    image.width() * CELL_PX_SIZE / cell_px, image.height() * CELL_PX_SIZE / cell_px,
+                )
+                painter.drawImage(target, image)
+
 
 class GridScene(QGraphicsScene):
 
@@ -137,6 +342,8 @@ class GridScene(QGraphicsScene):
         self._grid_pen.setStyle(Qt.DotLine)
         self._grid_pen.setWidth(1)
         self._grid_pen.setCosmetic(True)
+        self._grid_brush: Optional[QBrush] = None
+        self._grid_brush_px: Optional[float] = None
 
     def mousePressEvent(self, event: QGraphicsSceneMouseEvent):
         pos = event.scenePos()
@@ -144,24 +351,47 @@ class GridScene(QGraphicsScene):
         y = int(math.floor(pos.y() / CELL_PX_SIZE))
         print(f"Mouse click: {x}, {y}")
 
+    def _grid_pattern(self, device_px: float) -> QBrush:
+        """
+        A brush tiling one cell's worth of grid lines, rendered at the on screen cell size so the texture maps about 1:1
+        onto device pixels. It is only rebuilt when the zoom changes.
+        """
+        if device_px == self._grid_brush_px:
+            return self._grid_brush
+        texture_px = max(int(round(device_px)), 1)
+        texture = QImage(texture_px, texture_px, QImage.Format_ARGB32_Premultiplied)
+        texture.fill(Qt.transparent)
+        painter = QPainter(texture)
+        painter.setPen(self._grid_pen)
+        painter.drawLine(0, 0, texture_px - 1, 0)
+        painter.drawLine(0, 0, 0, texture_px - 1)
+        painter.end()
+        self._grid_brush = QBrush(texture)
+        self._grid_brush.setTransform(QTransform.fromScale(CELL_PX_SIZE / texture_px, CELL_PX_SIZE / texture_px))
+        self._grid_brush_px = device_px
+        return self._grid_brush
+
     def drawForeground(self, painter: QPainter, rect: QRect) -> None:
+        device_px = device_cell_px(painter.worldTransform())
+        # Individual cells are too small to make out at this zoom, the grid would just be noise
+        if lod_cell_px(device_px) is not None:
+            return
         painter.save()
-        painter.setPen(self._grid_pen)
-        left = int(rect.left()) - (int(rect.left()) % CELL_PX_SIZE)
-        right = int(rect.right()) - (int(rect.right()) % CELL_PX_SIZE)
-        top = int(rect.top()) - (int(rect.top()) % CELL_PX_SIZE)
-        bottom = int(rect.bottom()) - (int(rect.bottom()) % CELL_PX_SIZE)
-        lines = []
-        for x in range(left, right + CELL_PX_SIZE, CELL_PX_SIZE):
-            lines.append(QLineF(x, top, x, bottom + CELL_PX_SIZE))
-        for y in range(top, bottom + CELL_PX_SIZE, CELL_PX_SIZE):
-            lines.append(QLineF(left, y, right + CELL_PX_SIZE, y))
-        painter.drawLines(lines)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        painter.fillRect(rect, self._grid_pattern(device_px))
         painter.restore()
 
 
 class LayerViewer(QGraphicsView):
 
+    MAX_CACHED_RASTERS = 128
+
+    z_step_requested = Signal(int)
+    # Emitted for a visible layer once its designation codes are known, with its scene position
+    layer_shown = Signal(object, QPointF, object)
+    layer_hidden = Signal(object)
+    view_rect_changed = Signal(QRectF)
+
     def __init__(self):
         super().__init__()
 
@@ -172,6 +402,125 @@ class LayerViewer(QGraphicsView):
         self.setRenderHint(QPainter.Antialiasing)
         self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.AnchorUnderMouse)
+        self._layer_items: Dict[SectionLayerIndex, LayerItem] = {}
+        self._grid_item: Optional[GridLayerItem] = None
+        self._bounds = QRectF()
+        self._raster_pool = QThreadPool(self)
+        self._raster_tasks: Dict[SectionLayerIndex, LayerRasterTask] = {}
+        self._retired_tasks: Set[LayerRasterTask] = set()
+        self._raster_signals = RasterSignals(self)
+        self._raster_signals.finished.connect(self._raster_finished)
+        self._raster_cache: OrderedDict[SectionLayerIndex, LayerRaster] = OrderedDict()
+        # Scene position and levels of the layers around the current z level of the z navigated sections, meta sections
+        # can apply a layer on several levels
+        self._z_neighbours: Dict[SectionLayerIndex, Tuple[QPointF, List[int]]] = {}
+        self._onion_item: Optional[OnionSkinItem] = None
+        self._onion_depth = 2
+        self._current_z = 0
+        self._hud: Optional[PerformanceHud] = None
+        for scroll_bar in (self.horizontalScrollBar(), self.verticalScrollBar()):
+            scroll_bar.valueChanged.connect(self._emit_view_rect)
+            scroll_bar.rangeChanged.connect(self._emit_view_rect)
+
+    @property
+    def view_rect(self) -> QRectF:
+        return self.mapToScene(self.viewport().rect()).boundingRect()
+
+    def _emit_view_rect(self):
+        self.view_rect_changed.emit(self.view_rect)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._emit_view_rect()
+
+    @Slot(QPointF)
+    def center_on(self, pos: QPointF):
+        self.centerOn(pos)
+
+    @property
+    def current_z(self) -> int:
+        return self._current_z
+
+    @Slot(int)
+    def set_current_z(self, current_z: int):
+        self._current_z = current_z
+        if self._onion_item:
+            self._onion_item.set_z(self._current_z, self._onion_depth)
+
+    @property
+    def performance_hud(self) -> bool:
+        return self._hud is not None
+
+    @Slot(bool)
+    def set_performance_hud(self, enabled: bool):
+        if enabled == self.performance_hud:
+            return
+        instrumentation.set_enabled(enabled)
+        instrumentation.reset()
+        self._hud = PerformanceHud(self) if enabled else None
+        self.viewport().update()
+
+    def paintEvent(self, event: QPaintEvent):
+        started = instrumentation.begin_frame()
+        super().paintEvent(event)
+        instrumentation.end_frame(started)
+        if self._hud:
+            painter = QPainter(self.viewport())
+            self._hud.paint(painter, len(self.scene().items()))
+            painter.end()
+
+    @property
+    def onion_skin(self) -> bool:
+        return self._onion_item is not None
+
+    @Slot(bool)
+    def set_onion_skin(self, enabled: bool):
+        if enabled == self.onion_skin:
+            return
+        if enabled:
+            self._onion_item = OnionSkinItem()
+            self._onion_item.set_z(self._current_z, self._onion_depth)
+            self.scene().addItem(self._onion_item)
+        else:
+            self.scene().removeItem(self._onion_item)
+            self._onion_item = None
+        for layer_item in self._layer_items.values():
+            layer_item.setVisible(not enabled)
+        self._update_onion_item()
+
+    @Slot(int)
+    def set_onion_depth(self, depth: int):
+        self._onion_depth = max(depth, 0)
+        if self._onion_item:
+            self._onion_item.set_z(self._current_z, self._onion_depth)
+
+    def _update_onion_item(self):
+        if not self._onion_item:
+            return
+        bounds = QRectF(self._bounds)
+        layers = [
+            (item.pos(), item.relative_z, item.codes) for item in self._layer_items.values() if item.is_rasterized
+        ]
+        # Prefetched neighbouring levels of z navigated sections show through as well, even though they are hidden
+        for idx, (pos, levels) in self._z_neighbours.items():
+            if (raster := self._raster_cache.get(idx)) is None:
+                continue
+            # A visible layer is only drawn at the current z, a meta section can apply it on the neighbours as well
+            if idx in self._layer_items:
+                levels = [level for level in levels if level != self._layer_items[idx].relative_z]
+            width, height = raster.codes.shape
+            bounds = bounds.united(QRectF(pos.x(), pos.y(), width * CELL_PX_SIZE, height * CELL_PX_SIZE))
+            layers += [(pos, level, raster.codes) for level in levels]
+        self._onion_item.set_layers(bounds, layers)
+
+    def keyPressEvent(self, event: QKeyEvent):
+        # Quickfort's #> moves a blueprint down a z level, relative z grows downwards
+        if event.key() == Qt.Key_PageUp:
+            self.z_step_requested.emit(-1)
+        elif event.key() == Qt.Key_PageDown:
+            self.z_step_requested.emit(1)
+        else:
+            super().keyPressEvent(event)
 
     def wheelEvent(self, event):
         delta = event.angleDelta().y()
@@ -185,50 +534,197 @@ class LayerViewer(QGraphicsView):
             return
 
         self.scale(scale_factor, scale_factor)
+        self._emit_view_rect()
 
     @Slot(ControllerInterface)
     def project_changed(self, _):
+        onion_skin = self.onion_skin
+        for idx in list(self._raster_tasks):
+            self._cancel_raster(idx)
         self.scene().clear()
+        self._layer_items.clear()
+        self._raster_cache.clear()
+        self._z_neighbours.clear()
+        self._onion_item = None
+        self._grid_item = None
+        self._bounds = QRectF()
         scene = GridScene(self)
         scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.setScene(scene)
         self.scale_view(1.0)
-
-    @Slot(ControllerInterface, list, list)
-    def layer_visibility_changed(self, controller: ControllerInterface, *_):
-        self.scene().clear()
-        visible = controller.visible_layers
-        if not visible:
+        # The onion skin stays on for the new project, the item went with the previous scene
+        if onion_skin:
+            self.set_onion_skin(True)
+
+    def _schedule_raster(self, idx: SectionLayerIndex, layer: GridLayer):
+        task = LayerRasterTask(idx, layer, LOD_CELL_PX_SIZES, self._raster_signals)
+        self._raster_tasks[idx] = task
+        self._raster_pool.start(task)
+
+    def wait_for_rasters(self, msecs: int = -1) -> bool:
+        """
+        Blocks until the scheduled rasterizations are done and shown, for benchmarks and scripts without an event loop.
+        """
+        if not self._raster_pool.waitForDone(msecs):
+            return False
+        # The finished notifications of the workers are queued for this view
+        QCoreApplication.sendPostedEvents(self)
+        return not self._raster_tasks
+
+    def _cancel_raster(self, idx: SectionLayerIndex):
+        if not (task := self._raster_tasks.pop(idx, None)):
             return
+        task.cancel()
+        # A task that already started has to report back before it can be let go of
+        if not self._raster_pool.tryTake(task):
+            self._retired_tasks.add(task)
+
+    @Slot(object)
+    def _raster_finished(self, task: LayerRasterTask):
+        # Results of cancelled or superseded tasks are dropped
+        self._retired_tasks.discard(task)
+        if self._raster_tasks.get(task.key) is not task or task.raster is None:
+            return
+        self._raster_tasks.pop(task.key)
+        self._cache_raster(task.key, task.raster)
+        if layer_item := self._layer_items.get(task.key):
+            layer_item.set_raster(task.raster)
+            self.layer_shown.emit(task.key, layer_item.pos(), layer_item.codes)
+        if task.key in self._layer_items or task.key in self._z_neighbours:
+            self._update_onion_item()
+
+    def _cache_raster(self, idx: SectionLayerIndex, raster: LayerRaster):
+        self._raster_cache[idx] = raster
+        self._raster_cache.move_to_end(idx)
+        while len(self._raster_cache) > self.MAX_CACHED_RASTERS:
+            self._raster_cache.popitem(last=False)
+
+    def _cached_raster(self, idx: SectionLayerIndex) -> Optional[LayerRaster]:
+        if (raster := self._raster_cache.get(idx)) is not None:
+            self._raster_cache.move_to_end(idx)
+        return raster
+
+    def _prefetch(self, controller: ControllerInterface, z: int):
+        """
+        Rasterizes the layers of the z navigated sections just above and below z into the raster cache ahead of time,
+        so stepping to them shows them right away. Prefetches that are no longer next to z are cancelled.
+        """
+        depth = max(self._onion_depth if self.onion_skin else 1, 1)
+        neighbours = {}
+        for level in range(z - depth, z + depth + 1):
+            for idx, _ in controller.layers_at_z(level) if level != z else []:
+                if idx not in neighbours:
+                    start = controller.layer_start_position(idx)
+                    neighbours[idx] = QPointF(-start.x * CELL_PX_SIZE, -start.y * CELL_PX_SIZE), []
+                neighbours[idx][1].append(level)
+        for idx in self._z_neighbours:
+            if idx not in neighbours and idx not in self._layer_items:
+                self._cancel_raster(idx)
+        self._z_neighbours = neighbours
+        for idx in neighbours:
+            if idx in self._raster_tasks or self._cached_raster(idx) is not None:
+                continue
+            self._schedule_raster(idx, controller.grid_layer(idx))
+
+    @staticmethod
+    def _shown_z(controller: ControllerInterface) -> Dict[SectionLayerIndex, int]:
+        """
+        The z of the layers z navigation shows, meta sections apply the layers of the sections they reference at
+        other levels than the layers' own.
+        """
+        return dict(controller.layers_at_z(controller.current_z))
+
+    def _create_layer_item(
+        self, controller: ControllerInterface, idx: SectionLayerIndex, shown_z: Dict[SectionLayerIndex, int]
+    ) -> Optional[LayerItem]:
+        if not (layer := controller.grid_layer(idx)):
+            return None
+        layer_item = LayerItem(layer.width, layer.height, relative_z=shown_z.get(idx, layer.relative_z))
+        layer_item.setVisible(not self.onion_skin)
+        start = controller.layer_start_position(idx)
+        layer_item.setPos(-start.x * CELL_PX_SIZE, -start.y * CELL_PX_SIZE)
+        layer_item.set_changed_callback(lambda item: self._layer_item_changed(idx, item))
+        if (raster := self._cached_raster(idx)) is not None:
+            layer_item.set_raster(raster)
+        elif idx not in self._raster_tasks:
+            self._schedule_raster(idx, layer)
+        return layer_item
+
+    def _layer_item_changed(self, idx: SectionLayerIndex, layer_item: LayerItem):
+        # The minimap and the onion skin draw the edited codes as well, the onion skin drops its cached tiles
+        self.layer_shown.emit(idx, layer_item.pos(), layer_item.codes)
+        self._update_onion_item()
+
+    def _remove_layer_item(self, idx: SectionLayerIndex) -> bool:
+        if idx not in self._z_neighbours:
+            self._cancel_raster(idx)
+        if not (layer_item := self._layer_items.pop(idx, None)):
+            return False
+        removed = layer_item.sceneBoundingRect()
+        self.scene().removeItem(layer_item)
+        self.layer_hidden.emit(idx)
+        # Only a layer on the edge of the bounds can shrink them
+        on_edge = (
+            removed.left() <= self._bounds.left() or removed.right() >= self._bounds.right() or
+            removed.top() <= self._bounds.top() or removed.bottom() >= self._bounds.bottom()
+        )
+        if on_edge:
+            self._bounds = QRectF()
+            for item in self._layer_items.values():
+                self._bounds = self._bounds.united(item.sceneBoundingRect())
+        return True
+
+    def _add_layer_item(
+        self, controller: ControllerInterface, idx: SectionLayerIndex, shown_z: Dict[SectionLayerIndex, int]
+    ) -> bool:
+        if idx in self._layer_items or not (layer_item := self._create_layer_item(controller, idx, shown_z)):
+            return False
+        self._layer_items[idx] = layer_item
+        self.scene().addItem(layer_item)
+        self._bounds = self._bounds.united(layer_item.sceneBoundingRect())
+        if layer_item.is_rasterized:
+            self.layer_shown.emit(idx, layer_item.pos(), layer_item.codes)
+        return True
+
+    def _update_grid_item(self):
+        if not self._layer_items:
+            if self._grid_item:
+                self.scene().removeItem(self._grid_item)
+                self._grid_item = None
+            return
+        cell_width = self._bounds.width() / CELL_PX_SIZE
+        cell_height = self._bounds.height() / CELL_PX_SIZE
+        if not self._grid_item:
+            self._grid_item = GridLayerItem(cell_width, cell_height)
+            self.scene().addItem(self._grid_item)
+        else:
+            self._grid_item.set_cell_size(cell_width, cell_height)
+        self._grid_item.setPos(self._bounds.left(), self._bounds.top())
 
-        layer_items = []
-        left, right, bottom, top = math.inf, -math.inf, -math.inf, math.inf
-        for idx, layer in visible.items():
-            layer_item = LayerItem(layer.width, layer.height)
-            # TODO: CLean this up / init from Layer
-            for (x, y), cell in layer.walk(lambda i, j, c: c is not None):
-                layer_item._cells[x][y] = DesignationCell(x, y, cell.designation)
-            start = controller.layer_start_position(idx)
-            real_x = start.x * CELL_PX_SIZE
-            real_y = start.y * CELL_PX_SIZE
-            real_l = layer_item.boundingRect().left() - real_x
-            real_r = layer_item.boundingRect().right() - real_x
-            real_t = layer_item.boundingRect().top() - real_y
-            real_b = layer_item.boundingRect().bottom() - real_y
-            left = min(left, real_l)
-            right = max(right, real_r)
-            top = min(top, real_t)
-            bottom = max(bottom, real_b)
-            layer_item.setPos(-real_x, -real_y)
-            layer_items.append(layer_item)
-
-        bounding_w = right - left
-        bounding_h = bottom - top
-        print(f'{top/CELL_PX_SIZE}, {left/CELL_PX_SIZE}, {right/CELL_PX_SIZE}, {bottom/CELL_PX_SIZE}')
-        print(f'{bounding_w/CELL_PX_SIZE}, {bounding_h/CELL_PX_SIZE}')
-        grid_item = GridLayerItem(bounding_w/CELL_PX_SIZE, bounding_h/CELL_PX_SIZE)
-        grid_item.setPos(left, top)
-        for layer_item in layer_items:
-            self.scene().addItem(layer_item)
-        self.scene().addItem(grid_item)
-        self.fitInView(grid_item, Qt.KeepAspectRatio)
+    @Slot(ControllerInterface, list, list)
+    @profiling.profiled("visibility_change")
+    def layer_visibility_changed(self, controller: ControllerInterface, removed: list, added: list):
+        started = instrumentation.start()
+        changed = False
+        for idx in removed:
+            changed = self._remove_layer_item(idx) or changed
+        shown_z = self._shown_z(controller) if added else {}
+        for idx in added:
+            changed = self._add_layer_item(controller, idx, shown_z) or changed
+        if changed:
+            self._update_grid_item()
+            self._update_onion_item()
+            if self._grid_item:
+                self.fitInView(self._grid_item, Qt.KeepAspectRatio)
+        instrumentation.record_time("visibility_rebuild", started)
+
+    @Slot(ControllerInterface, int)
+    def z_level_changed(self, controller: ControllerInterface, z: int):
+        self.set_current_z(z)
+        # A layer a meta section applies on several levels stays visible from one of them to the next
+        shown_z = self._shown_z(controller)
+        for idx, layer_item in self._layer_items.items():
+            if (layer := controller.grid_layer(idx)) is not None:
+                layer_item.set_relative_z(shown_z.get(idx, layer.relative_z))
+        self._prefetch(controller, z)
+        self._update_onion_item()
@@ -0,0 +1,60 @@
+from typing import List
+
+from PySide6.QtCore import QObject, QPoint, QRect, Qt
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter
+
+from qfui import instrumentation
+
+
+def _ms(ns: int) -> str:
+    return f"{ns / 1e6:.2f} ms"
+
+
+class PerformanceHud(QObject):
+    """
+    Overlay text box with the instrumentation values of the last frame, painted on top of a view's viewport.
+    """
+
+    MARGIN_PX = 8
+    PADDING_PX = 6
+
+    def __init__(self, parent: QObject = None):
+        super().__init__(parent)
+        self._font = QFont("monospace")
+        self._font.setStyleHint(QFont.Monospace)
+        self._background = QColor(0, 0, 0, 170)
+        self._foreground = QColor(Qt.white)
+
+    def lines(self, scene_items: int) -> List[str]:
+        frame = instrumentation.last_frame()
+        timings = instrumentation.timings()
+        counters = instrumentation.counters()
+        layer_paints = frame.get("layer_paint.count", 0)
+        layer_paint = frame.get("layer_paint", 0)
+        lookups = counters.get("sprites.hit", 0) + counters.get("sprites.miss", 0)
+        hit_rate = f"{100 * counters.get('sprites.hit', 0) / lookups:.1f} %" if lookups else "-"
+        return [
+            self.tr("Frame paint: {0}").format(_ms(frame.get("frame", 0))),
+            self.tr("Layer paint: {0} total, {1} avg over {2} items").format(
+                _ms(layer_paint), _ms(layer_paint // layer_paints if layer_paints else 0), layer_paints
+            ),
+            self.tr("Scene items: {0}").format(scene_items),
+            self.tr("Cells drawn: {0}").format(frame.get("cells", 0)),
+            self.tr("Sprite cache hits: {0} of {1} lookups").format(hit_rate, lookups),
+            self.tr("Visibility rebuild: {0}").format(_ms(timings.get("visibility_rebuild", 0))),
+        ]
+
+    def paint(self, painter: QPainter, scene_items: int):
+        lines = self.lines(scene_items)
+        metrics = QFontMetrics(self._font)
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 2 * self.PADDING_PX
+        height = metrics.lineSpacing() * len(lines) + 2 * self.PADDING_PX
+        painter.save()
+        painter.resetTransform()
+        painter.setFont(self._font)
+        painter.fillRect(QRect(self.MARGIN_PX, self.MARGIN_PX, width, height), self._background)
+        painter.setPen(self._foreground)
+        origin = QPoint(self.MARGIN_PX + self.PADDING_PX, self.MARGIN_PX + self.PADDING_PX + metrics.ascent())
+        for line_no, line in enumerate(lines):
+            painter.drawText(origin + QPoint(0, line_no * metrics.lineSpacing()), line)
+        painter.restore()
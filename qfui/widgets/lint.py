@@ -0,0 +1,45 @@
+from typing import Optional
+
+from PySide6.QtCore import Qt, Signal, Slot
+from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
+
+from qfui.controller.messages import ControllerInterface
+from qfui.models.lint import LintIssue, lint_sections
+
+
+class LintWidget(QWidget):
+    """
+    Lists the lint issues of the project's dig sections, activating an issue asks for its layer to be shown.
+    """
+
+    issue_activated = Signal(object)
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self._layout = QVBoxLayout(self)
+        self._tree = QTreeWidget(self)
+        self._tree.setHeaderLabels([self.tr("Section"), self.tr("Z"), self.tr("Cell"), self.tr("Issue")])
+        self._tree.setRootIsDecorated(False)
+        self._tree.setSortingEnabled(True)
+        self._tree.itemActivated.connect(self._item_activated)
+        self._layout.addWidget(self._tree)
+
+    @Slot(ControllerInterface)
+    def project_changed(self, controller: ControllerInterface):
+        self._tree.setSortingEnabled(False)
+        self._tree.clear()
+        labels = {section.suuid: f"{idx:03d} {section.label}" for idx, section in enumerate(controller.sections)}
+        items = []
+        for issue in lint_sections(controller.sections):
+            # Cells are shown 1 based like the blueprint start positions
+            item = QTreeWidgetItem([labels[issue.suuid], "", f"{issue.x + 1}, {issue.y + 1}", issue.message])
+            # Levels sort by number rather than text
+            item.setData(1, Qt.DisplayRole, issue.relative_z)
+            item.setData(0, Qt.UserRole, issue)
+            items.append(item)
+        self._tree.addTopLevelItems(items)
+        self._tree.setSortingEnabled(True)
+
+    def _item_activated(self, item: QTreeWidgetItem, _: int):
+        issue: LintIssue = item.data(0, Qt.UserRole)
+        self.issue_activated.emit(issue)
@@ -1,13 +1,16 @@
 from typing import Optional
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QPointF, Qt
 from PySide6.QtGui import QAction
-from PySide6.QtWidgets import QMainWindow, QDockWidget, QFileDialog
+from PySide6.QtWidgets import QMainWindow, QDockWidget, QFileDialog, QProgressBar, QPushButton
 
-from qfui.models.project import Project
-from qfui.qfparser.importers import CSVImporter
+from qfui.models.lint import LintIssue
+from qfui.models.project import Project, SectionLayerIndex
+from qfui.controller.messages import ControllerInterface
 from qfui.controller.project import ProjectController
-from qfui.widgets.gridview import LayerViewer
+from qfui.widgets.gridview import CELL_PX_SIZE, LayerViewer
+from qfui.widgets.lint import LintWidget
+from qfui.widgets.minimap import Minimap
 from qfui.widgets.navigation import NavigationWidget
 
 
@@ -19,23 +22,98 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(self.tr("Quick Fort Designer"))
         self._init_actions()
         self._init_menus()
+        self._init_import_progress()
         self._init_docks()
         self._init_centrals()
         if project is not None:
             self._controller.project = project
 
+    @property
+    def controller(self) -> ControllerInterface:
+        return self._controller
+
+    @property
+    def layer_viewer(self) -> LayerViewer:
+        return self._layer_view
+
+    @property
+    def navigation(self) -> NavigationWidget:
+        return self._navigation.widget()
+
     def _init_centrals(self):
         self._layer_view = LayerViewer()
         self._controller.layer_visibility_changed.connect(self._layer_view.layer_visibility_changed)
         self._controller.project_changed.connect(self._layer_view.project_changed)
+        self._onion_skin_action.toggled.connect(self._layer_view.set_onion_skin)
+        self._performance_hud_action.toggled.connect(self._layer_view.set_performance_hud)
+        self._controller.z_level_changed.connect(self._layer_view.z_level_changed)
+        self._controller.z_level_changed.connect(self._z_level_changed)
+        self._layer_view.z_step_requested.connect(self._controller.step_z)
+        self._layer_view.layer_shown.connect(self._minimap.widget().set_layer)
+        self._layer_view.layer_hidden.connect(self._minimap.widget().remove_layer)
+        self._layer_view.view_rect_changed.connect(self._minimap.widget().set_view_rect)
+        self._minimap.widget().center_requested.connect(self._layer_view.center_on)
+        self._lint.widget().issue_activated.connect(self._show_lint_issue)
         self.setCentralWidget(self._layer_view)
 
+    def _show_lint_issue(self, issue: LintIssue):
+        idx = SectionLayerIndex(issue.suuid, issue.luuid)
+        # The view fits the visible layers once it is notified, only center on the cell after that
+        with self._controller.batch():
+            self._controller.set_layers_as_visible([idx])
+        start = self._controller.layer_start_position(idx)
+        self._layer_view.center_on(
+            QPointF((issue.x - start.x + 0.5) * CELL_PX_SIZE, (issue.y - start.y + 0.5) * CELL_PX_SIZE)
+        )
+
+    def _z_level_changed(self, _, z: int):
+        self.statusBar().showMessage(self.tr("Z level: {0}").format(z))
+
     def _import_handler(self):
         if not self._import_dialog.exec_():
             return
         file = self._import_dialog.selectedFiles()[0]
-        importer = CSVImporter()
-        self._controller.project = Project(importer.load(file))
+        self._controller.import_file(file)
+
+    def _init_import_progress(self):
+        self._import_progress = QProgressBar(self)
+        # Files are measured in bytes which can overflow the bar's int range, progress is shown in per mille instead
+        self._import_progress.setRange(0, 1000)
+        self._import_progress.setMaximumWidth(200)
+        self._import_cancel = QPushButton(self.tr("Cancel"), self)
+        self._import_cancel.clicked.connect(self._controller.cancel_import)
+        self.statusBar().addPermanentWidget(self._import_progress)
+        self.statusBar().addPermanentWidget(self._import_cancel)
+        self._import_progress.hide()
+        self._import_cancel.hide()
+        self._controller.import_started.connect(self._import_started)
+        self._controller.import_progress.connect(self._import_progressed)
+        self._controller.import_finished.connect(self._import_finished)
+        self._controller.import_failed.connect(self._import_failed)
+
+    def _show_import_progress(self, visible: bool):
+        self._import_progress.setValue(0)
+        self._import_progress.setVisible(visible)
+        self._import_cancel.setVisible(visible)
+
+    def _import_started(self, _: ControllerInterface, file: str):
+        self._show_import_progress(True)
+        self.statusBar().showMessage(self.tr("Importing {0}").format(file))
+
+    def _import_progressed(self, _: ControllerInterface, bytes_read: int, total_bytes: int, sections: int):
+        self._import_progress.setValue(bytes_read * 1000 // total_bytes if total_bytes else 0)
+        self._import_progress.setFormat(self.tr("{0} sections").format(sections))
+
+    def _import_finished(self, _: ControllerInterface, file: str):
+        self._show_import_progress(False)
+        self.statusBar().showMessage(self.tr("Imported {0}").format(file))
+
+    def _import_failed(self, _: ControllerInterface, file: str, reason: str):
+        self._show_import_progress(False)
+        if reason:
+            self.statusBar().showMessage(self.tr("Could not import {0}: {1}").format(file, reason))
+        else:
+            self.statusBar().showMessage(self.tr("Import of {0} cancelled").format(file))
 
     def _init_actions(self):
         self._import_dialog = QFileDialog(self)
@@ -43,10 +121,17 @@ class MainWindow(QMainWindow):
         self._import_dialog.setViewMode(QFileDialog.Detail)
         self._import_action = QAction(self.tr("&Import"), self)
         self._import_action.triggered.connect(self._import_handler)
+        self._onion_skin_action = QAction(self.tr("&Onion Skin"), self)
+        self._onion_skin_action.setCheckable(True)
+        self._performance_hud_action = QAction(self.tr("&Performance HUD"), self)
+        self._performance_hud_action.setCheckable(True)
 
     def _init_menus(self):
         self._file_menu = self.menuBar().addMenu(self.tr("&File"))
         self._file_menu.addAction(self._import_action)
+        self._view_menu = self.menuBar().addMenu(self.tr("&View"))
+        self._view_menu.addAction(self._onion_skin_action)
+        self._view_menu.addAction(self._performance_hud_action)
 
     def _init_docks(self):
         self._navigation = QDockWidget(self)
@@ -54,9 +139,25 @@ class MainWindow(QMainWindow):
         self._controller.project_changed.connect(self._navigation.widget().project_changed)
         self._navigation.widget().layers_set_as_visible.connect(self._controller.set_layers_as_visible)
         self._navigation.widget().remove_layers_as_visible.connect(self._controller.remove_layers_as_visible)
+        self._navigation.widget().add_z_sections.connect(self._controller.add_z_sections)
+        self._navigation.widget().remove_z_sections.connect(self._controller.remove_z_sections)
         self._controller.layer_visibility_changed.connect(self._navigation.widget().layer_visibility_changed)
         self._navigation.setAllowedAreas(
             Qt.LeftDockWidgetArea |
             Qt.RightDockWidgetArea
         )
         self.addDockWidget(Qt.RightDockWidgetArea, self._navigation)
+        self._minimap = QDockWidget(self.tr("Minimap"), self)
+        self._minimap.setWidget(Minimap(CELL_PX_SIZE, self))
+        self._controller.project_changed.connect(self._minimap.widget().project_changed)
+        self._minimap.setAllowedAreas(
+            Qt.LeftDockWidgetArea |
+            Qt.RightDockWidgetArea
+        )
+        self.addDockWidget(Qt.RightDockWidgetArea, self._minimap)
+        self._view_menu.addAction(self._minimap.toggleViewAction())
+        self._lint = QDockWidget(self.tr("Lint"), self)
+        self._lint.setWidget(LintWidget(self))
+        self._controller.project_changed.connect(self._lint.widget().project_changed)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self._lint)
+        self._view_menu.addAction(self._lint.toggleViewAction())
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+import numpy
+from PySide6.QtCore import QPointF, QRect, QRectF, QSize, Qt, Signal, Slot
+from PySide6.QtGui import QBrush, QImage, QMouseEvent, QPainter, QPaintEvent, QPen
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from qfui import rendering
+from qfui.controller.messages import ControllerInterface
+
+
+class Minimap(QWidget):
+    """
+    Overview of all visible layers at one pixel per cell. The overview image is kept as a premultiplied float array that
+    is only recomposed where a layer was added or removed, tracking the view just moves the viewport rectangle.
+    Positions are in cells, the conversion from and to scene coordinates is done with cell_px.
+    """
+
+    center_requested = Signal(QPointF)
+
+    def __init__(self, cell_px: int, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self._cell_px = cell_px
+        self._layers: OrderedDict[Hashable, Tuple[int, int, numpy.ndarray]] = OrderedDict()
+        self._bounds = QRect()
+        self._pixels = numpy.zeros((0, 0, 4), dtype=numpy.float32)
+        self._image: Optional[QImage] = None
+        self._view_rect = QRectF()
+        self._view_pen = QPen(QBrush(Qt.red), 1)
+        self._view_pen.setCosmetic(True)
+        self.setMinimumSize(64, 64)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def sizeHint(self) -> QSize:
+        return QSize(200, 200)
+
+    @staticmethod
+    def _layer_rect(layer: Tuple[int, int, numpy.ndarray]) -> QRect:
+        x, y, codes = layer
+        width, height = codes.shape
+        return QRect(x, y, width, height)
+
+    def _compose(self, region: QRect):
+        """
+        Recomposes the given cells of the overview from the layers that overlap them, in the order they were shown.
+        """
+        region = region.intersected(self._bounds)
+        if region.isEmpty():
+            return
+        left, top = region.left() - self._bounds.left(), region.top() - self._bounds.top()
+        target = self._pixels[top:top + region.height(), left:left + region.width()]
+        target.fill(0)
+        for layer in self._layers.values():
+            overlap = self._layer_rect(layer).intersected(region)
+            if overlap.isEmpty():
+                continue
+            x, y, codes = layer
+            cells = codes[overlap.left() - x:overlap.right() + 1 - x, overlap.top() - y:overlap.bottom() + 1 - y]
+            tx, ty = overlap.left() - region.left(), overlap.top() - region.top()
+            rendering.composite_over(
+                target[ty:ty + overlap.height(), tx:tx + overlap.width()], rendering.layer_pixels(cells, 1)
+            )
+        self._image = None
+
+    def _rebuild(self):
+        self._bounds = QRect()
+        for layer in self._layers.values():
+            self._bounds = self._bounds.united(self._layer_rect(layer))
+        self._pixels = numpy.zeros((self._bounds.height(), self._bounds.width(), 4), dtype=numpy.float32)
+        self._compose(self._bounds)
+
+    def _on_edge(self, rect: QRect) -> bool:
+        """Whether the cells reach the edge of the bounds, only then can taking them away shrink the bounds"""
+        return (
+            rect.left() <= self._bounds.left() or rect.right() >= self._bounds.right() or
+            rect.top() <= self._bounds.top() or rect.bottom() >= self._bounds.bottom()
+        )
+
+    @Slot(object, QPointF, object)
+    def set_layer(self, idx: Hashable, pos: QPointF, codes: numpy.ndarray):
+        # A replaced layer keeps its place in the order layers are composed in
+        old = self._layers.get(idx)
+        layer = int(round(pos.x() / self._cell_px)), int(round(pos.y() / self._cell_px)), codes
+        self._layers[idx] = layer
+        rect = self._layer_rect(layer)
+        # Cells the replaced layer covered outside of the new one have to be recomposed as well
+        uncovered = self._layer_rect(old) if old is not None and not rect.contains(self._layer_rect(old)) else None
+        if not self._bounds.contains(rect) or (uncovered is not None and self._on_edge(uncovered)):
+            self._rebuild()
+        else:
+            if uncovered is not None:
+                self._compose(uncovered)
+            self._compose(rect)
+        self.update()
+
+    @Slot(object)
+    def remove_layer(self, idx: Hashable):
+        if not (layer := self._layers.pop(idx, None)):
+            return
+        rect = self._layer_rect(layer)
+        if self._on_edge(rect):
+            self._rebuild()
+        else:
+            self._compose(rect)
+        self.update()
+
+    @Slot(ControllerInterface)
+    def project_changed(self, _):
+        self._layers.clear()
+        self._rebuild()
+        self.update()
+
+    @Slot(QRectF)
+    def set_view_rect(self, rect: QRectF):
+        self._view_rect = QRectF(
+            rect.x() / self._cell_px, rect.y() / self._cell_px,
+            rect.width() / self._cell_px, rect.height() / self._cell_px
+        )
+        self.update()
+
+    def _overview_transform(self) -> Tuple[float, QPointF]:
+        scale = min(self.width() / self._bounds.width(), self.height() / self._bounds.height())
+        offset = QPointF(
+            (self.width() - self._bounds.width() * scale) / 2 - self._bounds.left() * scale,
+            (self.height() - self._bounds.height() * scale) / 2 - self._bounds.top() * scale
+        )
+        return scale, offset
+
+    def paintEvent(self, event: QPaintEvent):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().base())
+        if self._bounds.isEmpty():
+            return
+        if self._image is None:
+            self._image = rendering.pixels_to_image(numpy.rint(self._pixels).astype(numpy.uint8))
+        scale, offset = self._overview_transform()
+        painter.translate(offset)
+        painter.scale(scale, scale)
+        painter.drawImage(self._bounds.topLeft(), self._image)
+        painter.setPen(self._view_pen)
+        painter.drawRect(self._view_rect)
+        painter.end()
+
+    def _request_center(self, event: QMouseEvent):
+        if self._bounds.isEmpty():
+            return
+        scale, offset = self._overview_transform()
+        cell = (event.position() - offset) / scale
+        self.center_requested.emit(cell * self._cell_px)
+
+    def mousePressEvent(self, event: QMouseEvent):
+        if event.button() == Qt.LeftButton:
+            self._request_center(event)
+
+    def mouseMoveEvent(self, event: QMouseEvent):
+        if event.buttons() & Qt.LeftButton:
+            self._request_center(event)
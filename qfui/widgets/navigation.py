@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import uuid
 from abc import ABC, abstractmethod
-from typing import List, Optional, Set
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set
 
-from PySide6.QtCore import QAbstractItemModel, QModelIndex, QObject, Qt, QSortFilterProxyModel, Signal, Slot
+from PySide6.QtCore import (
+    QAbstractItemModel, QModelIndex, QObject, QPersistentModelIndex, QPoint, QSize, Qt, QSortFilterProxyModel,
+    QTimer, Signal, Slot,
+)
 from PySide6.QtGui import QIcon, QAction
 from PySide6.QtWidgets import QWidget, QTreeView, QToolBar, QVBoxLayout, QLineEdit, QLabel, QMenu
 
@@ -12,6 +17,8 @@ from qfui.models.enums import SectionModes
 from qfui.models.layers import GridLayer
 from qfui.models.sections import Section, GridSection
 from qfui.models.project import SectionLayerIndex
+from qfui.models.search import SectionSearchIndex
+from qfui.thumbnails import ThumbnailCache, default_cache_dir
 from qfui.utils import QABCMeta
 from qfui.widgets.modes import ModeSelectionDialog
 
@@ -43,12 +50,22 @@ class Node(ABC, QObject, metaclass=QABCMeta):
         pass
 
 
+def _has_active_layer(section: Section) -> bool:
+    return section.mode == SectionModes.DIG and any(layer.active or layer.visible for layer in section.layers)
+
+
 class SimpleNode(Node, metaclass=QABCMeta):
+    """
+    A node that knows its row in its parent. Nodes can hold back children until the view asks for them, those are
+    created by fetch_children once can_fetch_more says there are any left.
+    """
 
     def __init__(self, parent: Optional[Node], children: List[Node]):
         super().__init__()
         self._parent = parent
-        self._children = children
+        self._row = 0
+        self._children = []
+        self.append_children(children)
 
     @property
     @abstractmethod
@@ -69,23 +86,72 @@ class SimpleNode(Node, metaclass=QABCMeta):
 
     @property
     def index_in_parent(self) -> int:
-        if not self.parent_node:
-            return 0
-        return self.parent_node.child_nodes.index(self)
+        return self._row
 
+    @index_in_parent.setter
+    def index_in_parent(self, row: int):
+        self._row = row
 
-class GroupNode(SimpleNode):
+    def _renumber_children(self, first_row: int):
+        for row in range(first_row, len(self._children)):
+            self._children[row].index_in_parent = row
 
-    def __init__(self, parent: SimpleNode, name: str, children: List[SimpleNode]):
+    def append_children(self, children: List[SimpleNode]):
         for child in children:
             child.parent_node = self
+            child.index_in_parent = len(self._children)
+            self._children.append(child)
+
+    def insert_child(self, row: int, child: SimpleNode):
+        child.parent_node = self
+        self._children.insert(row, child)
+        self._renumber_children(row)
+
+    def remove_child(self, row: int) -> SimpleNode:
+        child = self._children.pop(row)
+        self._renumber_children(row)
+        return child
+
+    @property
+    def can_fetch_more(self) -> bool:
+        return False
+
+    def fetch_children(self) -> List[SimpleNode]:
+        return []
+
+    @property
+    def has_children(self) -> bool:
+        return bool(self._children) or self.can_fetch_more
+
+
+class GroupNode(SimpleNode):
+    """
+    Groups up to count children, created by create_child(row) in batches as the view fetches them.
+    """
+
+    FETCH_BATCH_SIZE = 256
+
+    def __init__(
+        self, parent: Node, name: str, children: List[SimpleNode],
+        count: int = 0, create_child: Optional[Callable[[int], SimpleNode]] = None,
+    ):
         super().__init__(parent, children)
         self._name = name
+        self._count = count
+        self._create_child = create_child
 
     @property
     def tree_label(self) -> str:
         return self._name
 
+    @property
+    def can_fetch_more(self) -> bool:
+        return len(self.child_nodes) < self._count
+
+    def fetch_children(self) -> List[SimpleNode]:
+        first = len(self.child_nodes)
+        return [self._create_child(row) for row in range(first, min(first + self.FETCH_BATCH_SIZE, self._count))]
+
 
 class PropertyNode(SimpleNode):
 
@@ -102,20 +168,51 @@ class PropertyNode(SimpleNode):
     def value(self) -> str:
         return self._value
 
+    @value.setter
+    def value(self, value: str):
+        self._value = value
+
 
 class LayerNode(SimpleNode):
 
-    def __init__(self, label: str, parent: Node, section_layer_index: SectionLayerIndex, layer: GridLayer):
+    def __init__(
+        self, label: str, parent: Node, section_layer_index: SectionLayerIndex, layer: GridLayer, layer_position: int
+    ):
         self._section_layer_idx = section_layer_index
+        self._layer = layer
+        self._layer_position = layer_position
         self._tree_label = label
-        children = [
+        self._visible_node: Optional[PropertyNode] = None
+        self._fetched = False
+        super().__init__(parent, [])
+
+    @property
+    def layer_position(self) -> int:
+        return self._layer_position
+
+    @property
+    def can_fetch_more(self) -> bool:
+        return not self._fetched
+
+    def fetch_children(self) -> List[SimpleNode]:
+        self._fetched = True
+        layer = self._layer
+        self._visible_node = PropertyNode(self, self.tr("Visible"), str(layer.visible))
+        return [
             PropertyNode(self, self.tr("Relative Z"), str(layer.relative_z)),
             PropertyNode(self, self.tr("Width"), str(layer.width)),
             PropertyNode(self, self.tr("Height"), str(layer.height)),
-            PropertyNode(self, self.tr("Visible"), str(layer.visible)),
+            self._visible_node,
             PropertyNode(self, self.tr("Editable"), str(layer.active))
         ]
-        super().__init__(parent, children)
+
+    def update_visibility(self) -> Optional[PropertyNode]:
+        """
+        Refreshes the Visible property row, if it was created, and returns it.
+        """
+        if self._visible_node:
+            self._visible_node.value = str(self._layer.visible)
+        return self._visible_node
 
     @property
     def tree_label(self) -> str:
@@ -125,16 +222,39 @@ class LayerNode(SimpleNode):
     def section_layer_index(self) -> SectionLayerIndex:
         return self._section_layer_idx
 
+    @property
+    def layer(self) -> GridLayer:
+        return self._layer
+
 
 class SectionNode(SimpleNode):
 
     def __init__(self, parent: Optional[SimpleNode], section_idx: int, section: Section, active_only: bool = False):
+        self._section = section
         self._section_idx = section_idx
+        self._section_uuid = section.suuid
         self._section_mode = section.mode
         self._section_label = section.label
         self._section_comment = section.comment
-        self._has_active_layer = False
         self._active_only = active_only
+        self._fetched = False
+        super().__init__(parent, [])
+
+    @property
+    def has_active_layer(self) -> bool:
+        return _has_active_layer(self._section)
+
+    @property
+    def fetched(self) -> bool:
+        return self._fetched
+
+    @property
+    def can_fetch_more(self) -> bool:
+        return not self._fetched
+
+    def fetch_children(self) -> List[SimpleNode]:
+        self._fetched = True
+        section = self._section
         children = [
             PropertyNode(self, self.tr("Mode"), section.mode.value),
             PropertyNode(self, self.tr("Label"), section.label)
@@ -143,18 +263,26 @@ class SectionNode(SimpleNode):
             children.append(PropertyNode(self, self.tr("Start"), str(section.start)))
         if section.mode == SectionModes.DIG:
             section: GridSection = section
-            prefix = self.tr("Layer")
             children += [
-                LayerNode(f"{prefix} {lidx:03d}", self, SectionLayerIndex(section.suuid, layer.luuid), layer)
+                self.create_layer_node(lidx, layer)
                 for lidx, layer in enumerate(section.layers)
                 if not self._active_only or layer.active or layer.visible
             ]
-            self._has_active_layer = any(layer.active or layer.visible for layer in section.layers)
-        super().__init__(parent, children)
+        return children
+
+    def create_layer_node(self, layer_position: int, layer: GridLayer) -> LayerNode:
+        label = f"{self.tr('Layer')} {layer_position:03d}"
+        return LayerNode(label, self, SectionLayerIndex(self._section_uuid, layer.luuid), layer, layer_position)
 
     @property
-    def has_active_layer(self) -> bool:
-        return self._has_active_layer
+    def layer_nodes(self) -> List[LayerNode]:
+        return [child for child in self.child_nodes if isinstance(child, LayerNode)]
+
+    def layer_insert_row(self, layer_position: int) -> int:
+        for row, child in enumerate(self.child_nodes):
+            if isinstance(child, LayerNode) and child.layer_position > layer_position:
+                return row
+        return len(self.child_nodes)
 
     @property
     def mode(self) -> SectionModes:
@@ -164,6 +292,10 @@ class SectionNode(SimpleNode):
     def section_idx(self) -> int:
         return self._section_idx
 
+    @property
+    def section_uuid(self) -> uuid.UUID:
+        return self._section_uuid
+
     @property
     def tree_label(self) -> str:
         return f"{self._section_idx:03d} - {self._section_label}"
@@ -187,20 +319,65 @@ class RootNode(Node):
         super().__init__()
         self._sections_node = GroupNode(self, self.tr("Sections"), [])
         self._active_node = GroupNode(self, self.tr("Active Layers"), [])
-        self._layer_lookup = {}
+        self._sections_node.index_in_parent = 1
+        self._layer_lookup: Dict[SectionLayerIndex, List[LayerNode]] = {}
+        self._section_indexes: Dict[uuid.UUID, int] = {}
+        self._active_sections: Dict[uuid.UUID, SectionNode] = {}
         self.init_from_controller(controller)
 
     def init_from_controller(self, controller: ControllerInterface):
         if not controller:
             return
-        sections_children = []
-        active_section_children = []
-        for sidx, section in enumerate(controller.sections):
-            sections_children.append(SectionNode(None, sidx, section))
-            if sections_children[-1].has_active_layer:
-                active_section_children.append(SectionNode(None, sidx, section, True))
-        self._sections_node = GroupNode(self, self.tr("Sections"), sections_children)
+        sections = controller.sections
+        # Section nodes are only created as the view fetches them, the few active ones are created right away
+        active_section_children = [
+            SectionNode(None, sidx, section, True)
+            for sidx, section in enumerate(sections)
+            if _has_active_layer(section)
+        ]
+        self._sections_node = GroupNode(
+            self, self.tr("Sections"), [], len(sections), lambda sidx: SectionNode(None, sidx, sections[sidx])
+        )
         self._active_node = GroupNode(self, self.tr("Active Layers"), active_section_children)
+        self._sections_node.index_in_parent = 1
+        self._section_indexes = {section.suuid: sidx for sidx, section in enumerate(sections)}
+        self._active_sections = {node.section_uuid: node for node in active_section_children}
+
+    @property
+    def sections_node(self) -> GroupNode:
+        return self._sections_node
+
+    @property
+    def active_node(self) -> GroupNode:
+        return self._active_node
+
+    def layer_nodes(self, idx: SectionLayerIndex) -> List[LayerNode]:
+        return self._layer_lookup.get(idx, [])
+
+    def register_layer_nodes(self, nodes: List[LayerNode]):
+        for node in nodes:
+            self._layer_lookup.setdefault(node.section_layer_index, []).append(node)
+
+    def unregister_layer_nodes(self, nodes: List[LayerNode]):
+        for node in nodes:
+            if node in (lookup := self._layer_lookup.get(node.section_layer_index, [])):
+                lookup.remove(node)
+
+    def section_index(self, suuid: uuid.UUID) -> Optional[int]:
+        return self._section_indexes.get(suuid)
+
+    def active_section(self, suuid: uuid.UUID) -> Optional[SectionNode]:
+        return self._active_sections.get(suuid)
+
+    def insert_active_section(self, row: int, node: SectionNode):
+        self._active_node.insert_child(row, node)
+        self._active_sections[node.section_uuid] = node
+        self.register_layer_nodes(node.layer_nodes)
+
+    def remove_active_section(self, node: SectionNode):
+        self._active_node.remove_child(node.index_in_parent)
+        self._active_sections.pop(node.section_uuid, None)
+        self.unregister_layer_nodes(node.layer_nodes)
 
     @property
     def child_nodes(self) -> List[SimpleNode]:
@@ -217,6 +394,8 @@ class NavigationTreeFilter(QSortFilterProxyModel):
         super().__init__()
         self._allowed_modes = set([s for s in SectionModes if s != SectionModes.IGNORE])
         self._text_search = None
+        self._search_index = SectionSearchIndex()
+        self._search_matches: Optional[Set[uuid.UUID]] = None
 
     @property
     def allowed_modes(self):
@@ -226,9 +405,41 @@ class NavigationTreeFilter(QSortFilterProxyModel):
     def allowed_modes(self, modes: Set[SectionModes] = None):
         self._allowed_modes = modes or set()
 
+    @property
+    def search_index(self) -> SectionSearchIndex:
+        return self._search_index
+
+    @search_index.setter
+    def search_index(self, search_index: SectionSearchIndex):
+        self._search_index = search_index
+        self._search_matches = self._search_index.search(self._text_search) if self._text_search else None
+
+    @property
+    def search_matches(self) -> Optional[Set[uuid.UUID]]:
+        """Ids of the sections matching the search text, None without one"""
+        return self._search_matches
+
     def set_search_text(self, text: str = None):
         text = text.strip()
         self._text_search = text or None
+        # Matching sections are looked up once per search rather than once per row
+        self._search_matches = self._search_index.search(text) if self._text_search else None
+
+    @contextmanager
+    def filter_change(self):
+        """
+        Refilters the rows once the allowed modes or the search text were changed within, through begin and
+        endFilterChange where Qt has them (6.10) as invalidateRowsFilter is deprecated there.
+        """
+        if not hasattr(self, "endFilterChange"):
+            yield self
+            self.invalidateRowsFilter()
+            return
+        self.beginFilterChange()
+        try:
+            yield self
+        finally:
+            self.endFilterChange(QSortFilterProxyModel.Direction.Rows)
 
     def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
         if not source_parent.isValid():
@@ -237,17 +448,23 @@ class NavigationTreeFilter(QSortFilterProxyModel):
         if not isinstance(parent_node, GroupNode):
             return True
         child: SectionNode = parent_node.child_nodes[source_row]
-        text_matches = True
-        if self._text_search is not None:
-            text_matches = self._text_search in child.tree_label
+        text_matches = self._search_matches is None or child.section_uuid in self._search_matches
         return text_matches and child.mode in self._allowed_modes
 
 
 class NavigationTree(QAbstractItemModel):
 
-    def __init__(self, controller: Optional[ControllerInterface] = None):
+    def __init__(self, controller: Optional[ControllerInterface] = None, thumbnails: Optional[ThumbnailCache] = None):
         super().__init__()
         self._root = RootNode() if not controller else RootNode(controller)
+        self._thumbnails = thumbnails
+        # Layer nodes waiting on a thumbnail, by thumbnail key
+        self._thumbnail_nodes: Dict[str, List[LayerNode]] = {}
+        self._updating = False
+        # Parents the view asked to fetch while fetching was deferred
+        self._deferred_fetches: Optional[List[QPersistentModelIndex]] = None
+        if self._thumbnails:
+            self._thumbnails.thumbnail_ready.connect(self._thumbnail_ready)
 
     def headerData(self, section: int, orientation: Qt.Orientation, role: int):
         if orientation != Qt.Horizontal or role != Qt.DisplayRole:
@@ -258,11 +475,13 @@ class NavigationTree(QAbstractItemModel):
         return 2
 
     def data(self, index: QModelIndex, role: int) -> Qt.QVariant:
-        if not index.isValid() or role not in [Qt.DisplayRole, Qt.UserRole]:
+        if not index.isValid() or role not in [Qt.DisplayRole, Qt.UserRole, Qt.DecorationRole]:
             return None
         item: SimpleNode = index.internalPointer()
         if role == Qt.UserRole:
             return item
+        if role == Qt.DecorationRole:
+            return self._thumbnail(item) if index.column() == 0 and isinstance(item, LayerNode) else None
         data = [item.tree_label, ""]
         if isinstance(item, PropertyNode):
             data[1] = item.value
@@ -294,14 +513,163 @@ class NavigationTree(QAbstractItemModel):
         parent: SimpleNode = self._root if not parent.isValid() else parent.internalPointer()
         return len(parent.child_nodes)
 
+    def hasChildren(self, parent: QModelIndex) -> bool:
+        if not parent.isValid():
+            return True
+        if parent.column() > 0:
+            return False
+        return parent.internalPointer().has_children
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        # Views may look at the model while rows are being inserted or removed, fetching has to wait until that is done
+        return not self._updating and parent.isValid() and parent.internalPointer().can_fetch_more
+
+    def fetchMore(self, parent: QModelIndex):
+        if not self.canFetchMore(parent):
+            return
+        if self._deferred_fetches is not None:
+            self._deferred_fetches.append(QPersistentModelIndex(parent))
+            return
+        node: SimpleNode = parent.internalPointer()
+        children = node.fetch_children()
+        if not children:
+            return
+        first = len(node.child_nodes)
+        self._updating = True
+        self.beginInsertRows(parent, first, first + len(children) - 1)
+        node.append_children(children)
+        self._root.register_layer_nodes([child for child in children if isinstance(child, LayerNode)])
+        self.endInsertRows()
+        self._updating = False
+
+    def fetch_sections(self, suuids: Set[uuid.UUID]):
+        """
+        Fetches the batches of section rows holding the given sections, the rows after the last of them are left to
+        the view.
+        """
+        rows = [sidx for suuid in suuids if (sidx := self._root.section_index(suuid)) is not None]
+        index = self._node_index(self._root.sections_node)
+        while rows and len(self._root.sections_node.child_nodes) <= max(rows) and self.canFetchMore(index):
+            self.fetchMore(index)
+
+    @contextmanager
+    def deferred_fetching(self):
+        """
+        Holds back the fetches views ask for until the outermost deferral ends, e.g. while a proxy filters the rows.
+        Proxies ask views to fetch while they invalidate their filter, the rows would be inserted in the middle of it.
+        """
+        outermost = self._deferred_fetches is None
+        if outermost:
+            self._deferred_fetches = []
+        try:
+            yield self
+        finally:
+            if outermost:
+                deferred, self._deferred_fetches = self._deferred_fetches, None
+                for parent in deferred:
+                    if parent.isValid():
+                        self.fetchMore(QModelIndex(parent))
+
     def reinitialize(self, controller: ControllerInterface):
         self._root = RootNode(controller)
+        self._thumbnail_nodes.clear()
+
+    def _node_index(self, node: SimpleNode, column: int = 0) -> QModelIndex:
+        return self.createIndex(node.index_in_parent, column, node)
+
+    def _forget_layer_nodes(self, nodes: List[LayerNode]):
+        self._root.unregister_layer_nodes(nodes)
+        for waiting in self._thumbnail_nodes.values():
+            waiting[:] = [node for node in waiting if node not in nodes]
+
+    def _add_active_layer(self, controller: ControllerInterface, idx: SectionLayerIndex):
+        if (sidx := self._root.section_index(idx.suuid)) is None or not (layer := controller.grid_layer(idx)):
+            return
+        # Only the layers the tree shows (those of DIG sections) are listed as active
+        if (section := controller.sections[sidx]).mode != SectionModes.DIG:
+            return
+        group = self._root.active_node
+        if not (active_section := self._root.active_section(idx.suuid)):
+            # Active sections are kept in section order
+            row = sum(1 for node in group.child_nodes if node.section_idx < sidx)
+            self.beginInsertRows(self._node_index(group), row, row)
+            self._root.insert_active_section(row, SectionNode(group, sidx, section, True))
+            self.endInsertRows()
+            return
+        # Layers of a section that was never expanded are picked up once it is
+        if not active_section.fetched or any(n.section_layer_index == idx for n in active_section.layer_nodes):
+            return
+        layer_position = section.layers.index(layer)
+        row = active_section.layer_insert_row(layer_position)
+        self.beginInsertRows(self._node_index(active_section), row, row)
+        layer_node = active_section.create_layer_node(layer_position, layer)
+        active_section.insert_child(row, layer_node)
+        self._root.register_layer_nodes([layer_node])
+        self.endInsertRows()
+
+    def _remove_active_layer(self, controller: ControllerInterface, idx: SectionLayerIndex):
+        if not (active_section := self._root.active_section(idx.suuid)):
+            return
+        if (layer := controller.grid_layer(idx)) and (layer.active or layer.visible):
+            return
+        if not active_section.has_active_layer:
+            row = active_section.index_in_parent
+            self.beginRemoveRows(self._node_index(self._root.active_node), row, row)
+            self._forget_layer_nodes(active_section.layer_nodes)
+            self._root.remove_active_section(active_section)
+            self.endRemoveRows()
+            return
+        if not (layer_node := next((n for n in active_section.layer_nodes if n.section_layer_index == idx), None)):
+            return
+        row = layer_node.index_in_parent
+        self.beginRemoveRows(self._node_index(active_section), row, row)
+        self._forget_layer_nodes([layer_node])
+        active_section.remove_child(row)
+        self.endRemoveRows()
+
+    def update_layer_visibility(self, controller: ControllerInterface, removed: list, added: list):
+        """
+        Updates the tree in place for layers that were shown or hidden: their Visible rows change and they are removed
+        from or added to the Active Layers group.
+        """
+        for idx in removed + added:
+            for layer_node in self._root.layer_nodes(idx):
+                if visible_node := layer_node.update_visibility():
+                    index = self._node_index(visible_node, 1)
+                    self.dataChanged.emit(index, index, [Qt.DisplayRole])
+        self._updating = True
+        for idx in removed:
+            self._remove_active_layer(controller, idx)
+        for idx in added:
+            self._add_active_layer(controller, idx)
+        self._updating = False
+
+    def thumbnail_key(self, node: LayerNode) -> Optional[str]:
+        return self._thumbnails.key(node.layer) if self._thumbnails else None
+
+    def _thumbnail(self, node: LayerNode):
+        # Views only ask for the decoration of rows they show, so thumbnails are requested as rows come into view
+        if not self._thumbnails:
+            return None
+        if (pixmap := self._thumbnails.thumbnail(node.layer)) is None and (key := self._thumbnails.key(node.layer)):
+            nodes = self._thumbnail_nodes.setdefault(key, [])
+            if node not in nodes:
+                nodes.append(node)
+        return pixmap
+
+    @Slot(str)
+    def _thumbnail_ready(self, key: str):
+        for node in self._thumbnail_nodes.pop(key, []):
+            index = self.createIndex(node.index_in_parent, 0, node)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
 
 
 class NavigationWidget(QWidget):
 
     layers_set_as_visible = Signal(list)
     remove_layers_as_visible = Signal(list)
+    add_z_sections = Signal(list)
+    remove_z_sections = Signal(list)
 
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__(parent)
@@ -341,7 +709,9 @@ class NavigationWidget(QWidget):
 
     def _init_tree(self):
         self._tree_view = QTreeView(parent=self)
-        self._tree_model = NavigationTree()
+        self._thumbnails = ThumbnailCache(cache_dir=default_cache_dir(), parent=self)
+        self._tree_view.setIconSize(QSize(self._thumbnails.size, self._thumbnails.size))
+        self._tree_model = NavigationTree(thumbnails=self._thumbnails)
         self._tree_model_filter = NavigationTreeFilter()
         self._tree_model_filter.allowed_modes = self._default_mode_filters
         self._tree_model_filter.setSourceModel(self._tree_model)
@@ -351,33 +721,74 @@ class NavigationWidget(QWidget):
         self._filter_dialog.selected = self._tree_model_filter.allowed_modes
         self._tree_view.setContextMenuPolicy(Qt.CustomContextMenu)
         self._tree_view.customContextMenuRequested.connect(self._show_tree_context_menu)
+        self._tree_view.verticalScrollBar().valueChanged.connect(self._retain_visible_thumbnails)
+        self._tree_view.expanded.connect(self._rows_shown_changed)
+        self._tree_view.collapsed.connect(self._rows_shown_changed)
+
+    def _visible_layer_nodes(self) -> List[LayerNode]:
+        nodes = []
+        index = self._tree_view.indexAt(QPoint(0, 0))
+        while index.isValid() and self._tree_view.visualRect(index).top() < self._tree_view.viewport().height():
+            if isinstance(node := index.data(Qt.UserRole), LayerNode):
+                nodes.append(node)
+            index = self._tree_view.indexBelow(index)
+        return nodes
+
+    def _retain_visible_thumbnails(self):
+        keys = {self._tree_model.thumbnail_key(node) for node in self._visible_layer_nodes()}
+        self._thumbnails.retain(keys)
+
+    def _rows_shown_changed(self):
+        # The view lays out expanded, collapsed and filtered rows on the next event loop turn
+        QTimer.singleShot(0, self._retain_visible_thumbnails)
 
     def _clear_filters(self):
-        self._tree_model_filter.beginResetModel()
-        self._tree_model_filter.set_search_text("")
-        self._toolbar_search.setText("")
-        self._tree_model_filter.allowed_modes = self._default_mode_filters
         self._filter_dialog.selected = self._default_mode_filters
-        self._tree_model_filter.endResetModel()
-        self._tree_view.expandToDepth(0)
+        if self._toolbar_search.text():
+            # Refilters through textChanged
+            self._toolbar_search.setText("")
+        else:
+            self._update_filters()
 
     def _update_filters(self):
-        self._tree_model_filter.beginResetModel()
-        self._tree_model_filter.set_search_text(self._toolbar_search.text())
-        self._tree_model_filter.allowed_modes = self._filter_dialog.selected
-        self._tree_model_filter.endResetModel()
-        self._tree_view.expandToDepth(0)
+        with self._tree_model.deferred_fetching(), self._tree_model_filter.filter_change() as tree_filter:
+            tree_filter.set_search_text(self._toolbar_search.text())
+            tree_filter.allowed_modes = self._filter_dialog.selected
+        # Matching sections that were not fetched yet have to be, the rest are fetched as the view scrolls to them
+        if matches := self._tree_model_filter.search_matches:
+            self._tree_model.fetch_sections(matches)
+        self._rows_shown_changed()
+
+    @Slot(str)
+    def set_search_text(self, text: str):
+        self._toolbar_search.setText(text)
 
     def _show_filter_dialog(self):
         self._filter_dialog.show()
         self._filter_dialog.setFixedSize(self._filter_dialog.width(), self._filter_dialog.height())
 
+    def _show_section_context_menu(self, node: SectionNode, position):
+        # Meta sections are navigated through the layers of the sections they reference
+        if node.mode not in (SectionModes.DIG, SectionModes.META):
+            return
+        menu = QMenu()
+        action = QAction(self.tr("Add to z navigation"))
+        action.triggered.connect(lambda: self.add_z_sections.emit([node.section_uuid]))
+        menu.addAction(action)
+        action2 = QAction(self.tr("Remove from z navigation"))
+        action2.triggered.connect(lambda: self.remove_z_sections.emit([node.section_uuid]))
+        menu.addAction(action2)
+        menu.exec(self._tree_view.viewport().mapToGlobal(position))
+
     def _show_tree_context_menu(self, position):
         selected = self._tree_view.selectedIndexes() or None
         if not selected:
             return
         index: QModelIndex = selected[0]
         node = index.data(Qt.UserRole)
+        if isinstance(node, SectionNode):
+            self._show_section_context_menu(node, position)
+            return
         if not isinstance(node, LayerNode):
             return
         menu = QMenu()
@@ -393,12 +804,10 @@ class NavigationWidget(QWidget):
     def project_changed(self, controller: ControllerInterface):
         self._tree_model_filter.beginResetModel()
         self._tree_model.reinitialize(controller)
+        self._tree_model_filter.search_index = SectionSearchIndex(controller.sections)
         self._tree_model_filter.endResetModel()
         self._tree_view.expandToDepth(0)
 
     @Slot(ControllerInterface, list, list)
-    def layer_visibility_changed(self, controller: ControllerInterface, **kwargs):
-        self._tree_model_filter.beginResetModel()
-        self._tree_model.reinitialize(controller)
-        self._tree_model_filter.endResetModel()
-        self._tree_view.expandToDepth(0)
+    def layer_visibility_changed(self, controller: ControllerInterface, removed: list, added: list):
+        self._tree_model.update_layer_visibility(controller, removed, added)
@@ -0,0 +1,29 @@
+from pathlib import Path
+from typing import Tuple
+
+# Repeating pattern of the synthetic dig layers, mostly mined out with a few channels, ramps and stairs
+__SYNTHETIC_CELLS__ = ["d", "d", "d", "h", "d", "r", "d", "i", "", "d", "d2", ""]
+
+
+def synthetic_blueprint(path: Path, width: int, height: int, levels: int, sections: int = 1) -> Path:
+    global __SYNTHETIC_CELLS__
+    rows = []
+    for section in range(sections):
+        suffix = f"-{section}" if sections > 1 else ""
+        rows.append(f"#dig label(synthetic-{width}x{height}x{levels}{suffix}) start(1;1)")
+        for level in range(levels):
+            if level:
+                rows.append("#>")
+            for y in range(height):
+                cells = __SYNTHETIC_CELLS__
+                rows.append(",".join(cells[(x + y + level + section) % len(cells)] for x in range(width)))
+    path.write_text("\n".join(rows) + "\n")
+    return path
+
+
+def synthetic_size(size: str) -> Tuple[int, ...]:
+    """Width, height, levels and optionally the number of sections of a WxHxL[xS] size"""
+    values = tuple(int(v) for v in size.split("x"))
+    if len(values) not in (3, 4):
+        raise ValueError(f"Not a WxHxL[xS] size: {size}")
+    return values
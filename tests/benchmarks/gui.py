@@ -0,0 +1,167 @@
+"""
+Timings of the viewer and the navigation tree on the offscreen platform, e.g.
+
+    python -m tests.benchmarks.gui tests/data/dreamfort.csv --synthetic 100x100x5x20 -o gui.json
+
+loads every blueprint into the main window and reports in JSON the milliseconds taken by every run of:
+
+- LayerViewer.layer_visibility_changed showing and hiding N layers (the viewer alone, rasterization runs afterwards
+  in the background and is not part of it),
+- a paint of the whole viewport at several zoom levels, given in device pixels per cell, once the shown layers are
+  rasterized,
+- NavigationWidget.project_changed,
+- changes of the navigation's search text.
+
+Runs after the first one find the rasters of the layers cached, as they are after stepping through a project.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from tests.benchmarks import synthetic_blueprint, synthetic_size
+
+
+def _timed(func: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> Dict[str, object]:
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        runs.append((time.perf_counter() - started) * 1000)
+    return {"runs_ms": runs, "min_ms": min(runs), "median_ms": statistics.median(runs)}
+
+
+def benchmark(window, path: Path, args: argparse.Namespace) -> Dict[str, object]:
+    from PySide6.QtGui import QTransform
+
+    from qfui.models.project import Project
+    from qfui.qfparser.importers import CSVImporter
+    from qfui.widgets.gridview import CELL_PX_SIZE
+
+    controller = window.controller
+    controller.project = Project(CSVImporter().load(path))
+    viewer, navigation = window.layer_viewer, window.navigation
+    layers = [idx for idx, _ in controller.project.find_layers(lambda idx, layer: True)]
+    results = []
+
+    def record(operation: str, parameters: Dict[str, object], timings: Dict[str, object]):
+        results.append({"operation": operation, **parameters, **timings})
+
+    def show(shown: list):
+        return lambda: viewer.layer_visibility_changed(controller, [], shown)
+
+    def hide(shown: list):
+        return lambda: viewer.layer_visibility_changed(controller, shown, [])
+
+    shown = []
+    for count in sorted({min(count, len(layers)) for count in args.layers}):
+        shown = layers[:count]
+        record("layer_visibility_changed", {"change": "show", "layers": count}, _timed(
+            show(shown), args.repeat, setup=hide(shown)
+        ))
+        record("layer_visibility_changed", {"change": "hide", "layers": count}, _timed(
+            hide(shown), args.repeat, setup=show(shown)
+        ))
+    # The viewport is painted with the most layers shown
+    show(shown)()
+    viewer.wait_for_rasters()
+    center = viewer.scene().itemsBoundingRect().center()
+    for cell_px in args.cell_px:
+        viewer.setTransform(QTransform.fromScale(cell_px / CELL_PX_SIZE, cell_px / CELL_PX_SIZE))
+        viewer.centerOn(center)
+        record("paint", {"cell_px": cell_px, "layers": len(shown)}, _timed(viewer.viewport().grab, args.repeat))
+    record("project_changed", {"sections": len(controller.sections)}, _timed(
+        lambda: navigation.project_changed(controller), args.repeat
+    ))
+    for text in args.search:
+        record("search", {"text": text}, _timed(
+            lambda: navigation.set_search_text(text), args.repeat, setup=lambda: navigation.set_search_text("")
+        ))
+    navigation.set_search_text("")
+    return {"blueprint": path.stem, "sections": len(controller.sections), "layers": len(layers), "results": results}
+
+
+def run(paths: List[Path], args: argparse.Namespace) -> Dict[str, object]:
+    # The platform is picked when the application is created
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import PySide6
+    from PySide6.QtCore import QTimer, qVersion
+    from PySide6.QtGui import QImage
+    from PySide6.QtWidgets import QApplication
+
+    import qfui.resources
+    from qfui import sprites
+    from qfui.widgets.main import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    qfui.resources.initialize()
+    sprites.initialize(QImage("sprites:defaults.png"))
+    window = MainWindow()
+    window.resize(*args.size)
+    window.show()
+    report = {"platform": app.platformName(), "qt": qVersion(), "pyside": PySide6.__version__, "blueprints": []}
+    failure = []
+
+    def benchmarks():
+        # Runs on the first event loop turn, once the window was shown
+        try:
+            for path in paths:
+                report["blueprints"].append(benchmark(window, path, args))
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            window.close()
+            app.quit()
+
+    QTimer.singleShot(0, benchmarks)
+    app.exec()
+    if failure:
+        raise failure[0]
+    return report
+
+
+def _ints(text: str) -> List[int]:
+    return [int(value) for value in text.split(",")]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="tests.benchmarks.gui")
+    parser.add_argument("paths", nargs="*", help="Blueprint CSV files to load")
+    parser.add_argument(
+        "--synthetic", action="append", default=[], metavar="WxHxL[xS]",
+        help="Also load a generated dig blueprint of S sections of W x H cells and L levels, may be repeated",
+    )
+    parser.add_argument("--layers", type=_ints, default=[1, 10, 100], help="Numbers of layers shown and hidden")
+    parser.add_argument(
+        "--cell-px", type=_ints, default=[1, 4, 16, 32], help="Zoom levels painted, in device pixels per cell",
+    )
+    parser.add_argument("--search", action="append", default=None, help="Search texts set, may be repeated")
+    parser.add_argument("--size", type=_ints, default=[1600, 900], help="Window width and height")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs of every operation")
+    parser.add_argument("-o", "--output", default=None, help="File the JSON report is written to instead of stdout")
+    args = parser.parse_args(argv)
+    # Matches some of the labels of dreamfort and the synthetic blueprints, and none at all
+    args.search = args.search or ["syn", "central", "no such label"]
+    paths = [Path(path) for path in args.paths]
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.synthetic:
+            paths.append(synthetic_blueprint(Path(directory) / f"synthetic-{size}.csv", *synthetic_size(size)))
+        report = run(paths, args)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Memory retained by imported blueprints as measured by tracemalloc, e.g.
+
+    python -m tests.benchmarks.memory tests/data/dreamfort.csv --synthetic 200x200x10
+
+prints a JSON report with the retained bytes in total, per section, per grid layer and per occupied cell of every
+blueprint.
+"""
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from qfui.models.project import Project
+from qfui.qfparser.importers import CSVImporter
+from tests.benchmarks import synthetic_blueprint, synthetic_size
+
+
+def measure(path: Path) -> Dict[str, float]:
+    """
+    Imports the blueprint with tracemalloc running, the retained bytes are the traced memory still allocated after the
+    import while the project is kept alive.
+    """
+    # The parser builds its grammars on first use, which is not part of any blueprint
+    with tempfile.TemporaryDirectory() as directory:
+        CSVImporter().load(synthetic_blueprint(Path(directory) / "warmup.csv", 1, 1, 1))
+    gc.collect()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        project = Project(CSVImporter().load(path))
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    report = project.memory_report()
+    return {
+        "file": str(path),
+        "sections": len(report.sections),
+        "layers": report.layers,
+        "cells": report.cells,
+        "bytes": retained,
+        "per_section": retained / len(report.sections) if report.sections else 0.0,
+        "per_layer": retained / report.layers if report.layers else 0.0,
+        "per_cell": retained / report.cells if report.cells else 0.0,
+        "estimated_bytes": report.bytes,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="tests.benchmarks.memory")
+    parser.add_argument("paths", nargs="*", help="Blueprint CSV files to measure")
+    parser.add_argument(
+        "--synthetic", action="append", default=[], metavar="WxHxL[xS]",
+        help="Also measure a generated dig blueprint of S sections of W x H cells and L levels, may be repeated",
+    )
+    args = parser.parse_args(argv)
+    paths = [Path(path) for path in args.paths]
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.synthetic:
+            paths.append(synthetic_blueprint(Path(directory) / f"synthetic-{size}.csv", *synthetic_size(size)))
+        json.dump([measure(path) for path in paths], sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
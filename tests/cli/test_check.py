@@ -0,0 +1,41 @@
+import json
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
+from qfui.cli.check import CheckJob, check_file
+
+__ROOT__ = Path(__file__).resolve().parents[2]
+__DATA__ = __ROOT__ / "tests" / "data"
+
+
+def test_check_does_not_import_qt():
+    path = str(__DATA__ / "cloverdorms.csv")
+    code = (
+        "import sys; from pathlib import Path; from qfui.cli import check; "
+        f"check.check_file(check.CheckJob(Path({path!r}))); print('PySide6' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=__ROOT__)
+    assert result.stdout.strip() == "False"
+
+
+def test_check_file_reports_sections_and_diagnostics(tmp_path: Path):
+    result = check_file(CheckJob(__DATA__ / "dreamfort.csv", tmp_path, "pickle"))
+    assert result.error is None
+    assert result.sections["dig"] == 11 and result.sections["build"] == 24
+    assert result.diagnostic_count >= len(result.diagnostics) > 0
+    assert set(result.timings) == {"import", "lint", "convert"}
+    with open(result.converted, "rb") as fh:
+        assert sum(1 for section in pickle.load(fh) if section.mode.value == "dig") == 11
+
+
+def test_check_command_writes_report(tmp_path: Path):
+    report = tmp_path / "report.json"
+    args = ["-m", "qfui", "check", "-j", "1", "-r", str(report)]
+    args += [str(__DATA__ / "cloverdorms.csv"), str(__DATA__ / "missing.csv")]
+    result = subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=__ROOT__)
+    assert result.returncode == 1
+    with open(report) as fh:
+        files = json.load(fh)["files"]
+    assert [f["error"] is None for f in files] == [True, False]
@@ -0,0 +1,62 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from PySide6.QtGui import QImage
+
+import qfui.resources
+from qfui import sprites
+from qfui.cli import render
+from qfui.cli.render import RenderJob, render_file
+from tests.benchmarks import synthetic_blueprint
+
+__ROOT__ = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def sheet():
+    qfui.resources.initialize()
+    sprites.initialize(QImage("sprites:defaults.png"))
+
+
+@pytest.fixture
+def blueprint(tmp_path: Path) -> Path:
+    # Two 5x3 dig sections of two levels each
+    return synthetic_blueprint(tmp_path / "small.csv", 5, 3, 2, 2)
+
+
+def _sizes(paths):
+    return [(path.name, QImage(str(path)).width(), QImage(str(path)).height()) for path in paths]
+
+
+def test_render_file_writes_the_selected_layers(blueprint: Path, tmp_path: Path):
+    result = render_file(RenderJob(blueprint, tmp_path, ["synthetic-5x3x2-1"], [1], cell_px=4))
+    assert result.error is None
+    assert _sizes(result.written) == [("small-001-synthetic-5x3x2-1-z1-000.png", 20, 12)]
+    result = render_file(RenderJob(blueprint, tmp_path, ["0"], cell_px=2))
+    assert _sizes(result.written) == [
+        ("small-000-synthetic-5x3x2-0-z0-000.png", 10, 6), ("small-000-synthetic-5x3x2-0-z1-001.png", 10, 6)
+    ]
+
+
+def test_render_file_writes_a_sheet_per_section(blueprint: Path, tmp_path: Path):
+    result = render_file(RenderJob(blueprint, tmp_path, cell_px=1, sheet=True))
+    assert _sizes(result.written) == [
+        ("small-000-synthetic-5x3x2-0.png", 10 + render.__SHEET_GAP_PX__, 3),
+        ("small-001-synthetic-5x3x2-1.png", 10 + render.__SHEET_GAP_PX__, 3),
+    ]
+
+
+def test_render_file_reports_unreadable_files(tmp_path: Path):
+    result = render_file(RenderJob(tmp_path / "missing.csv", tmp_path))
+    assert result.error and not result.written
+
+
+def test_render_command_renders_in_offscreen_workers(blueprint: Path, tmp_path: Path):
+    output = tmp_path / "out"
+    args = ["-m", "qfui", "render", "-j", "1", "-o", str(output), "-s", "synthetic-5x3x2-1", "-z", "1"]
+    args += ["--cell-px", "4"]
+    result = subprocess.run([sys.executable, *args, str(blueprint)], capture_output=True, text=True, cwd=__ROOT__)
+    assert result.returncode == 0, result.stderr
+    assert _sizes(output.iterdir()) == [("small-001-synthetic-5x3x2-1-z1-000.png", 20, 12)]
@@ -0,0 +1,92 @@
+import logging
+
+import numpy
+
+from qfui.models import aliases
+from qfui.models.aliases import AliasTable, compile_aliases, parse_aliases
+from qfui.models.cells import DesignationCell, UnprocessedCell
+from qfui.models.enums import SectionModes
+from qfui.models.layers import GridLayer, RawLayer
+from qfui.models.project import Project
+from qfui.models.sections import RawSection
+
+
+def _aliases(*rows: str) -> RawSection:
+    return RawSection(mode=SectionModes.ALIASES, label="aliases", layer=RawLayer(raw_lines=[[row] for row in rows]))
+
+
+def test_definitions_are_parsed():
+    section = _aliases("# comment", "", "stock: {Down}{Right 2}", "  food_prep :  {stock}f  ", "x: too short")
+    assert parse_aliases(section) == {"stock": "{Down}{Right 2}", "food_prep": "{stock}f"}
+
+
+def test_nested_aliases_are_compiled_into_their_expansions():
+    table = AliasTable({"a": "x{b 2}{Enter}", "b": "{c}y", "c": "z"})
+    assert table.expansions == {"a": "xzyzy{Enter}", "b": "zy", "c": "z"}
+    assert table.expand("b") == "zy"
+    assert table.expand("{a}{b}{Up 3}") == "xzyzy{Enter}zy{Up 3}"
+    assert table.expand("plain") == "plain"
+
+
+def test_aliases_referencing_themselves_are_not_expanded(caplog):
+    with caplog.at_level(logging.INFO, logger="qfui.models.aliases"):
+        table = AliasTable({"a": "{b}", "b": "1{a}", "c": "2{a}", "d": "{d}"})
+    assert table.expansions == {"c": "2{a}"}
+    assert table.expand("{b}{c}") == "{b}2{a}"
+    assert len(caplog.records) == 2
+
+
+def test_tables_are_shared_per_alias_set():
+    table = compile_aliases({"a": "1", "b": "2"})
+    assert compile_aliases({"b": "2", "a": "1"}) is table
+    assert compile_aliases({"a": "1", "b": "3"}) is not table
+
+
+def test_project_aliases_expand_layers():
+    project = Project([_aliases("inner: {Right}", "outer: {inner 2}"), _aliases("inner: {Left}")])
+    cells = numpy.full((2, 2), None, dtype=object)
+    cells[0, 0] = UnprocessedCell(code_text="outer")
+    cells[1, 0] = UnprocessedCell(code_text="{outer}x")
+    cells[0, 1] = DesignationCell()
+    assert project.aliases is project.aliases
+    assert project.aliases.expand_layer(GridLayer(cells=cells)).tolist() == [
+        ["{Left}{Left}", None], ["{Left}{Left}x", None]
+    ]
+
+
+def test_project_aliases_follow_section_changes():
+    aliases, query = _aliases("go: {Up}"), RawSection(mode=SectionModes.QUERY, label="query")
+    project = Project([aliases, query])
+    table = project.aliases
+    assert table.expand("{go}") == "{Up}"
+    project.replace_section(RawSection(mode=SectionModes.QUERY, label="renamed", suuid=query.suuid))
+    assert project.aliases is table
+    project.replace_section(RawSection(
+        mode=SectionModes.ALIASES, label="aliases", layer=RawLayer(raw_lines=[["go: {Down}"]]), suuid=aliases.suuid
+    ))
+    assert project.aliases.expand("{go}") == "{Down}"
+    project.remove_section(aliases.suuid)
+    assert project.aliases.expand("{go}") == "{go}"
+
+
+def test_each_distinct_cell_text_is_scanned_once(monkeypatch):
+    table = AliasTable({f"alias{i}": f"{{alias{i - 1} 2}}" if i else "{Enter}" for i in range(12)})
+    cells = numpy.empty((100, 100), dtype=object)
+    for x in range(100):
+        for y in range(100):
+            cells[x, y] = UnprocessedCell(code_text=f"{{alias{(x + y) % 12}}}")
+    expanded = table.expand_layer(GridLayer(cells=cells))
+    assert expanded[3, 4] == "{Enter}" * 2 ** 7
+    assert table.scans == 12
+    table.expand_layer(GridLayer(cells=cells))
+    assert table.scans == 12
+    # Remembered texts are bounded, the least recently used ones are scanned again
+    monkeypatch.setattr(aliases, "__MAX_EXPANDED_TEXTS__", 4)
+    for text in ["{alias0}", "a", "b", "c", "d", "{alias1}"]:
+        table.expand(text)
+    assert table.scans == 17
+    for text in ["c", "d", "{alias1}", "b"]:
+        table.expand(text)
+    assert table.scans == 17
+    table.expand("{alias0}")
+    assert table.scans == 18
@@ -0,0 +1,40 @@
+import numpy
+import pytest
+
+from qfui.models.cells import DesignationCell, UnprocessedCell
+from qfui.models.enums import Designations
+from qfui.models.layers import (
+    EMPTY_CELL_CODE, OTHER_CELL_CODE, GridLayer, code_designation, designation_code
+)
+
+
+@pytest.mark.parametrize("designation", list(Designations))
+def test_designation_code_round_trip(designation: Designations):
+    assert code_designation(designation_code(designation)) == designation
+
+
+def test_grid_layer_designation_codes():
+    cells = numpy.ndarray((3, 2), dtype=object)
+    cells[0, 0] = DesignationCell(designation=Designations.MINE)
+    cells[2, 1] = DesignationCell(designation=Designations.CHANNEL)
+    cells[1, 1] = UnprocessedCell(code_text="a")
+    codes = GridLayer(cells=cells).designation_codes
+    assert codes.shape == (3, 2)
+    assert codes.dtype == numpy.uint8
+    assert codes[0, 0] == designation_code(Designations.MINE)
+    assert codes[2, 1] == designation_code(Designations.CHANNEL)
+    assert codes[1, 1] == OTHER_CELL_CODE
+    assert codes[1, 0] == EMPTY_CELL_CODE
+
+
+def test_grid_layer_content_hash():
+    cells = numpy.ndarray((3, 2), dtype=object)
+    cells[0, 0] = DesignationCell(designation=Designations.MINE)
+    same = cells.copy()
+    transposed = numpy.ndarray((2, 3), dtype=object)
+    transposed[0, 0] = DesignationCell(designation=Designations.MINE)
+    other = cells.copy()
+    other[1, 1] = DesignationCell(designation=Designations.CHANNEL)
+    assert GridLayer(cells=cells).content_hash == GridLayer(cells=same).content_hash
+    assert GridLayer(cells=cells).content_hash != GridLayer(cells=transposed).content_hash
+    assert GridLayer(cells=cells).content_hash != GridLayer(cells=other).content_hash
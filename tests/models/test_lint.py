@@ -0,0 +1,50 @@
+from typing import List
+
+from qfui.models.enums import SectionModes
+from qfui.models.lint import lint_section
+from qfui.models.sections import GridSection, SectionStart
+from qfui.qfparser.cells import DesignationCellParser
+from qfui.qfparser.layers import GridLayerParser
+
+
+def _dig_section(levels: List[List[str]], start: SectionStart = None) -> GridSection:
+    parser = GridLayerParser(DesignationCellParser())
+    layers = [parser.parse(z, [row.split(",") for row in rows]) for z, rows in enumerate(levels)]
+    return GridSection(mode=SectionModes.DIG, start=start, layers=layers)
+
+
+def _found(section: GridSection):
+    return sorted((issue.rule, issue.relative_z, issue.x, issue.y) for issue in lint_section(section))
+
+
+def test_connected_stairs_and_dug_channels_pass():
+    section = _dig_section([["j,h,d"], ["i,d,d"], ["u,d,d"]])
+    assert _found(section) == []
+
+
+def test_channel_over_undug():
+    section = _dig_section([["h,h,d"], ["d,,d"]])
+    assert _found(section) == [("channel-over-undug", 0, 1, 0)]
+
+
+def test_unconnected_stairs():
+    section = _dig_section([["j,d,d"], ["d,u,i"]])
+    assert _found(section) == [
+        ("stairs-down-unconnected", 0, 0, 0),
+        ("stairs-up-unconnected", 1, 1, 0),
+        ("stairs-up-unconnected", 1, 2, 0),
+    ]
+
+
+def test_bottom_and_top_layers_are_not_checked_against_missing_levels():
+    assert _found(_dig_section([["u,h,j"]])) == []
+
+
+def test_start_outside_footprint():
+    section = _dig_section([["d,d", "d,d"]], SectionStart(5, 1))
+    assert _found(section) == [("start-outside-footprint", 0, 1, 1)]
+
+
+def test_cells_outside_footprint():
+    section = _dig_section([["d,d", "d,d"], ["d,d,,d", "d,d", ",,h,"]], SectionStart(0, 0))
+    assert _found(section) == [("cell-outside-footprint", 1, 2, 2), ("cell-outside-footprint", 1, 3, 0)]
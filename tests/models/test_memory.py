@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+import numpy
+import pytest
+
+from tests.benchmarks import synthetic_blueprint, synthetic_size
+from tests.benchmarks.memory import measure
+from qfui.models.project import Project
+from qfui.qfparser.importers import CSVImporter
+
+__DATA__ = Path(__file__).parent.parent / "data"
+# Retained bytes allowed per section, grid layer and occupied cell of every blueprint
+with open(__DATA__ / "memory_budgets.json") as fh:
+    __BUDGETS__ = json.load(fh)
+
+
+def _blueprint(name: str, directory: Path) -> Path:
+    global __DATA__
+    if not name.startswith("synthetic-"):
+        return __DATA__ / f"{name}.csv"
+    return synthetic_blueprint(directory / f"{name}.csv", *synthetic_size(name[len("synthetic-"):]))
+
+
+@pytest.mark.parametrize("name", sorted(__BUDGETS__))
+def test_memory_within_budget(name: str, tmp_path: Path, record_property):
+    measured = measure(_blueprint(name, tmp_path))
+    for metric, budget in __BUDGETS__[name].items():
+        record_property(metric, measured[metric])
+        assert measured[metric] <= budget, f"{name} retains {measured[metric]:.0f} bytes {metric}, over {budget}"
+
+
+def test_project_memory_report():
+    global __DATA__
+    project = Project(CSVImporter().load(__DATA__ / "dreamfort.csv"))
+    report = project.memory_report()
+    assert [section.suuid for section in report.sections] == [section.suuid for section in project.sections]
+    layers = [layer for _, layer in project.find_layers(lambda idx, layer: True)]
+    assert report.layers == len(layers)
+    assert report.cells == sum(int(numpy.count_nonzero(layer.cells != None)) for layer in layers)  # noqa: E711
+    assert report.bytes == sum(section.bytes for section in report.sections) > 0
+    assert report.per_cell() > 0
@@ -0,0 +1,101 @@
+import uuid
+from typing import List
+
+import pytest
+
+from qfui.models.enums import SectionModes
+from qfui.models.layers import RawLayer
+from qfui.models.meta import MetaCycleError, MetaResolver, parse_references
+from qfui.models.project import Project, SectionLayerIndex
+from qfui.models.sections import GridSection, RawSection
+from qfui.qfparser.cells import DesignationCellParser
+from qfui.qfparser.importers import CSVImporter
+from qfui.qfparser.layers import GridLayerParser
+
+
+@pytest.fixture(scope="module")
+def dreamfort() -> Project:
+    return Project(CSVImporter().load("data/dreamfort.csv"))
+
+
+def _meta(label: str, *rows: str) -> RawSection:
+    return RawSection(mode=SectionModes.META, label=label, layer=RawLayer(raw_lines=[[row] for row in rows]))
+
+
+def _dig(label: str, levels: int = 1, suuid: uuid.UUID = None) -> GridSection:
+    parser = GridLayerParser(DesignationCellParser())
+    layers = [parser.parse(z, [["d"]]) for z in range(levels)]
+    return GridSection(suuid=suuid, mode=SectionModes.DIG, label=label, layers=layers)
+
+
+def _levels(resolver: MetaResolver, label: str, grid_labels: List[str]) -> List[tuple]:
+    sections = {resolver.section(grid_label).suuid: grid_label for grid_label in grid_labels}
+    return [(sections[layer.suuid], layer.relative_z) for layer in resolver.resolve(label).layers]
+
+
+def test_references_follow_level_changes(dreamfort: Project):
+    surface7 = next(section for section in dreamfort.sections if section.label == "surface7")
+    references = [(reference.label, reference.relative_z) for reference in parse_references(surface7)]
+    assert references == [("surface_roof", -1), ("surface_roof2", -1)]
+
+
+def test_nested_meta_sections_are_composed(dreamfort: Project):
+    composed = dreamfort.resolve_meta("dig_all_underground")
+    assert composed.levels == list(range(13)) and not composed.missing
+    apartments = dreamfort.resolve_meta("apartments1")
+    assert [layer.relative_z for layer in composed.layers if layer.suuid == apartments.layers[0].suuid] == [
+        7, 8, 9, 10, 11, 12
+    ]
+    # The stack of apartments was resolved along the way and is reused
+    assert dreamfort.is_meta_resolved("apartments1_stack")
+    assert dreamfort.resolve_meta("dig_all_underground") is composed
+
+
+def test_missing_references_are_reported():
+    resolver = MetaResolver([_meta("top", "/middle", "#>", "/nowhere"), _meta("middle", "/bottom", "/gone")])
+    assert resolver.resolve("top").missing == ("bottom", "gone", "nowhere")
+    resolver.update_section(_dig("bottom"))
+    assert resolver.resolve("top").missing == ("gone", "nowhere")
+    assert _levels(resolver, "top", ["bottom"]) == [("bottom", 0)]
+
+
+def test_cycles_are_detected():
+    resolver = MetaResolver([_meta("a", "/b"), _meta("b", "#>", "/c"), _meta("c", "/a"), _dig("d")])
+    with pytest.raises(MetaCycleError) as e:
+        resolver.resolve("a")
+    assert e.value.cycle == ["a", "b", "c", "a"]
+    resolver.update_section(_meta("c", "/d"))
+    assert _levels(resolver, "a", ["d"]) == [("d", 1)]
+
+
+def test_only_dependents_of_a_changed_section_are_invalidated():
+    resolver = MetaResolver([
+        _meta("top", "/left", "#>", "/right"), _meta("left", "/x"), _meta("right", "/y"), _dig("x"), _dig("y"),
+    ])
+    top, left, right = (resolver.resolve(label) for label in ("top", "left", "right"))
+    resolver.update_section(_dig("y", levels=2))
+    assert resolver.resolve("left") is left
+    assert resolver.resolve("right") is not right
+    assert _levels(resolver, "top", ["x", "y"]) == [("x", 0), ("y", 1), ("y", 2)]
+    # A meta section that no longer references a section does not depend on it anymore
+    resolver.update_section(_meta("top", "/left"))
+    top = resolver.resolve("top")
+    resolver.update_section(_dig("y"))
+    assert resolver.resolve("top") is top
+
+
+def test_project_section_replacements_invalidate_dependents():
+    x, y = _dig("x"), _dig("y")
+    project = Project([_meta("top", "/left", "#>", "/right"), _meta("left", "/x"), _meta("right", "/y"), x, y])
+    top, left = project.resolve_meta("top"), project.resolve_meta("left")
+    project.replace_section(_dig("y", levels=2, suuid=y.suuid))
+    assert project.is_meta_resolved("left") and not project.is_meta_resolved("top")
+    assert project.resolve_meta("left") is left
+    assert [layer.relative_z for layer in project.resolve_meta("top").layers] == [0, 1, 2]
+    assert project.get_grid_layer(SectionLayerIndex(y.suuid, y.layers[0].luuid)) is None
+    # Renaming a section leaves the sections referencing its previous label without it
+    project.replace_section(_dig("renamed", suuid=x.suuid))
+    assert project.resolve_meta("left").missing == ("x",)
+    project.remove_section(x.suuid)
+    assert project.get_section(x.suuid) is None and project.resolve_meta("renamed").missing == ("renamed",)
+    assert project.resolve_meta("top") is not top
@@ -0,0 +1,59 @@
+import pytest
+
+from qfui.models.enums import SectionModes
+from qfui.models.search import SectionSearchIndex, tokenize
+from qfui.models.sections import GridSection, SectionStart
+from qfui.qfparser.importers import CSVImporter
+
+
+def test_tokenize():
+    assert tokenize("Dig the  central_stairs, 3x3!") == ["dig", "the", "central_stairs", "3x3"]
+    assert tokenize(None) == []
+
+
+@pytest.fixture
+def sections():
+    return [
+        GridSection(mode=SectionModes.DIG, label="central_stairs", comment="Stairs down to the industry level"),
+        GridSection(mode=SectionModes.DIG, label="farming", message="Remember to assign farm plots"),
+        GridSection(mode=SectionModes.DIG, label="suites", start=SectionStart(1, 1, "Central stairs on the left")),
+    ]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("stairs", [0, 2]),
+    ("STAIRS", [0, 2]),
+    ("air", [0, 2]),
+    ("ai", [0, 2]),
+    ("farm plots", [1]),
+    ("central stairs", [0, 2]),
+    ("industry left", []),
+    ("missing", []),
+    ("001", [1]),
+])
+def test_search(sections, query, expected):
+    index = SectionSearchIndex(sections)
+    assert index.search(query) == {sections[i].suuid for i in expected}
+
+
+def test_search_without_terms(sections):
+    assert SectionSearchIndex(sections).search("  ,; ") is None
+
+
+def test_remove_section(sections):
+    index = SectionSearchIndex(sections)
+    index.remove(sections[0].suuid)
+    assert index.search("stairs") == {sections[2].suuid}
+    assert len(index) == 2
+
+
+def test_search_matches_substring_search():
+    sections = CSVImporter().load("data/dreamfort.csv")
+    index = SectionSearchIndex(sections)
+    for query in ("stair", "pasture", "surface", "qu", "dig_all", "zones"):
+        expected = {
+            s.suuid for s in sections
+            if query in s.label.lower() or query in (s.comment or "").lower() or
+            query in (s.message or "").lower() or query in ((s.start and s.start.comment) or "").lower()
+        }
+        assert index.search(query) == expected
@@ -1,10 +1,13 @@
 import json
 import uuid
+from pathlib import Path
 
 import pytest
 
 from qfui.models.serialize import SerializingJSONEncoder
-from qfui.qfparser.importers import CSVImporter
+from qfui.qfparser.cells import DesignationCellParser
+from qfui.qfparser.importers import CSVImporter, ImportCancelled
+from tests.benchmarks import synthetic_blueprint
 
 
 class SequentialUUID:
@@ -25,3 +28,34 @@ def test_qf_import(monkeypatch, filename: str):
     actual_sections = json.dumps(sections, indent=2, cls=SerializingJSONEncoder)
     with open(f"data/{filename}.json", "r") as fh:
         assert actual_sections == fh.read()
+
+
+def test_qf_import_progress():
+    progress = []
+    sections = CSVImporter().load("data/dreamfort.csv", progress=lambda *args: progress.append(args))
+    assert progress[-1][0] == progress[-1][1]
+    assert progress[-1][2] == len(sections)
+    assert [p[0] for p in progress] == sorted(p[0] for p in progress)
+
+
+def test_qf_import_cancel():
+    checks = []
+    with pytest.raises(ImportCancelled):
+        CSVImporter().load("data/dreamfort.csv", cancelled=lambda: checks.append(True) or len(checks) > 3)
+    assert len(checks) == 4
+
+
+def test_qf_import_cancel_within_a_section(monkeypatch, tmp_path: Path):
+    path = synthetic_blueprint(tmp_path / "large.csv", 20, 400, 2)
+    parse = DesignationCellParser.parse
+    parsed = []
+
+    def counted(parser, *args):
+        parsed.append(args)
+        return parse(parser, *args)
+
+    monkeypatch.setattr(DesignationCellParser, "parse", counted)
+    # Gives up as soon as the only section is being parsed, all of its rows were read by then
+    with pytest.raises(ImportCancelled):
+        CSVImporter().load(path, cancelled=lambda: bool(parsed))
+    assert len(parsed) == 20
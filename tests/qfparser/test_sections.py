@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from collections import deque
 from qfui.models.enums import SectionModes
 
@@ -70,3 +72,12 @@ def test_section_mode_line_parsing(
     assert sec.comment == ex_cm, f"failed comment for '{raw}'"
     assert sec.hidden == ex_hi, f"failed hidden for '{raw}'"
     assert sec.label == ex_lb, f"failed label for '{raw}'"
+
+
+def test_grammars_are_built_on_first_use():
+    code = (
+        "from qfui.qfparser import cells, importers, sections; "
+        "print(sections.__MODE_PARSER__ is None and cells.__CELL_PARSER__ is None)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd="..")
+    assert result.stdout.strip() == "True"
@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from qfui import instrumentation
+
+
+@pytest.fixture
+def enabled():
+    instrumentation.set_enabled(True)
+    instrumentation.reset()
+    yield
+    instrumentation.set_enabled(False)
+    instrumentation.reset()
+
+
+def test_counters_are_bumped_from_worker_threads(enabled):
+    def bump(_):
+        for _ in range(10000):
+            instrumentation.count("sprites.hit")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(bump, range(8)))
+    assert instrumentation.counters() == {"sprites.hit": 80000}
+
+
+def test_hooks_do_nothing_while_disabled():
+    instrumentation.count("sprites.hit")
+    assert instrumentation.start() == 0 and "sprites.hit" not in instrumentation.counters()
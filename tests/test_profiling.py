@@ -0,0 +1,57 @@
+import json
+import pstats
+import tracemalloc
+from pathlib import Path
+
+from qfui import profiling
+
+
+def _work(n: int) -> int:
+    return sum(range(n))
+
+
+def test_disabled_profiling_leaves_functions_alone(monkeypatch):
+    monkeypatch.delenv("QFUI_PROFILE", raising=False)
+    assert profiling.profiled("work")(_work) is _work
+
+
+def test_enabled_profiling_writes_profiles(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv("QFUI_PROFILE", "cprofile")
+    monkeypatch.setenv("QFUI_PROFILE_DIR", str(tmp_path))
+    monkeypatch.delenv("QFUI_PROFILE_RUN", raising=False)
+    monkeypatch.setattr(profiling, "__PROFILES__", {})
+    monkeypatch.setattr(profiling, "__GROWTH__", {})
+    work = profiling.profiled("test_work")(_work)
+    assert work is not _work
+    assert work(10) == 45 and work(20) == 190
+    profiling.write()
+    profiles = list(tmp_path.glob("test_work-*.prof"))
+    assert len(profiles) == 1
+    stats = pstats.Stats(str(profiles[0])).stats
+    assert sum(calls for (_, _, name), (calls, *_) in stats.items() if name == "_work") == 2
+
+
+def test_memory_is_snapshot_once_profiling_ends(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv("QFUI_PROFILE", "tracemalloc")
+    monkeypatch.setenv("QFUI_PROFILE_DIR", str(tmp_path))
+    monkeypatch.delenv("QFUI_PROFILE_RUN", raising=False)
+    monkeypatch.setattr(profiling, "__PROFILES__", {})
+    monkeypatch.setattr(profiling, "__GROWTH__", {})
+    snapshots = []
+    take_snapshot = tracemalloc.take_snapshot
+    monkeypatch.setattr(tracemalloc, "take_snapshot", lambda: snapshots.append(True) or take_snapshot())
+    tracing = tracemalloc.is_tracing()
+    retained = []
+    work = profiling.profiled("test_memory")(lambda n: retained.append(bytearray(n)))
+    try:
+        for size in (1000, 100_000, 1_000_000):
+            work(size)
+        assert not snapshots
+        profiling.write()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    assert len(snapshots) == 1
+    (growth,) = tmp_path.glob("tracemalloc-*.json")
+    assert 1_000_000 <= json.loads(growth.read_text())["test_memory"] < 1_100_000
+    assert len(list(tmp_path.glob("tracemalloc-*.tracemalloc"))) == 1
@@ -0,0 +1,41 @@
+import pytest
+from PySide6.QtGui import QImage
+
+import qfui.resources
+from qfui import sprites
+from qfui.models.enums import Designations
+
+
+@pytest.fixture(scope="module", autouse=True)
+def sheet():
+    qfui.resources.initialize()
+    sprites.initialize(QImage("sprites:defaults.png"))
+
+
+def test_masks_are_cut_out_on_demand():
+    used = set(sprites.__DESIGNATION_SPRITES__.values()) | {sprites.__FALLBACK_SPRITE__}
+    columns = sprites.__SHEET_WIDTH__ // sprites.__SPRITE_SIZE__
+    rows = sprites.__SHEET_HEIGHT__ // sprites.__SPRITE_SIZE__
+    unused = {(x, y) for x in range(columns) for y in range(rows)} - used
+    assert (3, 7) in unused and not unused & set(sprites.__MASK_LOOKUP__)
+    assert sprites._mask((3, 7)) is sprites._mask((3, 7))
+    assert (3, 7) in sprites.__MASK_LOOKUP__
+    assert sprites._mask((3, 7)).size() == sprites._mask((0, 0)).size()
+
+
+def test_cell_sprite_forms_are_created_lazily(monkeypatch):
+    monkeypatch.setattr(sprites, "__SPRITE_LOOKUP__", {})
+    sprite = sprites.lookup_designation(Designations.MINE)
+    assert sprite._image is None and sprite._pixmap is None and sprite._icon is None
+    assert sprite.image is sprite.image
+    assert sprite._pixmap is None
+
+
+def test_tiles_are_kept_per_zoom(monkeypatch):
+    monkeypatch.setattr(sprites, "__TILE_LOOKUP__", {})
+    for cell_px in (1, 2, 4, 8, 16, 4):
+        assert sprites.designation_tiles(cell_px).shape[1:] == (cell_px, cell_px, 4)
+    assert sorted(sprites.__TILE_LOOKUP__) == [1, 2, 4, 8, 16]
+    assert sprites.designation_tiles(4) is sprites.designation_tiles(4)
+    with pytest.raises(ValueError):
+        sprites.designation_tiles(3)
@@ -0,0 +1,64 @@
+import os
+from pathlib import Path
+
+import numpy
+import pytest
+from PySide6.QtGui import QImage
+
+import qfui.resources
+from qfui import sprites
+from qfui.models.cells import DesignationCell
+from qfui.models.enums import Designations
+from qfui.models.layers import GridLayer
+from qfui.thumbnails import PruneTask, ThumbnailCache, ThumbnailSignals, ThumbnailTask, prune_cache_dir
+
+
+@pytest.fixture(scope="module", autouse=True)
+def sheet():
+    qfui.resources.initialize()
+    sprites.initialize(QImage("sprites:defaults.png"))
+
+
+def _layer() -> GridLayer:
+    cells = numpy.ndarray((4, 3), dtype=object)
+    cells[1, 2] = DesignationCell(designation=Designations.MINE)
+    return GridLayer(cells=cells)
+
+
+def test_keys_change_with_the_sprite_atlas(monkeypatch):
+    cache = ThumbnailCache()
+    key = cache.key(_layer())
+    assert key.startswith(_layer().content_hash) and sprites.atlas_hash() in key
+    monkeypatch.setattr(sprites, "__ATLAS_HASH__", "recolored")
+    assert cache.key(_layer()) != key
+
+
+def test_no_thumbnails_are_requested_before_the_atlas_exists(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(sprites, "__ATLAS_HASH__", None)
+    cache = ThumbnailCache(cache_dir=tmp_path)
+    assert cache.key(_layer()) is None and cache.thumbnail(_layer()) is None
+    assert not cache._tasks and not list(tmp_path.iterdir())
+
+
+def test_least_recently_used_thumbnails_are_pruned(tmp_path: Path):
+    for age, name in enumerate(["newest", "recent", "old", "oldest"]):
+        path = tmp_path / f"{name}.png"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 - age, 1000 - age))
+    prune_cache_dir(tmp_path, 250)
+    assert sorted(path.stem for path in tmp_path.iterdir()) == ["newest", "recent"]
+    PruneTask(tmp_path, 150).run()
+    assert [path.stem for path in tmp_path.iterdir()] == ["newest"]
+
+
+def test_cached_thumbnails_are_touched_when_loaded(tmp_path: Path):
+    cache_file = tmp_path / "layer.png"
+    signals = ThumbnailSignals()
+    rendered = ThumbnailTask("layer", _layer(), 8, cache_file, signals)
+    rendered.run()
+    assert rendered.written == cache_file.stat().st_size > 0
+    os.utime(cache_file, (1000, 1000))
+    loaded = ThumbnailTask("layer", _layer(), 8, cache_file, signals)
+    loaded.run()
+    assert loaded.image.size() == rendered.image.size() and loaded.written == 0
+    assert cache_file.stat().st_mtime > 1000
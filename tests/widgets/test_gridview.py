@@ -0,0 +1,47 @@
+import os
+
+import pytest
+from PySide6.QtGui import QImage
+from PySide6.QtWidgets import QApplication
+
+import qfui.resources
+from qfui import sprites
+from qfui.controller.project import ProjectController
+from qfui.models.project import Project
+from qfui.qfparser.importers import CSVImporter
+from qfui.widgets.gridview import LayerItem, LayerViewer, OnionSkinItem
+
+
+@pytest.fixture(scope="module")
+def viewer() -> LayerViewer:
+    # The platform is picked when the application is created
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+    qfui.resources.initialize()
+    sprites.initialize(QImage("sprites:defaults.png"))
+    viewer = LayerViewer()
+    yield viewer
+    viewer.deleteLater()
+    app.processEvents()
+
+
+def test_onion_skin_steps_through_meta_sections(viewer: LayerViewer):
+    controller = ProjectController()
+    controller.project = Project(CSVImporter().load("data/dreamfort.csv"))
+    controller.layer_visibility_changed.connect(viewer.layer_visibility_changed)
+    controller.z_level_changed.connect(viewer.z_level_changed)
+    viewer.project_changed(controller)
+    viewer.set_onion_skin(True)
+    meta = next(section for section in controller.sections if section.label == "apartments1_stack")
+    with controller.batch():
+        controller.add_z_sections([meta.suuid])
+    # The stack applies the single layer of apartments1 on levels 0 to 5
+    for z in range(6):
+        with controller.batch():
+            controller.set_current_z(z)
+        assert viewer.wait_for_rasters(10000)
+        items = viewer.scene().items()
+        (layer_item,) = [item for item in items if isinstance(item, LayerItem)]
+        (onion_item,) = [item for item in items if isinstance(item, OnionSkinItem)]
+        assert layer_item.relative_z == z
+        assert onion_item.levels == list(range(max(z - 2, 0), min(z + 2, 5) + 1))
@@ -0,0 +1,54 @@
+import os
+
+import numpy
+import pytest
+from PySide6.QtCore import QPointF
+from PySide6.QtGui import QImage
+from PySide6.QtWidgets import QApplication
+
+import qfui.resources
+from qfui import sprites
+from qfui.widgets.minimap import Minimap
+
+__CELL_PX__ = 16
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app():
+    # The platform is picked when the application is created
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+    qfui.resources.initialize()
+    sprites.initialize(QImage("sprites:defaults.png"))
+    yield app
+
+
+def _codes(width: int, height: int, code: int) -> numpy.ndarray:
+    return numpy.full((width, height), code, dtype=numpy.uint8)
+
+
+def _pos(x: int, y: int) -> QPointF:
+    return QPointF(x * __CELL_PX__, y * __CELL_PX__)
+
+
+def _minimap(layers) -> Minimap:
+    minimap = Minimap(__CELL_PX__)
+    for idx, pos, codes in layers:
+        minimap.set_layer(idx, pos, codes)
+    return minimap
+
+
+def test_replaced_layers_only_recompose_their_cells(monkeypatch):
+    minimap = _minimap([("a", _pos(0, 0), _codes(10, 8, 1)), ("b", _pos(2, 2), _codes(4, 4, 2))])
+    monkeypatch.setattr(minimap, "_rebuild", lambda: pytest.fail("replacing an inner layer rebuilt the minimap"))
+    minimap.set_layer("b", _pos(3, 1), _codes(5, 3, 3))
+    minimap.set_layer("a", _pos(0, 0), _codes(10, 8, 2))
+    expected = _minimap([("a", _pos(0, 0), _codes(10, 8, 2)), ("b", _pos(3, 1), _codes(5, 3, 3))])
+    assert numpy.array_equal(minimap._pixels, expected._pixels)
+
+
+def test_replacing_a_layer_on_the_edge_shrinks_the_bounds():
+    minimap = _minimap([("a", _pos(0, 0), _codes(4, 4, 1)), ("b", _pos(4, 0), _codes(4, 4, 2))])
+    minimap.set_layer("b", _pos(2, 0), _codes(2, 2, 3))
+    expected = _minimap([("a", _pos(0, 0), _codes(4, 4, 1)), ("b", _pos(2, 0), _codes(2, 2, 3))])
+    assert minimap._bounds == expected._bounds and numpy.array_equal(minimap._pixels, expected._pixels)
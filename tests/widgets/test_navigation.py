@@ -0,0 +1,207 @@
+from typing import List
+
+import pytest
+from PySide6.QtCore import QModelIndex, Qt
+
+from qfui.controller.project import ProjectController
+from qfui.models.project import Project, SectionLayerIndex
+from qfui.models.search import SectionSearchIndex
+from qfui.qfparser.importers import CSVImporter
+from qfui.widgets.navigation import GroupNode, NavigationTree, NavigationTreeFilter
+
+
+@pytest.fixture(scope="module")
+def controller() -> ProjectController:
+    controller = ProjectController()
+    controller.project = Project(CSVImporter().load("data/dreamfort.csv"))
+    return controller
+
+
+def _rows(model: NavigationTree, parent: QModelIndex = QModelIndex(), depth: int = 0) -> List[str]:
+    while model.canFetchMore(parent):
+        model.fetchMore(parent)
+    rows = []
+    for row in range(model.rowCount(parent)):
+        index = model.index(row, 0, parent)
+        details = model.data(model.index(row, 1, parent), Qt.DisplayRole)
+        assert model.parent(index) == parent
+        rows.append(f"{'  ' * depth}{model.data(index, Qt.DisplayRole)} | {details}")
+        rows += _rows(model, index, depth + 1)
+    return rows
+
+
+def test_layer_visibility_updates_tree_in_place(controller: ProjectController):
+    model = NavigationTree(controller)
+    controller.layer_visibility_changed.connect(model.update_layer_visibility)
+    layers = [idx for idx, _ in controller.project.find_layers(lambda idx, layer: True)]
+    resets = []
+    model.modelReset.connect(lambda: resets.append(True))
+    try:
+        with controller.batch():
+            controller.set_layers_as_visible(layers[:5] + layers[20:22])
+        assert _rows(model) == _rows(NavigationTree(controller))
+        with controller.batch():
+            controller.remove_layers_as_visible(layers[1:3] + layers[20:22])
+        assert _rows(model) == _rows(NavigationTree(controller))
+        with controller.batch():
+            controller.clear_all_visible_layers()
+        assert _rows(model) == _rows(NavigationTree(controller))
+    finally:
+        controller.layer_visibility_changed.disconnect(model.update_layer_visibility)
+        controller.clear_all_visible_layers()
+        controller.flush_notifications()
+    assert not resets
+
+
+def test_tree_is_populated_lazily(controller: ProjectController):
+    model = NavigationTree(controller)
+    sections = model.index(1, 0, QModelIndex())
+    assert model.rowCount(sections) == 0
+    assert model.hasChildren(sections)
+    assert model.canFetchMore(sections)
+    model.fetchMore(sections)
+    assert model.rowCount(sections) == min(len(controller.sections), GroupNode.FETCH_BATCH_SIZE)
+    section = model.index(0, 0, sections)
+    assert model.rowCount(section) == 0
+    assert model.hasChildren(section)
+    model.fetchMore(section)
+    assert model.rowCount(section) > 0
+    assert not model.canFetchMore(section)
+
+
+def test_only_sections_up_to_the_last_match_are_fetched(controller: ProjectController, monkeypatch):
+    monkeypatch.setattr(GroupNode, "FETCH_BATCH_SIZE", 4)
+    model = NavigationTree(controller)
+    sections = model.index(1, 0, QModelIndex())
+    model.fetch_sections({controller.sections[5].suuid, controller.sections[2].suuid})
+    assert model.rowCount(sections) == 8
+    model.fetch_sections(set())
+    assert model.rowCount(sections) == 8
+
+
+def test_fetches_are_deferred_while_filtering(controller: ProjectController):
+    model = NavigationTree(controller)
+    proxy = NavigationTreeFilter()
+    proxy.setSourceModel(model)
+    sections = proxy.index(1, 0, QModelIndex())
+    inserted = []
+    model.rowsInserted.connect(lambda *_: inserted.append(model.rowCount(model.index(1, 0, QModelIndex()))))
+    with model.deferred_fetching():
+        with model.deferred_fetching():
+            proxy.fetchMore(sections)
+        with proxy.filter_change():
+            proxy.set_search_text("")
+        assert not inserted and proxy.rowCount(sections) == 0
+    assert inserted == [len(controller.sections)] and proxy.rowCount(sections) > 0
+
+
+def test_batched_visibility_changes_are_merged(controller: ProjectController):
+    layers = [idx for idx, _ in controller.project.find_layers(lambda idx, layer: True)]
+    changes = []
+
+    def changed(_, removed, added):
+        changes.append((removed, added))
+
+    controller.layer_visibility_changed.connect(changed)
+    try:
+        controller.set_layers_as_visible(layers[:2])
+        controller.flush_notifications()
+        with controller.batch():
+            for idx in layers[2:6]:
+                controller.set_layers_as_visible([idx])
+            with controller.batch():
+                controller.remove_layers_as_visible(layers[:1] + layers[5:6])
+            assert len(changes) == 1
+            controller.set_layers_as_visible(layers[:1])
+    finally:
+        controller.layer_visibility_changed.disconnect(changed)
+        controller.clear_all_visible_layers()
+        controller.flush_notifications()
+    assert changes == [([], layers[:2]), ([], layers[2:5])]
+
+
+def test_meta_sections_are_z_navigated_through_their_references(controller: ProjectController):
+    meta = next(section for section in controller.sections if section.label == "apartments1_stack")
+    apartments = next(section for section in controller.sections if section.label == "apartments1")
+    shown = SectionLayerIndex(apartments.suuid, apartments.layers[0].luuid)
+    try:
+        with controller.batch():
+            controller.add_z_sections([meta.suuid])
+        assert list(controller.visible_layers) == [shown]
+        with controller.batch():
+            controller.set_current_z(100)
+        # The stack applies the same layer on every level it spans
+        assert controller.current_z == 5 and list(controller.visible_layers) == [shown]
+        assert controller.layers_at_z(5) == [(shown, 5)] and controller.layers_at_z(6) == []
+    finally:
+        controller.remove_z_sections([meta.suuid])
+        controller.set_current_z(0)
+        controller.clear_all_visible_layers()
+        controller.flush_notifications()
+
+
+def test_removed_z_sections_are_hidden(controller: ProjectController):
+    stairs, services = (
+        next(s for s in controller.sections if s.label == label) for label in ("central_stairs", "services1")
+    )
+    changes = []
+
+    def changed(_, removed, added):
+        changes.append((set(removed), set(added)))
+
+    try:
+        with controller.batch():
+            controller.add_z_sections([stairs.suuid, services.suuid])
+            controller.set_current_z(3)
+        controller.layer_visibility_changed.connect(changed)
+        shown = set(controller.visible_layers)
+        with controller.batch():
+            controller.remove_z_sections([services.suuid])
+        assert changes == [({SectionLayerIndex(services.suuid, services.layers[3].luuid)}, set())]
+        assert set(controller.visible_layers) == shown - changes[0][0]
+        with controller.batch():
+            controller.add_z_sections([services.suuid])
+            controller.set_current_z(10)
+            controller.remove_z_sections([stairs.suuid])
+        # Only the levels of the remaining section are left to navigate
+        assert controller.current_z == 3
+        assert set(controller.visible_layers) == {SectionLayerIndex(services.suuid, services.layers[3].luuid)}
+    finally:
+        controller.layer_visibility_changed.disconnect(changed)
+        controller.remove_z_sections([stairs.suuid, services.suuid])
+        controller.set_current_z(0)
+        controller.clear_all_visible_layers()
+        controller.flush_notifications()
+
+
+def test_empty_tree_indexes_its_groups():
+    model = NavigationTree()
+    assert [model.index(row, 0, QModelIndex()).internalPointer().index_in_parent for row in range(2)] == [0, 1]
+
+
+def test_filter_keeps_matching_label_substrings(controller: ProjectController):
+    model = NavigationTree(controller)
+    proxy = NavigationTreeFilter()
+    proxy.setSourceModel(model)
+    proxy.search_index = SectionSearchIndex(controller.sections)
+    sections = model.index(1, 0, QModelIndex())
+    while model.canFetchMore(sections):
+        model.fetchMore(sections)
+    for row in range(model.rowCount(sections)):
+        if (node := model.index(row, 0, sections).internalPointer()).mode not in proxy.allowed_modes:
+            continue
+        label = node.tree_label
+        for text in (label, label[2:9], label[-5:]):
+            with proxy.filter_change():
+                proxy.set_search_text(text)
+            assert proxy.filterAcceptsRow(row, sections), text
+    # Terms match on their own and in comments too, not only as one substring of the label
+    with proxy.filter_change():
+        proxy.set_search_text("stairs central")
+    labels = [index.data() for index in _filtered(proxy)]
+    assert "014 - central_stairs" in labels and "002 - dig_all_underground" in labels
+
+
+def _filtered(proxy: NavigationTreeFilter) -> List[QModelIndex]:
+    sections = proxy.index(1, 0, QModelIndex())
+    return [proxy.index(row, 0, sections) for row in range(proxy.rowCount(sections))]